@@ -0,0 +1,155 @@
+import numpy as np
+
+from src.analysis.frame_solver import member_geometry, RECTANGLE, TRIANGLE
+
+# Result layers that can be drawn over the structure
+DEFORMED = "deformed"
+AXIAL = "axial"
+SHEAR = "shear"
+MOMENT = "moment"
+
+RESULT_LAYERS = (DEFORMED, AXIAL, SHEAR, MOMENT)
+
+# Largest deflection or diagram ordinate, as a fraction of the structure size
+DEFORMED_FRACTION = 0.05
+DIAGRAM_FRACTION = 0.08
+
+def structure_size(result):
+    """Return the largest side of the bounding box of the nodes (m)"""
+    if not len(result.node_xy):
+        return 0.0
+    return float(np.max(result.node_xy.max(axis=0) - result.node_xy.min(axis=0)))
+
+def deformed_shape(result, segments=8, scale=1.0):
+    """Sample the deformed members with cubic Hermite interpolation
+    
+    The deflection between member ends adds the effect of the loads along
+    the member, integrating M / EI twice. It is scaled so the largest
+    displacement is a fixed fraction of the structure size, times the scale.
+    
+    Returns:
+        (m, segments + 1, 2) array of deformed points in meters
+    """
+    lengths, c, s = member_geometry(result.node_xy, result.members)
+    start = result.node_xy[result.members[:, 0]]
+    d = result.displacements
+    
+    # End displacements in local axes
+    d1 = d[result.members[:, 0]]
+    d2 = d[result.members[:, 1]]
+    u1 = c * d1[:, 0] + s * d1[:, 1]
+    v1 = -s * d1[:, 0] + c * d1[:, 1]
+    u2 = c * d2[:, 0] + s * d2[:, 1]
+    v2 = -s * d2[:, 0] + c * d2[:, 1]
+    
+    # Linear axial and cubic transverse shape functions
+    xi = np.linspace(0.0, 1.0, segments + 1)
+    h1 = 1 - 3 * xi ** 2 + 2 * xi ** 3
+    h2 = xi - 2 * xi ** 2 + xi ** 3
+    h3 = 3 * xi ** 2 - 2 * xi ** 3
+    h4 = xi ** 3 - xi ** 2
+    L = lengths[:, None]
+    u = np.outer(u1, 1 - xi) + np.outer(u2, xi)
+    v = v1[:, None] * h1 + L * d1[:, 2:3] * h2 + v2[:, None] * h3 + L * d2[:, 2:3] * h4
+    
+    # Deflection of the member with fixed ends under its loads, from the
+    # curvature M / EI integrated twice with the trapezoidal rule
+    M = internal_forces(result, segments)[3]
+    curvature = M / result.flexural_rigidity
+    step = L / segments
+    slope = np.zeros_like(curvature)
+    slope[:, 1:] = np.cumsum((curvature[:, 1:] + curvature[:, :-1]) * step / 2, axis=1)
+    bending = np.zeros_like(curvature)
+    bending[:, 1:] = np.cumsum((slope[:, 1:] + slope[:, :-1]) * step / 2, axis=1)
+    v += bending - bending[:, -1:] * h3 - L * slope[:, -1:] * h4
+    
+    largest = np.hypot(u, v).max() if u.size else 0.0
+    factor = scale * DEFORMED_FRACTION * structure_size(result) / largest if largest > 0 else 0.0
+    
+    # Local position along the member plus the scaled displacement
+    along = L * xi + factor * u
+    across = factor * v
+    points = np.empty((len(lengths), segments + 1, 2))
+    points[:, :, 0] = start[:, :1] + c[:, None] * along - s[:, None] * across
+    points[:, :, 1] = start[:, 1:] + s[:, None] * along + c[:, None] * across
+    return points
+
+def internal_forces(result, segments=8):
+    """Evaluate axial force, shear force and bending moment along every member
+    
+    Signs follow the usual conventions: tension, shear turning the member
+    clockwise and sagging moments are positive.
+    
+    Returns:
+        Tuple (xi, N, V, M) with xi the (segments + 1,) sample positions
+        along the members and N, V, M (m, segments + 1) arrays
+    """
+    lengths = member_geometry(result.node_xy, result.members)[0]
+    forces = result.member_forces
+    xi = np.linspace(0.0, 1.0, segments + 1)
+    x = np.outer(lengths, xi)
+    
+    # Start end forces alone
+    N = np.repeat(-forces[:, 0:1], len(xi), axis=1)
+    V = np.repeat(forces[:, 1:2], len(xi), axis=1)
+    M = -forces[:, 2:3] + forces[:, 1:2] * x
+    
+    loads = result.member_loads
+    member = loads["member"]
+    if len(member):
+        L = lengths[member][:, None]
+        xl = x[member]
+        p = loads["axial"][:, None]
+        q = loads["transverse"][:, None]
+        kind = loads["kind"][:, None]
+        
+        # Resultant of the loads left of each sample and its moment
+        a = (loads["t"][:, None] * L)
+        past = xl >= a
+        ramp = np.where(past, xl - a, 0.0)
+        uniform = kind == RECTANGLE
+        triangle = kind == TRIANGLE
+        point = ~(uniform | triangle)
+        share = np.where(uniform, xl, np.where(triangle, xl ** 2 / (2 * L), past * 1.0))
+        lever = np.where(uniform, xl ** 2 / 2, np.where(triangle, xl ** 3 / (6 * L), ramp))
+        
+        np.add.at(N, member, -p * share)
+        np.add.at(V, member, q * share)
+        np.add.at(M, member, q * lever)
+    
+    return xi, N, V, M
+
+def force_diagram(result, layer, segments=8, scale=1.0):
+    """Build the outline of an internal force diagram along every member
+    
+    Ordinates are drawn perpendicular to the members, scaled so the largest
+    one is a fixed fraction of the structure size, times the scale. Moments
+    are drawn on the tension side.
+    
+    Returns:
+        (m, segments + 3, 2) array of outline points in meters, starting and
+        ending on the member axis
+    """
+    lengths, c, s = member_geometry(result.node_xy, result.members)
+    xi, N, V, M = internal_forces(result, segments)
+    values = {AXIAL: N, SHEAR: V, MOMENT: -M}[layer]
+    
+    largest = np.abs(values).max() if values.size else 0.0
+    factor = scale * DIAGRAM_FRACTION * structure_size(result) / largest if largest > 0 else 0.0
+    
+    start = result.node_xy[result.members[:, 0]]
+    along = np.outer(lengths, xi)
+    across = factor * values
+    
+    points = np.empty((len(lengths), segments + 3, 2))
+    points[:, 0] = start
+    points[:, -1] = result.node_xy[result.members[:, 1]]
+    points[:, 1:-1, 0] = start[:, :1] + c[:, None] * along - s[:, None] * across
+    points[:, 1:-1, 1] = start[:, 1:] + s[:, None] * along + c[:, None] * across
+    return points
+
+def result_polylines(result, layer, segments=8, scale=1.0):
+    """Return the polylines of a result layer, see RESULT_LAYERS"""
+    if layer == DEFORMED:
+        return deformed_shape(result, segments, scale)
+    return force_diagram(result, layer, segments, scale)
\ No newline at end of file
@@ -0,0 +1,655 @@
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import scipy.sparse as sparse
+from scipy.sparse.linalg import splu
+from scipy.linalg import lu_factor, lu_solve
+
+from src.utils.connectivity import build_connectivity, FORCE_TYPE_CODES, RESTRAINED, SPRING
+from src.models.constants import ForceType
+
+# Default section and material (steel, kN and m)
+DEFAULT_E = 210e6  # Young's modulus (kN/m²)
+DEFAULT_A = 1e-2  # Cross-section area (m²)
+DEFAULT_I = 1e-4  # Second moment of area (m⁴)
+DEFAULT_SPRING_STIFFNESS = 1e4  # Elastic support stiffness (kN/m)
+
+# Degrees of freedom per node: ux, uy, rz
+DOF_PER_NODE = 3
+
+POINT = FORCE_TYPE_CODES[ForceType.POINT]
+RECTANGLE = FORCE_TYPE_CODES[ForceType.RECTANGLE]
+TRIANGLE = FORCE_TYPE_CODES[ForceType.TRIANGLE]
+
+class AnalysisResult:
+    """Displacements, reactions and member end forces of a frame analysis
+    
+    Attributes:
+        node_xy: (n, 2) node coordinates in meters, the first rows following
+            the order of AppState.node_positions
+        members: (m, 2) start and end node indexes
+        displacements: (n, 3) ux, uy (m) and rz (rad) per node
+        reactions: (n, 3) support reactions Rx, Ry (kN) and Mz (kN.m)
+        member_forces: (m, 6) local end forces N1, V1, M1, N2, V2, M2
+        member_loads: Loads applied along members, see member_loads()
+        flexural_rigidity: EI of the members (kN.m²)
+    """
+    
+    def __init__(self, node_xy, members, displacements, reactions, member_forces, member_loads,
+                 flexural_rigidity=DEFAULT_E * DEFAULT_I):
+        self.node_xy = node_xy
+        self.members = members
+        self.displacements = displacements
+        self.reactions = reactions
+        self.member_forces = member_forces
+        self.member_loads = member_loads
+        self.flexural_rigidity = flexural_rigidity
+    
+    def max_displacement(self):
+        """Return the largest translation of any node"""
+        if not len(self.displacements):
+            return 0.0
+        return float(np.max(np.hypot(self.displacements[:, 0], self.displacements[:, 1])))
+
+class LoadCaseResult:
+    """Results of every load case of a structure, stacked along a first axis
+    
+    Attributes:
+        case_names: Load case names, in the order of the first axis
+        node_xy, members: As in AnalysisResult
+        displacements: (k, n, 3) displacements per load case
+        reactions: (k, n, 3) support reactions per load case
+        member_forces: (k, m, 6) local member end forces per load case
+        member_loads: Loads applied along members, with their load case
+        flexural_rigidity: EI of the members (kN.m²)
+    """
+    
+    def __init__(self, case_names, node_xy, members, displacements, reactions, member_forces, member_loads,
+                 flexural_rigidity=DEFAULT_E * DEFAULT_I):
+        self.case_names = case_names
+        self.node_xy = node_xy
+        self.members = members
+        self.displacements = displacements
+        self.reactions = reactions
+        self.member_forces = member_forces
+        self.member_loads = member_loads
+        self.flexural_rigidity = flexural_rigidity
+    
+    def max_displacements(self):
+        """Return the largest translation of any node, per load case"""
+        if not self.displacements.shape[1]:
+            return np.zeros(len(self.case_names))
+        return np.max(np.hypot(self.displacements[:, :, 0], self.displacements[:, :, 1]), axis=1)
+    
+    def factor_matrix(self, combinations):
+        """Return the (c, k) factor matrix of named combinations
+        
+        Args:
+            combinations: Dictionary of combination name -> {load case: factor},
+                load cases without results are ignored
+        """
+        index = {name: i for i, name in enumerate(self.case_names)}
+        factors = np.zeros((len(combinations), len(self.case_names)))
+        for row, terms in enumerate(combinations.values()):
+            for case, factor in terms.items():
+                if case in index:
+                    factors[row, index[case]] += factor
+        return factors
+    
+    def case(self, name):
+        """Return the results of a single load case"""
+        return self.combine({name: 1.0})
+    
+    def combine(self, factors):
+        """Superpose load cases into the results of one combination
+        
+        Args:
+            factors: Dictionary of load case name -> factor
+        """
+        weights = self.factor_matrix({"combination": factors})[0]
+        
+        # Scale the member loads of each case so diagrams match the results
+        case_weights = weights[self.member_loads["case"]]
+        kept = case_weights != 0
+        loads = {key: values[kept] for key, values in self.member_loads.items()}
+        loads["axial"] = loads["axial"] * case_weights[kept]
+        loads["transverse"] = loads["transverse"] * case_weights[kept]
+        
+        return AnalysisResult(
+            self.node_xy, self.members,
+            np.tensordot(weights, self.displacements, axes=1),
+            np.tensordot(weights, self.reactions, axes=1),
+            np.tensordot(weights, self.member_forces, axes=1),
+            loads, self.flexural_rigidity
+        )
+    
+    def envelope(self, combinations):
+        """Compute the envelope of several combinations by superposition
+        
+        Returns:
+            Dictionary with, for displacements, reactions and member_forces,
+            a (maximum, minimum) pair of arrays over all combinations, and
+            for each a matching pair of governing combination names
+        """
+        if not combinations:
+            raise ValueError("There are no load combinations")
+        
+        names = np.array(list(combinations))
+        factors = self.factor_matrix(combinations)
+        
+        envelope = {}
+        for key in ("displacements", "reactions", "member_forces"):
+            # (c, ...) values of every combination in one product
+            values = np.tensordot(factors, getattr(self, key), axes=1)
+            high = values.argmax(axis=0)
+            low = values.argmin(axis=0)
+            envelope[key] = (values.max(axis=0), values.min(axis=0))
+            envelope[key + "_governing"] = (names[high], names[low])
+        
+        return envelope
+
+def member_geometry(node_xy, members):
+    """Return member lengths and direction cosines"""
+    delta = node_xy[members[:, 1]] - node_xy[members[:, 0]]
+    lengths = np.hypot(delta[:, 0], delta[:, 1])
+    safe = np.where(lengths > 0, lengths, 1.0)
+    return lengths, delta[:, 0] / safe, delta[:, 1] / safe
+
+def element_matrices(lengths, c, s, E=DEFAULT_E, A=DEFAULT_A, I=DEFAULT_I):
+    """Build the local stiffness and rotation matrices of all members at once
+    
+    Returns:
+        Tuple (k_local, rotation, k_global) of (m, 6, 6) arrays, with
+        k_global = rotationᵀ · k_local · rotation
+    """
+    m = len(lengths)
+    L = np.where(lengths > 0, lengths, 1.0)
+    
+    # 2D Euler-Bernoulli frame element
+    ea = E * A / L
+    ei = E * I
+    k1 = 12 * ei / L ** 3
+    k2 = 6 * ei / L ** 2
+    k3 = 4 * ei / L
+    k4 = 2 * ei / L
+    
+    k_local = np.zeros((m, 6, 6))
+    k_local[:, 0, 0] = k_local[:, 3, 3] = ea
+    k_local[:, 0, 3] = k_local[:, 3, 0] = -ea
+    k_local[:, 1, 1] = k_local[:, 4, 4] = k1
+    k_local[:, 1, 4] = k_local[:, 4, 1] = -k1
+    k_local[:, 1, 2] = k_local[:, 2, 1] = k_local[:, 1, 5] = k_local[:, 5, 1] = k2
+    k_local[:, 2, 4] = k_local[:, 4, 2] = k_local[:, 4, 5] = k_local[:, 5, 4] = -k2
+    k_local[:, 2, 2] = k_local[:, 5, 5] = k3
+    k_local[:, 2, 5] = k_local[:, 5, 2] = k4
+    
+    rotation = np.zeros((m, 6, 6))
+    for offset in (0, 3):
+        rotation[:, offset, offset] = c
+        rotation[:, offset, offset + 1] = s
+        rotation[:, offset + 1, offset] = -s
+        rotation[:, offset + 1, offset + 1] = c
+        rotation[:, offset + 2, offset + 2] = 1.0
+    
+    k_global = np.einsum("mji,mjk,mkl->mil", rotation, k_local, rotation)
+    return k_local, rotation, k_global
+
+def member_dofs(members):
+    """Return the (m, 6) global degree of freedom numbers of every member"""
+    base = members * DOF_PER_NODE
+    return np.hstack([base[:, :1] + np.arange(3), base[:, 1:] + np.arange(3)])
+
+def assemble_stiffness(k_global, members, node_count):
+    """Assemble the global stiffness matrix in CSC form"""
+    dofs = member_dofs(members)
+    rows = np.repeat(dofs, 6, axis=1).ravel()
+    cols = np.tile(dofs, (1, 6)).ravel()
+    size = node_count * DOF_PER_NODE
+    return sparse.coo_matrix((k_global.ravel(), (rows, cols)), shape=(size, size)).tocsc()
+
+def member_loads(model, lengths, c, s):
+    """Collect the loads applied along members in local components
+    
+    Forces act downwards (global -y) with their value as magnitude, in kN for
+    point loads and kN/m for uniform and triangular loads. Triangular loads
+    grow from zero at the member start to their value at the end.
+    
+    Returns:
+        Dictionary of arrays: member, kind (force type code), t (position of
+        point loads), case (load case index), axial and transverse (local
+        load components)
+    """
+    on_member = model["force_host"] == 2
+    member = model["force_host_index"][on_member]
+    value = model["force_value"][on_member]
+    
+    # Global load (0, -value) projected on the member axes
+    return {
+        "member": member,
+        "kind": model["force_type"][on_member],
+        "t": model["force_t"][on_member],
+        "case": model["force_case"][on_member],
+        "axial": -value * s[member],
+        "transverse": -value * c[member]
+    }
+
+def fixed_end_forces(loads, lengths, member_count, case_count=None):
+    """Return the (m, 6) local equivalent nodal loads of member loads
+    
+    With a case count, loads are summed per load case into a
+    (case_count, m, 6) array instead.
+    """
+    if case_count is None:
+        equivalent = np.zeros((member_count, 6))
+    else:
+        equivalent = np.zeros((case_count, member_count, 6))
+    member = loads["member"]
+    if not len(member):
+        return equivalent
+    
+    L = lengths[member]
+    q = loads["transverse"]
+    p = loads["axial"]
+    kind = loads["kind"]
+    a = loads["t"] * L
+    b = L - a
+    
+    terms = np.zeros((len(member), 6))
+    
+    # Uniform load over the whole member
+    uniform = kind == RECTANGLE
+    terms[uniform, 0] = terms[uniform, 3] = p[uniform] * L[uniform] / 2
+    terms[uniform, 1] = terms[uniform, 4] = q[uniform] * L[uniform] / 2
+    terms[uniform, 2] = q[uniform] * L[uniform] ** 2 / 12
+    terms[uniform, 5] = -q[uniform] * L[uniform] ** 2 / 12
+    
+    # Triangular load, zero at the start
+    triangle = kind == TRIANGLE
+    terms[triangle, 0] = p[triangle] * L[triangle] / 6
+    terms[triangle, 3] = p[triangle] * L[triangle] / 3
+    terms[triangle, 1] = 3 * q[triangle] * L[triangle] / 20
+    terms[triangle, 4] = 7 * q[triangle] * L[triangle] / 20
+    terms[triangle, 2] = q[triangle] * L[triangle] ** 2 / 30
+    terms[triangle, 5] = -q[triangle] * L[triangle] ** 2 / 20
+    
+    # Point load at position a, any other type is treated as a point load
+    point = ~(uniform | triangle)
+    Lp, ap, bp, qp = L[point], a[point], b[point], q[point]
+    terms[point, 0] = p[point] * bp / Lp
+    terms[point, 3] = p[point] * ap / Lp
+    terms[point, 1] = qp * bp ** 2 * (3 * ap + bp) / Lp ** 3
+    terms[point, 4] = qp * ap ** 2 * (ap + 3 * bp) / Lp ** 3
+    terms[point, 2] = qp * ap * bp ** 2 / Lp ** 2
+    terms[point, 5] = -qp * ap ** 2 * bp / Lp ** 2
+    
+    if case_count is None:
+        np.add.at(equivalent, member, terms)
+    else:
+        np.add.at(equivalent, (loads["case"], member), terms)
+    return equivalent
+
+def load_vector(model, rotation, equivalent, node_count):
+    """Assemble the global load vector from node loads and member loads
+    
+    A (case_count, m, 6) equivalent array gives a (dofs, case_count) load
+    matrix with one column per load case.
+    """
+    on_node = model["force_host"] == 1
+    node_dofs = model["force_host_index"][on_node] * DOF_PER_NODE + 1
+    dofs = member_dofs(model["members"])
+    
+    if equivalent.ndim == 2:
+        loads = np.zeros(node_count * DOF_PER_NODE)
+        
+        # Loads on nodes act downwards whatever their type
+        np.add.at(loads, node_dofs, -model["force_value"][on_node])
+        
+        # Member equivalent loads rotated to global axes
+        global_equivalent = np.einsum("mji,mj->mi", rotation, equivalent)
+        np.add.at(loads, dofs.ravel(), global_equivalent.ravel())
+        return loads
+    
+    # One column per load case
+    case_count = len(equivalent)
+    loads = np.zeros((node_count * DOF_PER_NODE, case_count))
+    np.add.at(loads, (node_dofs, model["force_case"][on_node]), -model["force_value"][on_node])
+    
+    # Only members carrying loads in some case contribute
+    loaded = np.flatnonzero(np.any(equivalent != 0, axis=(0, 2)))
+    global_equivalent = np.einsum("mji,cmj->mic", rotation[loaded], equivalent[:, loaded])
+    np.add.at(loads, dofs[loaded].ravel(), global_equivalent.reshape(-1, case_count))
+    return loads
+
+def support_conditions(model, stiffness, spring_stiffness=DEFAULT_SPRING_STIFFNESS):
+    """Return the free dofs, restrained dofs and spring stiffness vector
+    
+    Degrees of freedom without any stiffness (isolated nodes) are restrained
+    so the system stays solvable.
+    """
+    bc = model["node_bc"].ravel()
+    springs = np.where(bc == SPRING, spring_stiffness, 0.0)
+    restrained = (bc == RESTRAINED) | ((stiffness.diagonal() + springs) == 0)
+    return np.flatnonzero(~restrained), np.flatnonzero(restrained), springs
+
+def solve_frame(app_state, E=DEFAULT_E, A=DEFAULT_A, I=DEFAULT_I, spring_stiffness=DEFAULT_SPRING_STIFFNESS):
+    """Analyse the structure drawn in the application state
+    
+    Members are rigidly connected 2D frame elements sharing one section.
+    Fixed nodes restrain all degrees of freedom, hinges restrain both
+    translations and elastic nodes support both translations on springs.
+    
+    Raises:
+        ValueError: If there are no members or the structure is a mechanism
+    """
+    return FrameSolver(E, A, I, spring_stiffness).solve(app_state)
+
+class FrameSolver:
+    """Frame analysis that keeps its stiffness matrix and factorization
+    
+    Successive solves reuse as much of the previous work as possible:
+    
+    - "loads": geometry and supports unchanged, only the right-hand side
+      is rebuilt and solved against the cached factorization
+    - "update": a few members were added or removed between existing
+      nodes, the stiffness change is applied as a low-rank correction
+      (Woodbury identity) on top of the cached factorization
+    - "reassembly": members changed on the same nodes but too many for a
+      low-rank correction, the stiffness is patched with the changed
+      members only and refactorized
+    - "full": nodes or supports changed, everything is rebuilt
+    
+    The mode used by the last solve is kept in last_mode.
+    """
+    
+    def __init__(self, E=DEFAULT_E, A=DEFAULT_A, I=DEFAULT_I, spring_stiffness=DEFAULT_SPRING_STIFFNESS,
+                 max_update_dofs=120):
+        self.E = E
+        self.A = A
+        self.I = I
+        self.spring_stiffness = spring_stiffness
+        self.max_update_dofs = max_update_dofs
+        self.clear()
+    
+    def clear(self):
+        """Drop all cached matrices"""
+        self.geometry_key = None  # Hash of nodes, members, supports and section
+        self.node_key = None  # Hash of nodes and supports only
+        self.members = None  # Members of the cached stiffness
+        self.stiffness = None  # Current global stiffness, without springs
+        self.free = None  # Free degrees of freedom
+        self.springs = None  # Spring stiffness per degree of freedom
+        self.base_stiffness = None  # Stiffness at the time of factorization
+        self.factor = None  # SuperLU factorization of the free block
+        self.correction = None  # Low-rank correction (affected, D, S LU)
+        self.last_mode = None
+    
+    def geometry_hash(self, model):
+        """Hash everything the stiffness matrix depends on"""
+        return hash((
+            model["node_xy"].tobytes(), model["node_bc"].tobytes(), model["members"].tobytes(),
+            self.E, self.A, self.I, self.spring_stiffness
+        ))
+    
+    def solve(self, app_state):
+        """Analyse the structure, reusing cached work when possible
+        
+        All forces are applied together, whatever their load case.
+        
+        Raises:
+            ValueError: If there are no members or the structure is a mechanism
+        """
+        model, lengths, c, s, k_local, rotation = self.prepare(app_state)
+        node_count = len(model["node_xy"])
+        
+        # Loads
+        loads_along = member_loads(model, lengths, c, s)
+        equivalent = fixed_end_forces(loads_along, lengths, len(model["members"]))
+        loads = load_vector(model, rotation, equivalent, node_count)
+        
+        displacements = np.zeros(node_count * DOF_PER_NODE)
+        displacements[self.free] = self.solve_free(loads[self.free])
+        if not np.all(np.isfinite(displacements)):
+            self.clear()
+            raise ValueError("The structure is unstable (singular stiffness matrix)")
+        
+        result = build_result(model, self.stiffness, loads, displacements, k_local, rotation, equivalent, loads_along)
+        result.flexural_rigidity = self.E * self.I
+        return result
+    
+    def solve_cases(self, app_state, workers=None):
+        """Analyse every load case with one multi-right-hand-side solve
+        
+        All load cases share the cached factorization. With several workers
+        the load columns are split between processes, each factorizing the
+        stiffness once, which only pays off for very large case counts.
+        
+        Args:
+            app_state: Application state
+            workers: Number of worker processes, None or 1 solves in process
+            
+        Returns:
+            LoadCaseResult with one slice per load case
+            
+        Raises:
+            ValueError: If there are no members or the structure is a mechanism
+        """
+        model, lengths, c, s, k_local, rotation = self.prepare(app_state)
+        node_count = len(model["node_xy"])
+        case_names = [str(name) for name in model["load_cases"]]
+        if not case_names:
+            raise ValueError("There are no loads to analyse")
+        
+        # One load column per case
+        loads_along = member_loads(model, lengths, c, s)
+        equivalent = fixed_end_forces(loads_along, lengths, len(model["members"]), len(case_names))
+        loads = load_vector(model, rotation, equivalent, node_count)
+        
+        displacements = np.zeros(loads.shape)
+        rhs = loads[self.free]
+        if workers and workers > 1 and rhs.shape[1] > workers:
+            k_free = (self.stiffness + sparse.diags(self.springs, format="csc"))[self.free][:, self.free].tocsc()
+            chunks = np.array_split(rhs, workers, axis=1)
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                solved = list(executor.map(_solve_chunk, [k_free] * len(chunks), chunks))
+            displacements[self.free] = np.hstack(solved)
+        else:
+            displacements[self.free] = self.solve_free(rhs)
+        
+        if not np.all(np.isfinite(displacements)):
+            self.clear()
+            raise ValueError("The structure is unstable (singular stiffness matrix)")
+        
+        result = build_case_result(
+            model, case_names, self.stiffness, loads, displacements, k_local, rotation, equivalent, loads_along
+        )
+        result.flexural_rigidity = self.E * self.I
+        return result
+    
+    def prepare(self, app_state):
+        """Build the model and bring the cached factorization up to date
+        
+        Returns:
+            Tuple (model, lengths, c, s, k_local, rotation)
+            
+        Raises:
+            ValueError: If there are no members or the structure is a mechanism
+        """
+        model = build_connectivity(app_state)
+        node_xy, members = model["node_xy"], model["members"]
+        node_count = len(node_xy)
+        if not len(members):
+            raise ValueError("The structure has no members to analyse")
+        
+        # Element matrices are cheap next to the factorization, rebuild them
+        lengths, c, s = member_geometry(node_xy, members)
+        if np.any(lengths == 0):
+            raise ValueError("The structure has members of zero length")
+        k_local, rotation, k_global = element_matrices(lengths, c, s, self.E, self.A, self.I)
+        
+        # Bring the cached stiffness and factorization up to date
+        geometry_key = self.geometry_hash(model)
+        if geometry_key == self.geometry_key:
+            self.last_mode = "loads"
+        else:
+            node_key = hash((node_xy.tobytes(), model["node_bc"].tobytes()))
+            if node_key != self.node_key or not self.patch_members(model):
+                self.stiffness = assemble_stiffness(k_global, members, node_count)
+                self.factorize(model)
+                self.last_mode = "full"
+            self.geometry_key = geometry_key
+            self.node_key = node_key
+            self.members = members
+        
+        return model, lengths, c, s, k_local, rotation
+    
+    def factorize(self, model):
+        """Factorize the free block of the current stiffness"""
+        self.free, restrained, self.springs = support_conditions(model, self.stiffness, self.spring_stiffness)
+        k_free = (self.stiffness + sparse.diags(self.springs, format="csc"))[self.free][:, self.free].tocsc()
+        try:
+            self.factor = splu(k_free)
+        except RuntimeError:
+            self.clear()
+            raise ValueError("The structure is unstable (singular stiffness matrix)")
+        
+        self.base_stiffness = self.stiffness
+        self.correction = None
+    
+    def patch_members(self, model):
+        """Apply member additions and removals to the cached stiffness
+        
+        Only valid when nodes and supports are unchanged.
+        
+        Returns:
+            False if the change can't be patched and a full rebuild is needed
+        """
+        if self.stiffness is None:
+            return False
+        
+        node_xy, members = model["node_xy"], model["members"]
+        # Match members by their (unordered) end nodes
+        node_count = len(node_xy)
+        old_keys = np.sort(self.members, axis=1) @ np.array([node_count, 1])
+        new_keys = np.sort(members, axis=1) @ np.array([node_count, 1])
+        if len(np.unique(old_keys)) != len(old_keys) or len(np.unique(new_keys)) != len(new_keys):
+            return False
+        
+        added = members[~np.isin(new_keys, old_keys)]
+        removed = self.members[~np.isin(old_keys, new_keys)]
+        
+        # Stiffness of the changed members only
+        delta = sparse.csc_matrix((node_count * DOF_PER_NODE,) * 2)
+        for changed, sign in ((added, 1.0), (removed, -1.0)):
+            if len(changed):
+                lengths, c, s = member_geometry(node_xy, changed)
+                k_global = element_matrices(lengths, c, s, self.E, self.A, self.I)[2]
+                delta = delta + sign * assemble_stiffness(k_global, changed, node_count)
+        
+        self.stiffness = self.stiffness + delta
+        
+        # Nodes that gained or lost all their members change the free set
+        free = support_conditions(model, self.stiffness, self.spring_stiffness)[0]
+        if not np.array_equal(free, self.free):
+            self.factorize(model)
+            self.last_mode = "reassembly"
+            return True
+        
+        # Low-rank correction relative to the factorized stiffness
+        change = (self.stiffness - self.base_stiffness)[self.free][:, self.free].tocsc()
+        change.eliminate_zeros()
+        affected = np.flatnonzero(np.diff(change.indptr))
+        if len(affected) > self.max_update_dofs or not self.set_correction(change, affected):
+            self.factorize(model)
+            self.last_mode = "reassembly"
+            return True
+        
+        self.last_mode = "update"
+        return True
+    
+    def set_correction(self, change, affected):
+        """Prepare the Woodbury correction for a stiffness change
+        
+        With K = K0 + P·D·Pᵀ, P selecting the affected degrees of freedom:
+        K⁻¹ = K0⁻¹ - K0⁻¹·P·S⁻¹·D·Pᵀ·K0⁻¹ where S = I + D·Pᵀ·K0⁻¹·P
+        
+        Returns:
+            False if S is singular, the structure then needs refactorizing
+        """
+        if not len(affected):
+            self.correction = None
+            return True
+        
+        size = len(self.free)
+        d = change[affected][:, affected].toarray()
+        
+        # Pᵀ·K0⁻¹·P, solved in column blocks to bound memory
+        c = np.empty((len(affected), len(affected)))
+        for start in range(0, len(affected), 32):
+            block = affected[start:start + 32]
+            rhs = np.zeros((size, len(block)))
+            rhs[block, np.arange(len(block))] = 1.0
+            c[:, start:start + len(block)] = self.factor.solve(rhs)[affected]
+        
+        s = np.eye(len(affected)) + d @ c
+        if np.linalg.cond(s) > 1e12:
+            return False
+        
+        self.correction = (affected, d, lu_factor(s))
+        return True
+    
+    def solve_free(self, rhs):
+        """Solve the free block, applying the low-rank correction if any"""
+        y = self.factor.solve(rhs)
+        if self.correction is None:
+            return y
+        
+        affected, d, s_lu = self.correction
+        w = lu_solve(s_lu, d @ y[affected])
+        correction_rhs = np.zeros(rhs.shape)
+        correction_rhs[affected] = w
+        return y - self.factor.solve(correction_rhs)
+
+def _solve_chunk(k_free, rhs):
+    """Factorize and solve one block of load columns in a worker process"""
+    return splu(k_free).solve(rhs)
+
+def build_result(model, stiffness, loads, displacements, k_local, rotation, equivalent, loads_along):
+    """Recover reactions and member end forces from the displacements"""
+    node_xy, members = model["node_xy"], model["members"]
+    
+    # Reactions at supports, including spring supports
+    reactions = stiffness @ displacements - loads
+    supported = model["node_bc"].ravel() != 0
+    reactions[~supported] = 0.0
+    
+    # Local member end forces: k · T · u minus the equivalent loads
+    u_member = displacements[member_dofs(members)]
+    member_forces = np.einsum("mij,mjk,mk->mi", k_local, rotation, u_member) - equivalent
+    
+    return AnalysisResult(
+        node_xy, members,
+        displacements.reshape(-1, DOF_PER_NODE),
+        reactions.reshape(-1, DOF_PER_NODE),
+        member_forces, loads_along
+    )
+
+def build_case_result(model, case_names, stiffness, loads, displacements, k_local, rotation, equivalent, loads_along):
+    """Recover reactions and member end forces of every load case"""
+    node_xy, members = model["node_xy"], model["members"]
+    case_count = len(case_names)
+    
+    # Reactions at supports, one column per case
+    reactions = stiffness @ displacements - loads
+    supported = model["node_bc"].ravel() != 0
+    reactions[~supported] = 0.0
+    
+    # Local member end forces of all cases at once
+    u_member = displacements[member_dofs(members)]
+    member_forces = np.einsum("mij,mjk,mkc->cmi", k_local, rotation, u_member, optimize=True) - equivalent
+    
+    return LoadCaseResult(
+        case_names, node_xy, members,
+        displacements.T.reshape(case_count, -1, DOF_PER_NODE),
+        reactions.T.reshape(case_count, -1, DOF_PER_NODE),
+        member_forces, loads_along
+    )
\ No newline at end of file
@@ -0,0 +1,74 @@
+import re
+
+# A combination term: optional sign and factor, then a load case name
+TERM_PATTERN = re.compile(r"\s*([+-])?\s*(?:(\d+(?:\.\d*)?|\.\d+)\s*\*\s*)?([A-Za-z_][\w.-]*)\s*")
+
+def parse_combination(expression):
+    """Parse a combination expression such as "1.35*G + 1.5*Q"
+    
+    Returns:
+        Dictionary of load case name -> factor
+    
+    Raises:
+        ValueError: If the expression is not a sum of factored load cases
+    """
+    factors = {}
+    position = 0
+    expression = expression.strip()
+    while position < len(expression):
+        match = TERM_PATTERN.match(expression, position)
+        if match is None or match.end() == position or (position > 0 and match.group(1) is None):
+            raise ValueError(f"Invalid combination term near '{expression[position:]}'")
+        
+        sign, factor, case = match.groups()
+        value = float(factor) if factor else 1.0
+        if sign == "-":
+            value = -value
+        factors[case] = factors.get(case, 0.0) + value
+        position = match.end()
+    
+    if not factors:
+        raise ValueError("Empty load combination")
+    
+    return factors
+
+def parse_combinations(text):
+    """Parse one "NAME = expression" combination per line
+    
+    Empty lines and lines starting with # are ignored.
+    
+    Raises:
+        ValueError: With the line number of the first invalid line
+    """
+    combinations = {}
+    for number, line in enumerate(text.splitlines(), 1):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        
+        name, separator, expression = line.partition("=")
+        if not separator or not name.strip():
+            raise ValueError(f"Line {number}: expected 'NAME = factor*CASE + ...'")
+        
+        try:
+            combinations[name.strip()] = parse_combination(expression)
+        except ValueError as e:
+            raise ValueError(f"Line {number}: {e}")
+    
+    return combinations
+
+def format_combination(factors):
+    """Format load case factors back into an expression"""
+    expression = ""
+    for case, factor in factors.items():
+        term = case if abs(factor) == 1 else f"{abs(factor):g}*{case}"
+        if not expression:
+            expression = f"-{term}" if factor < 0 else term
+        else:
+            expression += f" - {term}" if factor < 0 else f" + {term}"
+    
+    return expression
+
+def format_combinations(combinations):
+    """Format combinations as one "NAME = expression" line each"""
+    return "\n".join(f"{name} = {format_combination(factors)}" for name, factors in combinations.items())
\ No newline at end of file
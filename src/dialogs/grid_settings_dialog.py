@@ -5,6 +5,8 @@ from PyQt6.QtWidgets import (
 from PyQt6.QtCore import Qt
 from PyQt6.QtGui import QColor
 
+from src.models.spacings import Spacings
+
 class ColorPreview(QFrame):
     def __init__(self, color="#f0f0f0"):
         super().__init__()
@@ -54,14 +56,14 @@ class GridSettingsDialog(QDialog):
         
         # Horizontal spacing input
         self.h_spacing = QLineEdit()
-        self.h_spacing.setText(" ".join(map(str, self.app_state.h_spacings)))
-        self.h_spacing.setPlaceholderText("Enter horizontal spacings separated by spaces")
+        self.h_spacing.setText(str(self.app_state.h_spacings))
+        self.h_spacing.setPlaceholderText("Spacings separated by spaces, e.g. 200*1.5 3.0")
         group_layout.addRow("Horizontal:", self.h_spacing)
         
         # Vertical spacing input
         self.v_spacing = QLineEdit()
-        self.v_spacing.setText(" ".join(map(str, self.app_state.v_spacings)))
-        self.v_spacing.setPlaceholderText("Enter vertical spacings separated by spaces")
+        self.v_spacing.setText(str(self.app_state.v_spacings))
+        self.v_spacing.setPlaceholderText("Spacings separated by spaces, e.g. 200*1.5 3.0")
         group_layout.addRow("Vertical:", self.v_spacing)
         
         group_box.setLayout(group_layout)
@@ -99,17 +101,19 @@ class GridSettingsDialog(QDialog):
         """Apply settings and close dialog"""
         # Parse horizontal spacings
         try:
-            h_spacings = [float(x) for x in self.h_spacing.text().split() if x.strip()]
-            if h_spacings:
+            h_spacings = Spacings.parse(self.h_spacing.text())
+            if len(h_spacings) and h_spacings != self.app_state.h_spacings:
                 self.app_state.h_spacings = h_spacings
+                self.app_state.mark_modified()
         except ValueError:
             pass
         
         # Parse vertical spacings
         try:
-            v_spacings = [float(x) for x in self.v_spacing.text().split() if x.strip()]
-            if v_spacings:
+            v_spacings = Spacings.parse(self.v_spacing.text())
+            if len(v_spacings) and v_spacings != self.app_state.v_spacings:
                 self.app_state.v_spacings = v_spacings
+                self.app_state.mark_modified()
         except ValueError:
             pass
         
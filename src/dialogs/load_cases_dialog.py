@@ -0,0 +1,65 @@
+from PyQt6.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QPushButton, QGroupBox,
+    QLabel, QPlainTextEdit, QMessageBox
+)
+
+from src.analysis.load_cases import parse_combinations, format_combinations
+
+class LoadCasesDialog(QDialog):
+    def __init__(self, parent, app_state):
+        super().__init__(parent)
+        self.app_state = app_state
+        self.combinations = dict(app_state.load_combinations)
+        
+        # Set up dialog properties
+        self.setWindowTitle("Load Combinations")
+        self.setMinimumWidth(450)
+        
+        # Create layout
+        layout = QVBoxLayout(self)
+        layout.setSpacing(16)
+        
+        # Load cases group
+        cases_group = QGroupBox("Load Cases")
+        cases_layout = QVBoxLayout()
+        cases_layout.addWidget(QLabel(", ".join(app_state.load_case_names())))
+        cases_group.setLayout(cases_layout)
+        layout.addWidget(cases_group)
+        
+        # Combinations group
+        combinations_group = QGroupBox("Combinations")
+        combinations_layout = QVBoxLayout()
+        
+        self.combinations_edit = QPlainTextEdit(format_combinations(self.combinations))
+        self.combinations_edit.setPlaceholderText("ULS = 1.35*G + 1.5*Q\nSLS = G + Q")
+        combinations_layout.addWidget(self.combinations_edit)
+        
+        combinations_group.setLayout(combinations_layout)
+        layout.addWidget(combinations_group)
+        
+        # Button group
+        button_layout = QHBoxLayout()
+        
+        apply_button = QPushButton("Apply")
+        apply_button.clicked.connect(self.apply_combinations)
+        button_layout.addWidget(apply_button)
+        
+        cancel_button = QPushButton("Cancel")
+        cancel_button.clicked.connect(self.reject)
+        button_layout.addWidget(cancel_button)
+        
+        layout.addLayout(button_layout)
+    
+    def apply_combinations(self):
+        """Parse the combinations and store them in the application state"""
+        try:
+            combinations = parse_combinations(self.combinations_edit.toPlainText())
+        except ValueError as e:
+            QMessageBox.warning(self, "Load Combinations", str(e))
+            return
+        
+        # Edited combinations are an undoable step of their own
+        self.app_state.save_state()
+        self.app_state.load_combinations = combinations
+        self.app_state.mark_modified()
+        self.accept()
\ No newline at end of file
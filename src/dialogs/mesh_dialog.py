@@ -0,0 +1,102 @@
+from PyQt6.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QPushButton, QGroupBox,
+    QFormLayout, QSpinBox, QCheckBox, QComboBox
+)
+
+from src.utils.mesh import DIAGONAL_NONE, DIAGONAL_UP, DIAGONAL_DOWN, DIAGONAL_CROSS
+
+class MeshDialog(QDialog):
+    def __init__(self, parent, app_state):
+        super().__init__(parent)
+        self.app_state = app_state
+        
+        # Set up dialog properties
+        self.setWindowTitle("Mesh Grid")
+        self.setMinimumWidth(350)
+        
+        # Create layout
+        layout = QVBoxLayout(self)
+        layout.setSpacing(16)
+        
+        # Range group
+        self.create_range_group(layout)
+        
+        # Members group
+        self.create_members_group(layout)
+        
+        # Button group
+        button_layout = QHBoxLayout()
+        
+        generate_button = QPushButton("Generate")
+        generate_button.clicked.connect(self.accept)
+        button_layout.addWidget(generate_button)
+        
+        cancel_button = QPushButton("Cancel")
+        cancel_button.clicked.connect(self.reject)
+        button_layout.addWidget(cancel_button)
+        
+        layout.addLayout(button_layout)
+    
+    def create_range_group(self, layout):
+        """Create grid line range inputs"""
+        group_box = QGroupBox("Grid Range")
+        group_layout = QFormLayout()
+        
+        # Grid lines are numbered from the axis (0) to the last spacing
+        column_count = len(self.app_state.h_spacings)
+        row_count = len(self.app_state.v_spacings)
+        
+        self.first_column = self.create_spin_box(column_count, 0)
+        group_layout.addRow("First column:", self.first_column)
+        
+        self.last_column = self.create_spin_box(column_count, column_count)
+        group_layout.addRow("Last column:", self.last_column)
+        
+        self.first_row = self.create_spin_box(row_count, 0)
+        group_layout.addRow("First row:", self.first_row)
+        
+        self.last_row = self.create_spin_box(row_count, row_count)
+        group_layout.addRow("Last row:", self.last_row)
+        
+        group_box.setLayout(group_layout)
+        layout.addWidget(group_box)
+    
+    def create_members_group(self, layout):
+        """Create member generation options"""
+        group_box = QGroupBox("Members")
+        group_layout = QFormLayout()
+        
+        self.horizontal = QCheckBox("Horizontal members")
+        self.horizontal.setChecked(True)
+        group_layout.addRow(self.horizontal)
+        
+        self.vertical = QCheckBox("Vertical members")
+        self.vertical.setChecked(True)
+        group_layout.addRow(self.vertical)
+        
+        self.diagonals = QComboBox()
+        self.diagonals.addItem("None", DIAGONAL_NONE)
+        self.diagonals.addItem("Rising (/)", DIAGONAL_UP)
+        self.diagonals.addItem("Falling (\\)", DIAGONAL_DOWN)
+        self.diagonals.addItem("Cross (X)", DIAGONAL_CROSS)
+        group_layout.addRow("Diagonals:", self.diagonals)
+        
+        group_box.setLayout(group_layout)
+        layout.addWidget(group_box)
+    
+    def create_spin_box(self, maximum, value):
+        """Create a grid line index input"""
+        spin_box = QSpinBox()
+        spin_box.setRange(0, maximum)
+        spin_box.setValue(value)
+        return spin_box
+    
+    def get_options(self):
+        """Return the mesh generation options as keyword arguments"""
+        return {
+            "columns": tuple(sorted((self.first_column.value(), self.last_column.value()))),
+            "rows": tuple(sorted((self.first_row.value(), self.last_row.value()))),
+            "horizontal": self.horizontal.isChecked(),
+            "vertical": self.vertical.isChecked(),
+            "diagonals": self.diagonals.currentData()
+        }
\ No newline at end of file
@@ -1,10 +1,40 @@
-from PyQt6.QtWidgets import QWidget, QGraphicsView, QGraphicsScene
+import math
+from itertools import chain
+
+import numpy as np
+from PyQt6.QtWidgets import QWidget, QGraphicsView, QGraphicsScene, QGraphicsPixmapItem
 from PyQt6.QtCore import Qt, QRectF, QPointF, pyqtSlot, QEvent
-from PyQt6.QtGui import QPen, QBrush, QColor, QPainter, QMouseEvent, QWheelEvent
+from PyQt6.QtGui import QPen, QBrush, QColor, QPainter, QPainterPath, QPolygonF, QMouseEvent, QWheelEvent, QTransform, QPixmap
 
 from src.models.constants import NodeType, ForceType
-from src.utils.geometry import calculate_distance
+from src.utils.geometry import calculate_distance, project_point_on_segment
 from src.utils.drawing import draw_node, draw_force
+from src.utils.spatial_index import ElementIndex
+from src.utils.members_item import MembersItem
+from src.utils.snapping import SnapEngine, SNAP_NODE, SNAP_GRID, SNAP_KINDS
+from src.analysis.diagrams import result_polylines, RESULT_LAYERS, DEFORMED, AXIAL, SHEAR, MOMENT
+
+# Pen color and fill of each result layer
+RESULT_STYLES = {
+    DEFORMED: (QColor(200, 0, 200), None),
+    AXIAL: (QColor(230, 120, 0), QColor(230, 120, 0, 60)),
+    SHEAR: (QColor(0, 150, 60), QColor(0, 150, 60, 60)),
+    MOMENT: (QColor(210, 30, 30), QColor(210, 30, 30, 60))
+}
+
+# Pen color and dashing of each kind of difference found by a comparison
+DIFF_STYLES = {
+    "added": (QColor(0, 170, 0), False),
+    "removed": (QColor(220, 0, 0), True),
+    "moved": (QColor(240, 140, 0), False),
+    "moved from": (QColor(240, 140, 0), True),
+    "retyped": (QColor(160, 0, 220), False)
+}
+
+# Smallest screen distance between drawn grid lines, and between axis labels
+GRID_LINE_GAP = 4
+LABEL_GAP_X = 50
+LABEL_GAP_Y = 20
 
 class GridView(QGraphicsView):
     def __init__(self, app_state):
@@ -31,6 +61,57 @@ class GridView(QGraphicsView):
         self.is_dragging = False
         self.drag_start_pos = None
         
+        # Rubber-band selection state
+        self.rubber_band_points = []
+        self.rubber_band_lasso = False
+        self.rubber_band_item = None
+        
+        # Node drag state: the press on a node, then once the cursor moves
+        # the elements dragged, drawn by an overlay until the release
+        self.node_drag_press = None  # (x, y, node id)
+        self.node_drag_elements = None  # {(type, id)} moving with the node
+        self.node_drag_offset = (0.0, 0.0)  # Model offset so far
+        self.node_drag_overlay = None  # Pixmap item with the moved glyphs
+        self.node_drag_members = None  # (member slots, coordinates, moved ends mask)
+        self.hidden_nodes = set()  # Node slots drawn by the overlay instead
+        self.hidden_forces = set()  # Force slots drawn by the overlay or hidden
+        self.node_drag_forces = set()  # Force slots drawn by the overlay
+        
+        # Spatial index over the elements, built on first use and then kept
+        # in step with the model
+        self.element_index = None
+        
+        # Only elements inside the viewport get scene items, and a project
+        # still read from its map pages in only those
+        self.cull_to_viewport = True
+        self.paged = False  # Elements drawn from the map rather than the model
+        
+        # Snap targets, kept in step with the model, and the current one
+        self.snap_engine = SnapEngine(app_state)
+        self.snap_target = None
+        
+        # Single item drawing all members, recreated with the scene, and
+        # the QLineF buffer it shares while the members do not change
+        self.members_item = None
+        self.members_buffer = (None, [])  # (coordinates hash, buffer)
+        self.member_ids = np.zeros(0, dtype=np.int64)  # Line id of each member of the item
+        
+        # Glyph items of the nodes and forces drawn, by id, so a batch of
+        # changes only replaces the glyphs of the elements involved
+        self.node_items = {}
+        self.force_items = {}
+        
+        # Analysis results drawn as overlay layers
+        self.analysis_result = None
+        self.result_layers = set()
+        self.result_scale = 1.0
+        self.result_paths = {}  # (result id, layer, scale, segments) -> path in meters
+        
+        # Differences with another revision of the model, highlighted
+        # over the elements
+        self.model_diff = None
+        self.diff_highlights = None  # Kind -> (node points, member segments) in meters
+        
         # Initialize the view
         self.reset_transform()
         self.update_grid()
@@ -44,6 +125,9 @@ class GridView(QGraphicsView):
     def update_grid(self):
         """Update and draw the grid"""
         self.scene.clear()
+        self.rubber_band_item = None
+        self.selection_highlight = None
+        self.members_item = None
         
         # Update background color
         self.setBackgroundBrush(QBrush(QColor(self.app_state.grid_bg_color)))
@@ -54,20 +138,111 @@ class GridView(QGraphicsView):
         # Draw grid lines
         self.draw_grid()
         
+        # Draw analysis results under the elements
+        self.draw_results()
+        
         # Draw nodes, lines, and forces
         self.draw_elements()
     
     def update(self):
         """Update the view"""
         self.scene.clear()
+        self.rubber_band_item = None
+        self.selection_highlight = None
+        self.members_item = None
         
         # Draw coordinate system and grid
         self.draw_coordinate_system()
         self.draw_grid()
         
+        # Draw analysis results under the elements
+        self.draw_results()
+        
         # Draw nodes, lines, and forces
         self.draw_elements()
     
+    def on_elements_changed(self, changes):
+        """Update the scene for a batch of model changes
+        
+        Only the members and glyphs of the elements in the batch are
+        replaced, the rest of the scene is kept. Resets redraw it all.
+        """
+        if changes.reset or self.members_item is None or self.paged:
+            self.update()
+            return
+        
+        self.update_members(changes)
+        self.update_glyphs(changes, "node", self.node_items)
+        self.update_glyphs(changes, "force", self.force_items)
+        
+        # The highlight follows the selected elements, and goes with a
+        # selection cleared by the model
+        selection = self.app_state.selection
+        touched = any(
+            (element_type, element_id) in selection for element_type in changes.element_types()
+            for element_id in chain(changes.removed[element_type], changes.modified[element_type])
+        )
+        if touched or (self.selection_highlight is not None and not selection):
+            self.update_selection()
+    
+    def update_members(self, changes):
+        """Patch the members item with the lines added, removed and moved by a batch of changes"""
+        app_state = self.app_state
+        count = len(app_state.lines)
+        rows = [app_state.slot("line", i) for i in chain(changes.added["line"], changes.modified["line"])]
+        rows = np.array(rows, dtype=np.int64)
+        
+        # Removals move lines to other slots, found by comparing the ids
+        # the members were drawn with
+        if changes.removed["line"]:
+            ids = np.fromiter(app_state.lines, dtype=np.int64, count=count)
+            kept = min(count, len(self.member_ids))
+            moved = np.flatnonzero(ids[:kept] != self.member_ids[:kept])
+            rows = np.union1d(rows, np.concatenate([moved, np.arange(kept, count)]))
+            self.member_ids = ids
+        elif count > len(self.member_ids):
+            new_ids = np.fromiter(app_state.lines[len(self.member_ids):], dtype=np.int64)
+            self.member_ids = np.concatenate([self.member_ids, new_ids])
+        
+        if not len(rows) and count == len(self.members_item.lines):
+            return
+        self.members_item.resize(count)
+        if len(rows):
+            lines = np.array([app_state.line_positions[i] for i in rows.tolist()], dtype=np.float64)
+            self.members_item.set_members(rows, lines.reshape(-1, 4))
+        
+        # The buffer no longer matches the coordinates it was hashed from
+        self.members_buffer = (None, [])
+    
+    def update_glyphs(self, changes, element_type, items):
+        """Replace the glyphs of the nodes or forces in a batch of changes"""
+        for element_id in chain(changes.removed[element_type], changes.modified[element_type]):
+            item = items.pop(element_id, None)
+            if item is not None:
+                self.scene.removeItem(item)
+        
+        app_state = self.app_state
+        zoom = app_state.zoom_level
+        left, top, right, bottom = self.visible_rect(50 * zoom)
+        hidden = self.hidden_nodes if element_type == "node" else self.hidden_forces
+        for element_id in chain(changes.added[element_type], changes.modified[element_type]):
+            slot = app_state.slot(element_type, element_id)
+            if slot in hidden:
+                continue
+            
+            positions = app_state.node_positions if element_type == "node" else app_state.force_positions
+            screen_x, screen_y = self.model_to_screen(*positions[slot])
+            if not (left <= screen_x <= right and top <= screen_y <= bottom):
+                continue
+            
+            if element_type == "node":
+                item = draw_node(self.scene, screen_x, screen_y, app_state.node_types[slot], zoom)
+            else:
+                item = draw_force(self.scene, screen_x, screen_y, app_state.force_types[slot],
+                                  app_state.force_values[slot], zoom)
+            if item is not None:
+                items[element_id] = item
+    
     def draw_coordinate_system(self):
         """Draw the coordinate system with axes and labels"""
         # Get coordinate system parameters
@@ -101,33 +276,30 @@ class GridView(QGraphicsView):
         self.scene.addText(v_label).setPos(origin_x - 10, origin_y - v_length - 30)
         self.scene.addText("O").setPos(origin_x - 20, origin_y + 10)
         
+        # Only graduations in the visible range are drawn, and labels that
+        # would overlap are skipped
+        h_spacings, v_spacings = self.app_state.h_spacings, self.app_state.v_spacings
+        x_scale = self.app_state.scale_factor_x * self.app_state.zoom_level
+        y_scale = self.app_state.scale_factor_y * self.app_state.zoom_level
+        x_low, x_high, y_low, y_high = self.axis_range(LABEL_GAP_X)
+        
         # Add graduations on horizontal axis
-        x = origin_x
-        total_distance = 0
-        for spacing in self.app_state.h_spacings:
-            x += spacing * self.app_state.scale_factor_x * self.app_state.zoom_level
-            total_distance += spacing
-            
-            # Graduation line
+        for line, distance in h_spacings.lines_between(x_low, x_high, GRID_LINE_GAP / x_scale, axis=False):
+            x = origin_x + distance * x_scale
             self.scene.addLine(x, origin_y - 5, x, origin_y + 5, x_axis_pen)
-            
-            # Graduation label
-            label = self.scene.addText(f"{total_distance:.1f}")
-            label.setPos(x - 10, origin_y + 10)
+        
+        for line, distance in h_spacings.lines_between(x_low, x_high, LABEL_GAP_X / x_scale, axis=False):
+            label = self.scene.addText(f"{distance:.1f}")
+            label.setPos(origin_x + distance * x_scale - 10, origin_y + 10)
         
         # Add graduations on vertical axis
-        y = origin_y
-        total_distance = 0
-        for spacing in self.app_state.v_spacings:
-            y -= spacing * self.app_state.scale_factor_y * self.app_state.zoom_level
-            total_distance += spacing
-            
-            # Graduation line
+        for line, distance in v_spacings.lines_between(y_low, y_high, GRID_LINE_GAP / y_scale, axis=False):
+            y = origin_y - distance * y_scale
             self.scene.addLine(origin_x - 5, y, origin_x + 5, y, y_axis_pen)
-            
-            # Graduation label
-            label = self.scene.addText(f"{total_distance:.1f}")
-            label.setPos(origin_x - 30, y - 10)
+        
+        for line, distance in v_spacings.lines_between(y_low, y_high, LABEL_GAP_Y / y_scale, axis=False):
+            label = self.scene.addText(f"{distance:.1f}")
+            label.setPos(origin_x - 30, origin_y - distance * y_scale - 10)
     
     def draw_grid(self):
         """Draw the grid lines"""
@@ -147,64 +319,107 @@ class GridView(QGraphicsView):
         main_grid_pen = QPen(QColor("#606060"))
         main_grid_pen.setWidth(2)
         
+        # Draw the visible grid lines, skipping lines too close to be told apart
+        x_scale = self.app_state.scale_factor_x * self.app_state.zoom_level
+        y_scale = self.app_state.scale_factor_y * self.app_state.zoom_level
+        x_low, x_high, y_low, y_high = self.axis_range()
+        h_spacings, v_spacings = self.app_state.h_spacings, self.app_state.v_spacings
+        
         # Draw vertical grid lines
-        x = origin_x
-        for i, spacing in enumerate(self.app_state.h_spacings):
-            x += spacing * self.app_state.scale_factor_x * self.app_state.zoom_level
+        for line, distance in h_spacings.lines_between(x_low, x_high, GRID_LINE_GAP / x_scale, axis=False):
+            x = origin_x + distance * x_scale
             
             # Use thicker pen for every 5th line
-            pen = main_grid_pen if (i + 1) % 5 == 0 else grid_pen
+            pen = main_grid_pen if line % 5 == 0 else grid_pen
             self.scene.addLine(x, origin_y, x, origin_y - v_length, pen)
         
         # Draw horizontal grid lines
-        y = origin_y
-        for i, spacing in enumerate(self.app_state.v_spacings):
-            y -= spacing * self.app_state.scale_factor_y * self.app_state.zoom_level
+        for line, distance in v_spacings.lines_between(y_low, y_high, GRID_LINE_GAP / y_scale, axis=False):
+            y = origin_y - distance * y_scale
             
             # Use thicker pen for every 5th line
-            pen = main_grid_pen if (i + 1) % 5 == 0 else grid_pen
+            pen = main_grid_pen if line % 5 == 0 else grid_pen
             self.scene.addLine(origin_x, y, origin_x + h_length, y, pen)
     
     def draw_elements(self):
-        """Draw all nodes, lines, and forces"""
-        # Draw lines first (so they're behind nodes)
-        for i, (x1, y1, x2, y2) in enumerate(self.app_state.line_positions):
-            # Convert real coordinates to screen coordinates
-            screen_x1 = self.app_state.origin_x + (x1 - self.app_state.origin_x) * self.app_state.zoom_level
-            screen_y1 = self.app_state.origin_y + (y1 - self.app_state.origin_y) * self.app_state.zoom_level
-            screen_x2 = self.app_state.origin_x + (x2 - self.app_state.origin_x) * self.app_state.zoom_level
-            screen_y2 = self.app_state.origin_y + (y2 - self.app_state.origin_y) * self.app_state.zoom_level
-            
-            # Draw line
-            line_pen = QPen(QColor("blue"))
-            line_pen.setWidth(max(2, int(3 * self.app_state.zoom_level)))
-            self.scene.addLine(screen_x1, screen_y1, screen_x2, screen_y2, line_pen)
+        """Draw the nodes, lines, and forces inside the visible area"""
+        # Elements outside the viewport (plus a margin for glyphs) get no item
+        left, top, right, bottom = self.visible_rect(50 * self.app_state.zoom_level)
+        
+        # A project whose elements are still in its map has nothing else
+        # to draw, as selecting or editing builds the element lists
+        self.paged = self.app_state.mapped_elements is not None
+        if self.paged:
+            self.draw_mapped_elements(left, top, right, bottom)
+            self.draw_diff()
+            return
+        
+        # Draw lines first (so they're behind nodes), all in one item that
+        # paints the members inside the exposed area. The item works in
+        # model coordinates, so its line buffer survives zooming.
+        zoom = self.app_state.zoom_level
+        origin_x, origin_y = self.app_state.origin_x, self.app_state.origin_y
+        lines = np.asarray(self.app_state.line_positions, dtype=np.float64).reshape(-1, 4)
+        key = hash(lines.tobytes())
+        if self.members_buffer[0] != key:
+            self.members_buffer = (key, [None] * len(lines))
+        
+        line_pen = QPen(QColor("blue"))
+        line_pen.setWidthF(max(2, int(3 * zoom)) / zoom)
+        self.members_item = MembersItem(lines, line_pen, self.members_buffer[1])
+        self.members_item.setTransform(QTransform(zoom, 0, 0, zoom, origin_x * (1 - zoom), origin_y * (1 - zoom)))
+        self.scene.addItem(self.members_item)
+        self.member_ids = np.fromiter(self.app_state.lines, dtype=np.int64, count=len(lines))
+        self.node_items = {}
+        self.force_items = {}
         
         # Draw nodes
         for i, (x, y) in enumerate(self.app_state.node_positions):
+            if i in self.hidden_nodes:
+                continue
+            
             # Convert real coordinates to screen coordinates
             screen_x = self.app_state.origin_x + (x - self.app_state.origin_x) * self.app_state.zoom_level
             screen_y = self.app_state.origin_y + (y - self.app_state.origin_y) * self.app_state.zoom_level
+            if not (left <= screen_x <= right and top <= screen_y <= bottom):
+                continue
             
             # Draw node
             node_type = self.app_state.node_types[i]
-            draw_node(self.scene, screen_x, screen_y, node_type, self.app_state.zoom_level)
+            item = draw_node(self.scene, screen_x, screen_y, node_type, self.app_state.zoom_level)
+            if item is not None:
+                self.node_items[self.app_state.nodes[i]] = item
         
         # Draw forces
         for i, (x, y) in enumerate(self.app_state.force_positions):
+            if i in self.hidden_forces:
+                continue
+            
             # Convert real coordinates to screen coordinates
             screen_x = self.app_state.origin_x + (x - self.app_state.origin_x) * self.app_state.zoom_level
             screen_y = self.app_state.origin_y + (y - self.app_state.origin_y) * self.app_state.zoom_level
+            if not (left <= screen_x <= right and top <= screen_y <= bottom):
+                continue
             
             # Draw force
             force_type = self.app_state.force_types[i]
             force_value = self.app_state.force_values[i]
-            draw_force(self.scene, screen_x, screen_y, force_type, force_value, self.app_state.zoom_level)
+            item = draw_force(self.scene, screen_x, screen_y, force_type, force_value, self.app_state.zoom_level)
+            if item is not None:
+                self.force_items[self.app_state.forces[i]] = item
+        
+        # Draw the differences of a comparison
+        self.draw_diff()
+        
+        # Draw selection highlights, or the elements being dragged
+        if self.node_drag_elements is None:
+            self.draw_selection()
+        else:
+            self.draw_node_drag()
         
         # Draw temporary line during drawing
         if self.current_line and self.start_node is not None:
-            start_node_idx = self.app_state.nodes.index(self.start_node)
-            start_x, start_y = self.app_state.node_positions[start_node_idx]
+            start_x, start_y = self.app_state.node_positions[self.app_state.slot("node", self.start_node)]
             
             # Convert to screen coordinates
             screen_x = self.app_state.origin_x + (start_x - self.app_state.origin_x) * self.app_state.zoom_level
@@ -215,6 +430,266 @@ class GridView(QGraphicsView):
             temp_pen.setWidth(2)
             temp_pen.setStyle(Qt.PenStyle.DashLine)
             self.scene.addLine(screen_x, screen_y, self.current_line[0], self.current_line[1], temp_pen)
+            
+            # Mark the snap target with a small square
+            if self.snap_target is not None:
+                snap_pen = QPen(QColor("orange"))
+                snap_pen.setWidth(2)
+                self.scene.addRect(self.snap_target[1] - 6, self.snap_target[2] - 6, 12, 12, snap_pen)
+    
+    def draw_mapped_elements(self, left, top, right, bottom):
+        """Draw the elements inside a scene area from the map of the project, paging in only those"""
+        app_state = self.app_state
+        zoom = app_state.zoom_level
+        origin_x, origin_y = app_state.origin_x, app_state.origin_y
+        
+        # The records are looked up by the scene area in model coordinates
+        elements = app_state.mapped_elements.visible(
+            app_state, *self.screen_to_model(left, top), *self.screen_to_model(right, bottom)
+        )
+        
+        # Members, in one item working in model coordinates
+        self.member_ids, lines = elements["line"]
+        key = hash(lines.tobytes())
+        if self.members_buffer[0] != key:
+            self.members_buffer = (key, [None] * len(lines))
+        line_pen = QPen(QColor("blue"))
+        line_pen.setWidthF(max(2, int(3 * zoom)) / zoom)
+        self.members_item = MembersItem(lines, line_pen, self.members_buffer[1])
+        self.members_item.setTransform(QTransform(zoom, 0, 0, zoom, origin_x * (1 - zoom), origin_y * (1 - zoom)))
+        self.scene.addItem(self.members_item)
+        
+        # Node and force glyphs
+        self.node_items = {}
+        self.force_items = {}
+        ids, positions, node_types = elements["node"]
+        for node_id, (x, y), node_type in zip(ids.tolist(), positions.tolist(), node_types):
+            item = draw_node(self.scene, *self.model_to_screen(x, y), node_type, zoom)
+            if item is not None:
+                self.node_items[node_id] = item
+        ids, positions, force_types, force_values = elements["force"]
+        for force_id, (x, y), force_type, force_value in zip(ids.tolist(), positions.tolist(), force_types, force_values):
+            item = draw_force(self.scene, *self.model_to_screen(x, y), force_type, force_value, zoom)
+            if item is not None:
+                self.force_items[force_id] = item
+    
+    def update_selection(self):
+        """Redraw the selection highlight alone, after the selection changed"""
+        if self.selection_highlight is not None:
+            self.scene.removeItem(self.selection_highlight)
+        self.draw_selection()
+    
+    def draw_selection(self):
+        """Highlight all selected elements with a single path item"""
+        self.selection_highlight = None
+        if not self.app_state.selection:
+            return
+        
+        path = QPainterPath()
+        size = 16 * self.app_state.zoom_level
+        for element_type, element_id in self.app_state.selection:
+            slot = self.app_state.slot(element_type, element_id)
+            if slot is None:
+                continue
+            
+            if element_type == "line":
+                x1, y1, x2, y2 = self.app_state.line_positions[slot]
+                screen_x1, screen_y1 = self.model_to_screen(x1, y1)
+                screen_x2, screen_y2 = self.model_to_screen(x2, y2)
+                path.moveTo(screen_x1, screen_y1)
+                path.lineTo(screen_x2, screen_y2)
+            else:
+                positions = self.app_state.node_positions if element_type == "node" else self.app_state.force_positions
+                screen_x, screen_y = self.model_to_screen(*positions[slot])
+                path.addEllipse(QPointF(screen_x, screen_y), size, size)
+        
+        highlight_pen = QPen(QColor("yellow"))
+        highlight_pen.setWidth(max(2, int(3 * self.app_state.zoom_level)))
+        highlight_pen.setStyle(Qt.PenStyle.DashLine)
+        self.selection_highlight = self.scene.addPath(path, highlight_pen, QBrush(Qt.BrushStyle.NoBrush))
+    
+    def draw_diff(self):
+        """Highlight the differences of a comparison, one path item per kind"""
+        if self.diff_highlights is None:
+            return
+        
+        # Highlights are kept in meters and placed in the current view,
+        # skipping the ones outside the viewport
+        zoom = self.app_state.zoom_level
+        sx, sy = self.app_state.scale_factor_x * zoom, -self.app_state.scale_factor_y * zoom
+        origin = np.array((self.app_state.origin_x, self.app_state.origin_y))
+        left, top, right, bottom = self.visible_rect(50 * zoom)
+        size = 12 * zoom
+        
+        for kind, (points, segments) in self.diff_highlights.items():
+            points = origin + points * (sx, sy)
+            points = points[
+                (points[:, 0] >= left) & (points[:, 0] <= right) & (points[:, 1] >= top) & (points[:, 1] <= bottom)
+            ]
+            segments = np.tile(origin, 2) + segments * (sx, sy, sx, sy)
+            segments = segments[
+                (np.maximum(segments[:, 0], segments[:, 2]) >= left) & (np.minimum(segments[:, 0], segments[:, 2]) <= right)
+                & (np.maximum(segments[:, 1], segments[:, 3]) >= top) & (np.minimum(segments[:, 1], segments[:, 3]) <= bottom)
+            ]
+            if not len(points) and not len(segments):
+                continue
+            
+            path = QPainterPath()
+            for x, y in points.tolist():
+                path.addEllipse(QPointF(x, y), size, size)
+            for x1, y1, x2, y2 in segments.tolist():
+                path.moveTo(x1, y1)
+                path.lineTo(x2, y2)
+            
+            color, dashed = DIFF_STYLES[kind]
+            pen = QPen(color)
+            pen.setWidth(max(2, int(4 * zoom)))
+            if dashed:
+                pen.setStyle(Qt.PenStyle.DashLine)
+            self.scene.addPath(path, pen, QBrush(Qt.BrushStyle.NoBrush))
+    
+    def draw_results(self):
+        """Draw the visible result layers, one path item per layer"""
+        if self.analysis_result is None or not self.result_layers:
+            return
+        
+        # Diagrams are built in meters and placed with the view transform
+        transform = QTransform(
+            self.app_state.scale_factor_x * self.app_state.zoom_level, 0,
+            0, -self.app_state.scale_factor_y * self.app_state.zoom_level,
+            self.app_state.origin_x, self.app_state.origin_y
+        )
+        
+        for layer in RESULT_LAYERS:
+            if layer not in self.result_layers:
+                continue
+            
+            color, fill = RESULT_STYLES[layer]
+            pen = QPen(color)
+            pen.setWidth(2)
+            pen.setCosmetic(True)
+            if layer == DEFORMED:
+                pen.setStyle(Qt.PenStyle.DashLine)
+            brush = QBrush(fill) if fill is not None else QBrush(Qt.BrushStyle.NoBrush)
+            
+            item = self.scene.addPath(self.get_result_path(layer), pen, brush)
+            item.setTransform(transform)
+    
+    def get_result_path(self, layer):
+        """Return the cached path of a result layer, building it if needed
+        
+        Paths are cached per result, scale and zoom bucket. Each zoom bucket
+        doubles the number of points sampled along every member.
+        """
+        bucket = round(math.log2(self.app_state.zoom_level))
+        segments = min(32, max(2, int(8 * 2 ** bucket)))
+        key = (id(self.analysis_result), layer, self.result_scale, segments)
+        
+        path = self.result_paths.get(key)
+        if path is None:
+            polylines = result_polylines(self.analysis_result, layer, segments, self.result_scale)
+            path = QPainterPath()
+            for polyline in polylines.tolist():
+                path.addPolygon(QPolygonF([QPointF(x, y) for x, y in polyline]))
+            self.result_paths[key] = path
+        
+        return path
+    
+    def set_analysis_result(self, result):
+        """Set the analysis result shown by the result layers"""
+        self.analysis_result = result
+        self.result_paths = {}
+        if self.result_layers:
+            self.update()
+    
+    def set_model_diff(self, diff):
+        """Highlight the differences of a comparison, None clears them"""
+        self.model_diff = diff
+        self.diff_highlights = diff.highlights() if diff is not None else None
+        self.update()
+    
+    def set_result_layer(self, layer, visible):
+        """Show or hide a result layer"""
+        if visible:
+            self.result_layers.add(layer)
+        else:
+            self.result_layers.discard(layer)
+        self.update()
+    
+    def set_result_scale(self, scale):
+        """Set the magnification of deformed shapes and diagrams"""
+        self.result_scale = scale
+        self.result_paths = {}
+        self.update()
+    
+    def visible_rect(self, margin=0):
+        """Return the (left, top, right, bottom) scene area shown in the viewport"""
+        if not self.cull_to_viewport:
+            return -math.inf, -math.inf, math.inf, math.inf
+        
+        rect = self.mapToScene(self.viewport().rect()).boundingRect()
+        return rect.left() - margin, rect.top() - margin, rect.right() + margin, rect.bottom() + margin
+    
+    def axis_range(self, margin=0):
+        """Return the (x_low, x_high, y_low, y_high) distances from the axes shown in the viewport (m)"""
+        left, top, right, bottom = self.visible_rect(margin)
+        x_scale = self.app_state.scale_factor_x * self.app_state.zoom_level
+        y_scale = self.app_state.scale_factor_y * self.app_state.zoom_level
+        return (
+            (left - self.app_state.origin_x) / x_scale, (right - self.app_state.origin_x) / x_scale,
+            (self.app_state.origin_y - bottom) / y_scale, (self.app_state.origin_y - top) / y_scale
+        )
+    
+    def build_export_scene(self):
+        """Draw the whole model into a new scene for export
+        
+        The view's own scene is left untouched and nothing is culled.
+        
+        Returns:
+            QGraphicsScene holding the axes, grid, results and all elements
+        """
+        view_scene = self.scene
+        members_item = self.members_item
+        view_items = (self.member_ids, self.node_items, self.force_items)
+        selection_highlight = self.selection_highlight
+        selection = self.app_state.selection
+        self.scene = QGraphicsScene()
+        self.app_state.selection = set()
+        self.cull_to_viewport = False
+        try:
+            self.draw_coordinate_system()
+            self.draw_grid()
+            self.draw_results()
+            self.draw_elements()
+            return self.scene
+        finally:
+            self.scene = view_scene
+            self.members_item = members_item
+            self.member_ids, self.node_items, self.force_items = view_items
+            self.selection_highlight = selection_highlight
+            self.app_state.selection = selection
+            self.cull_to_viewport = True
+    
+    def resizeEvent(self, event):
+        """Draw the elements that come into view when the view grows"""
+        super().resizeEvent(event)
+        self.update()
+    
+    def model_to_screen(self, x, y):
+        """Convert model coordinates to screen coordinates"""
+        return (self.app_state.origin_x + (x - self.app_state.origin_x) * self.app_state.zoom_level,
+                self.app_state.origin_y + (y - self.app_state.origin_y) * self.app_state.zoom_level)
+    
+    def screen_to_model(self, x, y):
+        """Convert screen coordinates to model coordinates"""
+        return (self.app_state.origin_x + (x - self.app_state.origin_x) / self.app_state.zoom_level,
+                self.app_state.origin_y + (y - self.app_state.origin_y) / self.app_state.zoom_level)
+    
+    def get_element_index(self):
+        """Return the spatial index, building it on first use"""
+        if self.element_index is None:
+            self.element_index = ElementIndex(self.app_state)
+        return self.element_index
     
     def update_scale(self, axis, value):
         """Update scale for an axis"""
@@ -223,6 +698,8 @@ class GridView(QGraphicsView):
         else:
             self.app_state.scale_factor_y = 100 * value
         
+        # Coordinates in meters change with the scale
+        self.app_state.mark_modified(*self.app_state.ELEMENT_LISTS)
         self.update()
     
     def zoom(self, factor):
@@ -257,7 +734,8 @@ class GridView(QGraphicsView):
             if self.app_state.force_placement_mode:
                 self.place_force(x, y)
             elif self.app_state.selection_mode:
-                self.select_element(x, y)
+                if not self.start_node_drag(x, y, event.modifiers()):
+                    self.start_rubber_band(x, y, event.modifiers())
             else:
                 self.start_drawing(x, y)
         
@@ -279,9 +757,18 @@ class GridView(QGraphicsView):
         pos = self.mapToScene(event.pos())
         x, y = pos.x(), pos.y()
         
-        # Update current line if drawing
+        # Extend the rubber band while selecting
+        if self.rubber_band_points and event.buttons() & Qt.MouseButton.LeftButton:
+            self.extend_rubber_band(x, y)
+        
+        # Move the dragged nodes
+        if self.node_drag_press and event.buttons() & Qt.MouseButton.LeftButton:
+            self.extend_node_drag(x, y)
+        
+        # Update current line if drawing, following the snap target
         if self.current_line and event.buttons() & Qt.MouseButton.LeftButton:
-            self.current_line = (x, y)
+            self.snap_target = self.snap(x, y)
+            self.current_line = self.snap_target[1:3] if self.snap_target else (x, y)
             self.update()
         
         # Pan view if middle button is pressed
@@ -290,6 +777,14 @@ class GridView(QGraphicsView):
             self.app_state.origin_x += delta.x()
             self.app_state.origin_y += delta.y()
             
+            # A project still read from its map is placed from the origin
+            # alone, and its elements stay in the map
+            if self.app_state.mapped_elements is not None:
+                self.drag_start_pos = pos
+                self.update()
+                super().mouseMoveEvent(event)
+                return
+            
             # Update all node positions
             for i in range(len(self.app_state.node_positions)):
                 x, y = self.app_state.node_positions[i]
@@ -301,6 +796,11 @@ class GridView(QGraphicsView):
                 self.app_state.line_positions[i] = (x1 + delta.x(), y1 + delta.y(), 
                                                   x2 + delta.x(), y2 + delta.y())
             
+            # Update all force positions
+            for i in range(len(self.app_state.force_positions)):
+                x, y = self.app_state.force_positions[i]
+                self.app_state.force_positions[i] = (x + delta.x(), y + delta.y())
+            
             # Update view
             self.drag_start_pos = pos
             self.update()
@@ -312,6 +812,14 @@ class GridView(QGraphicsView):
         pos = self.mapToScene(event.pos())
         x, y = pos.x(), pos.y()
         
+        # Finish rubber-band selection
+        if self.rubber_band_points and event.button() == Qt.MouseButton.LeftButton:
+            self.finish_rubber_band(x, y, event.modifiers())
+        
+        # Drop the dragged nodes
+        if self.node_drag_press and event.button() == Qt.MouseButton.LeftButton:
+            self.finish_node_drag(x, y)
+        
         # Finish drawing line
         if self.current_line and event.button() == Qt.MouseButton.LeftButton:
             self.finish_line(x, y)
@@ -330,55 +838,41 @@ class GridView(QGraphicsView):
         factor = 1.1 if event.angleDelta().y() > 0 else 0.9
         self.zoom(factor)
     
-    def find_closest_node(self, x, y, max_distance=30):
-        """Find the closest node to the given position"""
-        min_distance = float('inf')
-        closest_node = None
-        closest_idx = -1
+    def snap(self, x, y, kinds=SNAP_KINDS, snap_distance=10, node_distance=30):
+        """Find the snap target under a screen position
         
-        for i, (node_x, node_y) in enumerate(self.app_state.node_positions):
-            # Convert to screen coordinates
-            screen_x = self.app_state.origin_x + (node_x - self.app_state.origin_x) * self.app_state.zoom_level
-            screen_y = self.app_state.origin_y + (node_y - self.app_state.origin_y) * self.app_state.zoom_level
-            
-            # Calculate distance
-            distance = calculate_distance(x, y, screen_x, screen_y)
-            
-            if distance < min_distance and distance < max_distance:
-                min_distance = distance
-                closest_node = i
-                closest_idx = i
+        Nodes are reached within node_distance pixels and the other targets
+        (midpoints, crossings, perpendicular feet from the line being drawn,
+        grid points) within snap_distance, in that priority order.
+        
+        Returns:
+            Tuple (kind, x, y, id) in screen coordinates, or None
+        """
+        zoom = self.app_state.zoom_level
+        model_x, model_y = self.screen_to_model(x, y)
+        anchor = None
+        if self.start_node is not None:
+            anchor = self.app_state.node_positions[self.app_state.slot("node", self.start_node)]
         
-        return closest_node, closest_idx
+        snap = self.snap_engine.snap(model_x, model_y, snap_distance / zoom, node_distance / zoom, anchor, kinds)
+        if snap is None:
+            return None
+        
+        kind, snap_x, snap_y, index = snap
+        return (kind, *self.model_to_screen(snap_x, snap_y), index)
     
     def find_grid_intersection(self, x, y, snap_distance=10):
         """Find the closest grid intersection to the given position"""
         origin_x = self.app_state.origin_x
         origin_y = self.app_state.origin_y
         
-        # Find closest x coordinate
-        closest_x = origin_x
-        min_x_dist = float('inf')
-        
-        curr_x = origin_x
-        for spacing in self.app_state.h_spacings:
-            curr_x += spacing * self.app_state.scale_factor_x * self.app_state.zoom_level
-            dist = abs(x - curr_x)
-            if dist < min_x_dist:
-                min_x_dist = dist
-                closest_x = curr_x
-        
-        # Find closest y coordinate
-        closest_y = origin_y
-        min_y_dist = float('inf')
-        
-        curr_y = origin_y
-        for spacing in self.app_state.v_spacings:
-            curr_y -= spacing * self.app_state.scale_factor_y * self.app_state.zoom_level
-            dist = abs(y - curr_y)
-            if dist < min_y_dist:
-                min_y_dist = dist
-                closest_y = curr_y
+        # Closest grid lines, found by distance from the axes
+        x_scale = self.app_state.scale_factor_x * self.app_state.zoom_level
+        y_scale = self.app_state.scale_factor_y * self.app_state.zoom_level
+        closest_x = origin_x + self.app_state.h_spacings.nearest((x - origin_x) / x_scale)[1] * x_scale
+        closest_y = origin_y - self.app_state.v_spacings.nearest((origin_y - y) / y_scale)[1] * y_scale
+        min_x_dist = abs(x - closest_x)
+        min_y_dist = abs(y - closest_y)
         
         # Return intersection if close enough
         if min_x_dist < snap_distance and min_y_dist < snap_distance:
@@ -391,30 +885,22 @@ class GridView(QGraphicsView):
         # Save state for undo
         self.app_state.save_state()
         
-        # Find closest node
-        closest_node, closest_idx = self.find_closest_node(x, y)
+        # Snap to a node, or create one at another snap target
+        snap = self.snap(x, y)
         
-        if closest_node is not None:
+        if snap is not None and snap[0] == SNAP_NODE:
             # Start a line from this node
-            self.start_node = closest_node
+            self.start_node = snap[3]
             self.current_line = (x, y)
-        else:
-            # Find grid intersection
-            intersection = self.find_grid_intersection(x, y)
+        elif snap is not None:
+            snap_x, snap_y = snap[1], snap[2]
+            
+            # Convert to real coordinates
+            real_x, real_y = self.screen_to_model(snap_x, snap_y)
             
-            if intersection:
-                grid_x, grid_y = intersection
-                
-                # Convert to real coordinates
-                real_x = self.app_state.origin_x + (grid_x - self.app_state.origin_x) / self.app_state.zoom_level
-                real_y = self.app_state.origin_y + (grid_y - self.app_state.origin_y) / self.app_state.zoom_level
-                
-                # Create new node
-                self.app_state.add_node(real_x, real_y, self.app_state.current_node_type)
-                
-                # Start a line from this node
-                self.start_node = len(self.app_state.nodes) - 1
-                self.current_line = (grid_x, grid_y)
+            # Create new node and start a line from it
+            self.start_node = self.app_state.add_node(real_x, real_y, self.app_state.current_node_type)
+            self.current_line = (snap_x, snap_y)
         
         self.update()
     
@@ -423,77 +909,311 @@ class GridView(QGraphicsView):
         if self.start_node is None:
             return
         
-        # Find closest node
-        end_node, end_idx = self.find_closest_node(x, y)
+        # The temporary line goes with the redraw of the model changes, or
+        # with an explicit one when nothing was added
+        start_node = self.start_node
+        self.start_node = None
+        self.current_line = None
+        self.snap_target = None
+        revision = self.app_state.revision
+        
+        # Snap to a node, or create one at another snap target
+        snap = self.snap(x, y)
+        end_node = None
+        if snap is not None and snap[0] == SNAP_NODE:
+            end_node = snap[3]
+        elif snap is not None:
+            real_x, real_y = self.screen_to_model(snap[1], snap[2])
+            end_node = self.app_state.add_node(real_x, real_y, self.app_state.current_node_type)
         
-        if end_node is not None and end_node != self.start_node:
+        if end_node is not None and end_node != start_node:
             # Get start and end positions
-            start_x, start_y = self.app_state.node_positions[self.start_node]
-            end_x, end_y = self.app_state.node_positions[end_node]
+            start_x, start_y = self.app_state.node_positions[self.app_state.slot("node", start_node)]
+            end_x, end_y = self.app_state.node_positions[self.app_state.slot("node", end_node)]
             
             # Add line
             self.app_state.add_line(start_x, start_y, end_x, end_y)
-        
-        self.start_node = None
-        self.current_line = None
-        self.update()
+        if self.app_state.revision == revision:
+            self.update()
     
-    def select_element(self, x, y):
+    def select_element(self, x, y, add=False):
         """Select an element at the given position"""
-        # Clear current selection
-        if self.selection_highlight:
-            self.scene.removeItem(self.selection_highlight)
-            self.selection_highlight = None
+        if not add:
+            self.app_state.selection = set()
+        self.app_state.selected_element = None
         
-        # Find closest node
-        node, node_idx = self.find_closest_node(x, y)
+        # Find the element under the cursor
+        element = self.hit_test(x, y)
         
-        if node is not None:
-            # Highlight the node
-            node_x, node_y = self.app_state.node_positions[node]
-            
-            # Convert to screen coordinates
-            screen_x = self.app_state.origin_x + (node_x - self.app_state.origin_x) * self.app_state.zoom_level
-            screen_y = self.app_state.origin_y + (node_y - self.app_state.origin_y) * self.app_state.zoom_level
-            
-            # Create highlight
-            size = 16 * self.app_state.zoom_level
-            highlight_pen = QPen(QColor("yellow"))
-            highlight_pen.setWidth(2)
-            highlight_pen.setStyle(Qt.PenStyle.DashLine)
-            
-            self.selection_highlight = self.scene.addEllipse(
-                screen_x - size, screen_y - size, size * 2, size * 2, 
-                highlight_pen, QBrush(Qt.BrushStyle.NoBrush)
-            )
-            
+        if element is not None:
             # Set selected element
-            self.app_state.selected_element = ("node", node)
+            self.app_state.selected_element = element
+            self.app_state.selection.add(element)
             
             # Show force dialog or handle selection action
             # (This would be implemented in a separate method)
         
+        self.update_selection()
+    
+    def start_rubber_band(self, x, y, modifiers):
+        """Start a box selection, or a lasso selection when Shift is held"""
+        self.rubber_band_points = [(x, y)]
+        self.rubber_band_lasso = bool(modifiers & Qt.KeyboardModifier.ShiftModifier)
+    
+    def extend_rubber_band(self, x, y):
+        """Update the rubber band outline while dragging"""
+        if self.rubber_band_lasso:
+            self.rubber_band_points.append((x, y))
+        else:
+            self.rubber_band_points[1:] = [(x, y)]
+        
+        if self.rubber_band_item is None:
+            band_pen = QPen(QColor("#3080ff"))
+            band_pen.setStyle(Qt.PenStyle.DashLine)
+            self.rubber_band_item = self.scene.addPath(QPainterPath(), band_pen, QBrush(QColor(48, 128, 255, 40)))
+        
+        path = QPainterPath()
+        if self.rubber_band_lasso:
+            path.addPolygon(QPolygonF([QPointF(px, py) for px, py in self.rubber_band_points]))
+            path.closeSubpath()
+        else:
+            (x1, y1), (x2, y2) = self.rubber_band_points
+            path.addRect(QRectF(QPointF(x1, y1), QPointF(x2, y2)).normalized())
+        self.rubber_band_item.setPath(path)
+    
+    def finish_rubber_band(self, x, y, modifiers):
+        """Select every element inside the rubber band"""
+        start_x, start_y = self.rubber_band_points[0]
+        points = self.rubber_band_points
+        lasso = self.rubber_band_lasso
+        self.rubber_band_points = []
+        if self.rubber_band_item is not None:
+            self.scene.removeItem(self.rubber_band_item)
+            self.rubber_band_item = None
+        add = bool(modifiers & Qt.KeyboardModifier.ControlModifier)
+        
+        # A click without dragging selects a single element
+        if calculate_distance(start_x, start_y, x, y) < 4:
+            self.select_element(x, y, add)
+            return
+        
+        index = self.get_element_index()
+        if lasso:
+            polygon = [self.screen_to_model(px, py) for px, py in points + [(x, y)]]
+            selected = index.query_polygon(polygon)
+        else:
+            x1, y1 = self.screen_to_model(start_x, start_y)
+            x2, y2 = self.screen_to_model(x, y)
+            selected = index.query_rect(min(x1, x2), min(y1, y2), max(x1, x2), max(y1, y2))
+        
+        if add:
+            self.app_state.selection |= selected
+        else:
+            self.app_state.selection = selected
+        self.app_state.selected_element = next(iter(selected)) if len(selected) == 1 else None
+        
+        self.update_selection()
+    
+    def start_node_drag(self, x, y, modifiers):
+        """Grab the node or selected element under the cursor
+        
+        Presses with Shift or Control keep starting a rubber band.
+        
+        Returns:
+            True if an element was grabbed
+        """
+        if modifiers & (Qt.KeyboardModifier.ShiftModifier | Qt.KeyboardModifier.ControlModifier):
+            return False
+        
+        element = self.hit_test(x, y)
+        if element is None or (element[0] != "node" and element not in self.app_state.selection):
+            return False
+        
+        self.node_drag_press = (x, y, element)
+        return True
+    
+    def begin_node_drag(self):
+        """Hide the dragged elements from the scene and draw them in an overlay
+        
+        An unselected node is dragged alone, otherwise the whole selection
+        moves with it. Only the members attached to moved nodes, found
+        through the adjacency index, are updated while dragging.
+        """
+        app_state = self.app_state
+        element = self.node_drag_press[2]
+        if element not in app_state.selection:
+            app_state.selection = {element}
+            app_state.selected_element = element
+        elements = self.node_drag_elements = set(app_state.selection)
+        
+        # Member ends following the moved nodes, and selected members whole
+        node_slots = app_state.moved_node_slots(elements)
+        line_slots = [app_state.slot(t, i) for t, i in elements if t == "line" and app_state.slot(t, i) is not None]
+        ends = np.union1d(app_state.line_ends_at(node_slots), 2 * np.array(line_slots, dtype=np.int64) + [[0], [1]])
+        rows = np.unique(ends // 2)
+        moved = np.zeros((len(rows), 2), dtype=bool)
+        moved[np.searchsorted(rows, ends // 2), ends % 2] = True
+        self.node_drag_members = (rows, np.asarray(app_state.line_positions, dtype=np.float64)[rows], moved)
+        
+        # Forces on moved nodes, whole members and free selected forces move
+        # with the overlay, those on stretched members are hidden until the drop
+        rigid = [f for i in node_slots for f in app_state.forces_on("node", app_state.nodes[i])]
+        rigid += [f for i in rows[moved.all(axis=1)].tolist() for f in app_state.forces_on("line", app_state.lines[i])]
+        rigid += [i for t, i in elements if t == "force" and app_state.slot(t, i) is not None
+                  and app_state.force_hosts[app_state.slot(t, i)] is None]
+        stretched = [f for i in rows[~moved.all(axis=1)].tolist() for f in app_state.forces_on("line", app_state.lines[i])]
+        
+        self.hidden_nodes = node_slots
+        self.hidden_forces = {app_state.slot("force", f) for f in rigid + stretched}
+        self.node_drag_forces = {app_state.slot("force", f) for f in rigid}
+        self.setCursor(Qt.CursorShape.SizeAllCursor)
         self.update()
     
-    def erase_element(self, x, y):
-        """Erase an element at the given position"""
-        # Save state for undo
-        self.app_state.save_state()
+    def draw_node_drag(self):
+        """Draw the overlay of dragged elements at the current offset"""
+        zoom = self.app_state.zoom_level
+        left, top, right, bottom = self.visible_rect(50 * zoom)
         
-        # Find closest node
-        node, node_idx = self.find_closest_node(x, y)
+        # Glyphs are drawn into a scratch scene and rendered to one pixmap,
+        # so following the cursor only moves a single item however many
+        # nodes are dragged
+        overlay = QGraphicsScene()
+        for i in self.hidden_nodes:
+            screen_x, screen_y = self.model_to_screen(*self.app_state.node_positions[i])
+            if left <= screen_x <= right and top <= screen_y <= bottom:
+                draw_node(overlay, screen_x, screen_y, self.app_state.node_types[i], zoom)
+        for i in self.node_drag_forces:
+            screen_x, screen_y = self.model_to_screen(*self.app_state.force_positions[i])
+            if left <= screen_x <= right and top <= screen_y <= bottom:
+                draw_force(overlay, screen_x, screen_y, self.app_state.force_types[i], self.app_state.force_values[i], zoom)
         
-        if node is not None:
-            # Remove node and all connected lines
-            self.app_state.delete_node(node)
+        self.node_drag_overlay = QGraphicsPixmapItem()
+        rect = overlay.itemsBoundingRect().toAlignedRect()
+        if not rect.isEmpty():
+            pixmap = QPixmap(rect.size())
+            pixmap.fill(Qt.GlobalColor.transparent)
+            painter = QPainter(pixmap)
+            painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+            overlay.render(painter, QRectF(pixmap.rect()), QRectF(rect))
+            painter.end()
+            self.node_drag_overlay.setPixmap(pixmap)
+            self.node_drag_overlay.setOffset(QPointF(rect.topLeft()))
+        self.scene.addItem(self.node_drag_overlay)
+        self.move_node_drag(*self.node_drag_offset)
+    
+    def move_node_drag(self, dx, dy):
+        """Show the dragged elements at a model offset from where they were"""
+        self.node_drag_offset = (dx, dy)
+        zoom = self.app_state.zoom_level
+        self.node_drag_overlay.setPos(dx * zoom, dy * zoom)
+        
+        rows, lines, moved = self.node_drag_members
+        if len(rows):
+            self.members_item.set_members(rows, lines + np.repeat(moved, 2, axis=1) * (dx, dy, dx, dy))
+    
+    def extend_node_drag(self, x, y):
+        """Move the dragged elements with the cursor, snapping the grabbed node to the grid"""
+        press_x, press_y, element = self.node_drag_press
+        if self.node_drag_elements is None:
+            # Small moves are part of a click
+            if calculate_distance(press_x, press_y, x, y) < 4:
+                return
+            self.begin_node_drag()
+        
+        # Where the grabbed node would go, snapped to a grid point
+        zoom = self.app_state.zoom_level
+        slot = self.app_state.slot(*element)
+        if element[0] == "node" and slot is not None:
+            node_x, node_y = self.model_to_screen(*self.app_state.node_positions[slot])
+            target_x, target_y = node_x + x - press_x, node_y + y - press_y
+            snap = self.snap(target_x, target_y, kinds=(SNAP_GRID,))
+            if snap is not None:
+                target_x, target_y = snap[1], snap[2]
+            self.move_node_drag((target_x - node_x) / zoom, (target_y - node_y) / zoom)
+        else:
+            self.move_node_drag((x - press_x) / zoom, (y - press_y) / zoom)
+    
+    def finish_node_drag(self, x, y):
+        """Move the dragged elements where they were dropped, as one undo step"""
+        elements = self.node_drag_elements
+        self.node_drag_press = None
+        if elements is None:
+            # A click without dragging selects a single element
+            self.select_element(x, y)
+            return
+        
+        # The overlay goes, and the move draws the elements it held again
+        self.scene.removeItem(self.node_drag_overlay)
+        dx, dy = self.node_drag_offset
+        self.node_drag_elements = self.node_drag_overlay = self.node_drag_members = None
+        self.node_drag_offset = (0.0, 0.0)
+        self.hidden_nodes = set()
+        self.hidden_forces = set()
+        self.node_drag_forces = set()
+        self.setCursor(Qt.CursorShape.ArrowCursor)
+        
+        if not ((dx or dy) and self.app_state.move_elements(elements, dx, dy)):
+            # Members drawn at the dragged position must be redrawn from the model
+            self.members_buffer = (None, [])
             self.update()
+    
+    def delete_selection(self):
+        """Delete all selected elements"""
+        return self.app_state.delete_elements(self.app_state.selection)
+    
+    def move_selection(self, dx, dy):
+        """Move all selected elements by a model offset"""
+        return self.app_state.move_elements(self.app_state.selection, dx, dy)
+    
+    def retype_selection(self, node_type):
+        """Apply a node type to all selected nodes"""
+        return self.app_state.set_node_types(self.app_state.selection, node_type)
+    
+    def hit_test(self, x, y):
+        """Find the node, force or line under a screen position"""
+        model_x, model_y = self.screen_to_model(x, y)
+        zoom = self.app_state.zoom_level
+        return self.get_element_index().hit_test(model_x, model_y, 30 / zoom, 8 / zoom)
+    
+    def erase_element(self, x, y):
+        """Erase an element at the given position"""
+        element = self.hit_test(x, y)
+        if element is None:
+            return
         
-        # TODO: Add support for erasing lines and forces
+        # One undo step and one redraw, however many lines go with a node
+        element_type, element_id = element
+        with self.app_state.transaction():
+            if element_type == "node":
+                # Remove node and all connected lines
+                self.app_state.delete_node(element_id)
+            elif element_type == "line":
+                self.app_state.delete_line(element_id)
+            else:
+                self.app_state.delete_force(element_id)
     
     def place_force(self, x, y):
-        """Place a force at the given position"""
-        # TODO: Implement force placement logic
-        pass
+        """Place a force on the node or line at the given position"""
+        element = self.hit_test(x, y)
+        if element is None or element[0] == "force":
+            return False
+        
+        # Bind the force to its host, with its position along a line
+        element_type, element_id = element
+        if element_type == "line":
+            line = self.app_state.line_positions[self.app_state.slot("line", element_id)]
+            t = project_point_on_segment(self.screen_to_model(x, y), line)
+        else:
+            t = 0.0
+        
+        with self.app_state.transaction():
+            self.app_state.add_force(0, 0, self.app_state.current_force_type,
+                                     self.app_state.current_force_value, (element_type, element_id, t))
+        
+        # Leave force placement mode
+        self.app_state.force_placement_mode = False
+        self.setCursor(Qt.CursorShape.ArrowCursor)
+        return True
     
     def start_force_placement(self):
         """Enter force placement mode"""
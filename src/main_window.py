@@ -1,17 +1,32 @@
+import os
+
 from PyQt6.QtWidgets import (
     QMainWindow, QVBoxLayout, QHBoxLayout, QWidget, QSplitter,
-    QToolBar, QStatusBar, QMenuBar, QMenu, QFileDialog, QMessageBox, QColorDialog, QStyle
+    QToolBar, QStatusBar, QMenuBar, QMenu, QFileDialog, QMessageBox, QColorDialog, QStyle,
+    QInputDialog
 )
-from PyQt6.QtCore import Qt, QSize
-from PyQt6.QtGui import QAction, QIcon, QKeySequence, QColor
+from PyQt6.QtCore import Qt, QSize, QTimer
+from PyQt6.QtGui import QAction, QIcon, QKeySequence, QColor, QCursor
 
 from src.grid_view import GridView
 from src.panels.left_panel import LeftPanel
 from src.panels.right_panel import RightPanel
 from src.dialogs.grid_settings_dialog import GridSettingsDialog
 from src.dialogs.about_dialog import AboutDialog
+from src.dialogs.mesh_dialog import MeshDialog
+from src.dialogs.load_cases_dialog import LoadCasesDialog
 from src.models.app_state import AppState
 from src.utils.file_utils import FileManager
+from src.utils.image_export import export_scene_image
+from src.utils.exporters import EXPORTERS, export_filters
+from src.utils.importers import IMPORTERS, import_filters
+from src.utils.mesh import generate_grid_mesh
+from src.utils.intersections import find_line_intersections, collect_split_points
+from src.utils.model_diff import ModelGeometry, diff_models
+from src.utils.replicate import Clipboard, replicate, translation, linear_array, polar_array, mirror, to_model
+from src.utils.snapping import SNAP_NODE, SNAP_GRID
+from src.analysis.frame_solver import FrameSolver
+from src.analysis.diagrams import DEFORMED, AXIAL, SHEAR, MOMENT
 
 class MainWindow(QMainWindow):
     def __init__(self):
@@ -27,6 +42,19 @@ class MainWindow(QMainWindow):
         # Create file manager
         self.file_manager = FileManager(self.app_state)
         
+        # Analysis engine, keeping its factorization between runs
+        self.frame_solver = FrameSolver()
+        self.clipboard = None  # Elements copied for paste
+        self.analysis_result = None
+        self.load_case_result = None
+        
+        # Live analysis reruns shortly after the last change
+        self.live_analysis = False
+        self.live_analysis_timer = QTimer(self)
+        self.live_analysis_timer.setSingleShot(True)
+        self.live_analysis_timer.setInterval(100)
+        self.live_analysis_timer.timeout.connect(self.run_live_analysis)
+        
         # Set up the UI
         self.setup_ui()
         
@@ -100,10 +128,18 @@ class MainWindow(QMainWindow):
         
         file_menu.addSeparator()
         
+        import_action = QAction("Import...", self)
+        import_action.triggered.connect(self.import_data)
+        file_menu.addAction(import_action)
+        
         export_action = QAction("Export...", self)
         export_action.triggered.connect(self.export_data)
         file_menu.addAction(export_action)
         
+        export_image_action = QAction("Export Image...", self)
+        export_image_action.triggered.connect(self.export_image)
+        file_menu.addAction(export_image_action)
+        
         file_menu.addSeparator()
         
         exit_action = QAction(style.standardIcon(QStyle.StandardPixmap.SP_DialogCloseButton), "Exit", self)
@@ -126,6 +162,45 @@ class MainWindow(QMainWindow):
         
         edit_menu.addSeparator()
         
+        delete_selected_action = QAction("Delete Selected", self)
+        delete_selected_action.setShortcut(QKeySequence.StandardKey.Delete)
+        delete_selected_action.triggered.connect(self.delete_selected)
+        edit_menu.addAction(delete_selected_action)
+        
+        move_selected_action = QAction("Move Selected...", self)
+        move_selected_action.triggered.connect(self.move_selected)
+        edit_menu.addAction(move_selected_action)
+        
+        retype_selected_action = QAction("Apply Node Type to Selected", self)
+        retype_selected_action.triggered.connect(self.retype_selected)
+        edit_menu.addAction(retype_selected_action)
+        
+        edit_menu.addSeparator()
+        
+        copy_action = QAction("Copy", self)
+        copy_action.setShortcut(QKeySequence.StandardKey.Copy)
+        copy_action.triggered.connect(self.copy_selected)
+        edit_menu.addAction(copy_action)
+        
+        paste_action = QAction("Paste", self)
+        paste_action.setShortcut(QKeySequence.StandardKey.Paste)
+        paste_action.triggered.connect(self.paste)
+        edit_menu.addAction(paste_action)
+        
+        array_action = QAction("Array Selected...", self)
+        array_action.triggered.connect(self.array_selected)
+        edit_menu.addAction(array_action)
+        
+        polar_array_action = QAction("Polar Array Selected...", self)
+        polar_array_action.triggered.connect(self.polar_array_selected)
+        edit_menu.addAction(polar_array_action)
+        
+        mirror_action = QAction("Mirror Selected...", self)
+        mirror_action.triggered.connect(self.mirror_selected)
+        edit_menu.addAction(mirror_action)
+        
+        edit_menu.addSeparator()
+        
         clear_action = QAction("Clear All", self)
         clear_action.triggered.connect(self.clear_all)
         edit_menu.addAction(clear_action)
@@ -225,11 +300,75 @@ class MainWindow(QMainWindow):
         
         tools_menu.addSeparator()
         
+        mesh_action = QAction("Mesh Grid...", self)
+        mesh_action.setShortcut("M")
+        mesh_action.triggered.connect(self.mesh_grid)
+        tools_menu.addAction(mesh_action)
+        
+        find_intersections_action = QAction("Find Intersections", self)
+        find_intersections_action.triggered.connect(self.find_intersections)
+        tools_menu.addAction(find_intersections_action)
+        
+        split_action = QAction("Split at Intersections", self)
+        split_action.triggered.connect(self.split_at_intersections)
+        tools_menu.addAction(split_action)
+        
+        tools_menu.addSeparator()
+        
+        compare_action = QAction("Compare with File...", self)
+        compare_action.triggered.connect(self.compare_with_file)
+        tools_menu.addAction(compare_action)
+        
+        clear_comparison_action = QAction("Clear Comparison", self)
+        clear_comparison_action.triggered.connect(self.clear_comparison)
+        tools_menu.addAction(clear_comparison_action)
+        
+        tools_menu.addSeparator()
+        
         force_action = QAction("Add Force", self)
         force_action.setShortcut("F")
         force_action.triggered.connect(self.add_force)
         tools_menu.addAction(force_action)
         
+        # Analysis menu
+        analysis_menu = menu_bar.addMenu("Analysis")
+        
+        run_analysis_action = QAction("Run Analysis", self)
+        run_analysis_action.setShortcut("F5")
+        run_analysis_action.triggered.connect(self.run_analysis)
+        analysis_menu.addAction(run_analysis_action)
+        
+        live_analysis_action = QAction("Live Results", self)
+        live_analysis_action.setCheckable(True)
+        live_analysis_action.triggered.connect(self.toggle_live_analysis)
+        analysis_menu.addAction(live_analysis_action)
+        
+        # Result overlay layers
+        results_menu = analysis_menu.addMenu("Show Results")
+        for layer, label in ((DEFORMED, "Deformed Shape"), (AXIAL, "Axial Force (N)"),
+                             (SHEAR, "Shear Force (V)"), (MOMENT, "Bending Moment (M)")):
+            layer_action = QAction(label, self)
+            layer_action.setCheckable(True)
+            layer_action.triggered.connect(lambda checked, layer=layer: self.grid_view.set_result_layer(layer, checked))
+            results_menu.addAction(layer_action)
+        
+        results_menu.addSeparator()
+        
+        result_scale_action = QAction("Diagram Scale...", self)
+        result_scale_action.triggered.connect(self.change_result_scale)
+        results_menu.addAction(result_scale_action)
+        
+        analysis_menu.addSeparator()
+        
+        combinations_action = QAction("Load Combinations...", self)
+        combinations_action.triggered.connect(self.edit_load_combinations)
+        analysis_menu.addAction(combinations_action)
+        
+        run_cases_action = QAction("Run Load Cases", self)
+        run_cases_action.setShortcut("Shift+F5")
+        run_cases_action.triggered.connect(self.run_load_cases)
+        analysis_menu.addAction(run_cases_action)
+        
         # Help menu
         help_menu = menu_bar.addMenu("Help")
         
@@ -307,14 +446,15 @@ class MainWindow(QMainWindow):
         self.tool_actions["selection_tb"] = selection_action
     
     def connect_signals(self):
-        # Connect application state signals to UI updates
-        self.app_state.node_added.connect(self.grid_view.update)
-        self.app_state.line_added.connect(self.grid_view.update)
-        self.app_state.force_added.connect(self.grid_view.update)
-        self.app_state.element_deleted.connect(self.grid_view.update)
-        self.app_state.state_changed.connect(self.grid_view.update)
+        # Connect application state signals to UI updates, once per batch of
+        # changes. The view updates the items of the elements involved, so
+        # model changes need no other redraw.
+        self.app_state.elements_changed.connect(self.grid_view.on_elements_changed)
         self.app_state.plane_changed.connect(self.on_plane_changed)
         
+        # Schedule live analysis after any model change
+        self.app_state.state_changed.connect(self.schedule_live_analysis)
+        
         # Connect left panel signals
         self.left_panel.grid_updated.connect(self.grid_view.update_grid)
         
@@ -331,19 +471,17 @@ class MainWindow(QMainWindow):
         
         if reply == QMessageBox.StandardButton.Yes:
             self.app_state.clear_all()
-            self.grid_view.update()
             self.status_bar.showMessage("All elements cleared")
     
     def open_file(self):
         """Open a grid structure file"""
         file_path, _ = QFileDialog.getOpenFileName(
-            self, "Open File", "", "JSON Files (*.json);;All Files (*)"
+            self, "Open File", "", "Project Files (*.json *.gridmap);;All Files (*)"
         )
         
         if file_path:
             success = self.file_manager.load_file(file_path)
             if success:
-                self.grid_view.update()
                 self.status_bar.showMessage(f"File loaded: {file_path}")
             else:
                 QMessageBox.critical(self, "Error", "Failed to load file")
@@ -351,9 +489,12 @@ class MainWindow(QMainWindow):
     def save_file(self):
         """Save the grid structure to a file"""
         if self.app_state.current_file_path:
+            modified = self.app_state.is_modified()
             success = self.file_manager.save_file(self.app_state.current_file_path)
             if success:
-                self.status_bar.showMessage(f"File saved: {self.app_state.current_file_path}")
+                self.status_bar.showMessage(
+                    f"File saved: {self.app_state.current_file_path}" if modified else "No changes to save"
+                )
             else:
                 QMessageBox.critical(self, "Error", "Failed to save file")
         else:
@@ -361,11 +502,13 @@ class MainWindow(QMainWindow):
     
     def save_file_as(self):
         """Save the grid structure to a new file"""
-        file_path, _ = QFileDialog.getSaveFileName(
-            self, "Save File", "", "JSON Files (*.json);;All Files (*)"
+        file_path, selected_filter = QFileDialog.getSaveFileName(
+            self, "Save File", "", "JSON Files (*.json);;Mapped Projects (*.gridmap);;All Files (*)"
         )
         
         if file_path:
+            if selected_filter.startswith("Mapped") and not file_path.endswith(".gridmap"):
+                file_path += ".gridmap"
             success = self.file_manager.save_file(file_path)
             if success:
                 self.app_state.current_file_path = file_path
@@ -373,31 +516,227 @@ class MainWindow(QMainWindow):
             else:
                 QMessageBox.critical(self, "Error", "Failed to save file")
     
+    def import_data(self):
+        """Import DXF or CSV geometry into the current project"""
+        file_path, selected_filter = QFileDialog.getOpenFileName(
+            self, "Import Data", "", import_filters() + ";;All Files (*)"
+        )
+        
+        if file_path:
+            importer = next((i for i in IMPORTERS.values() if i.file_filter() == selected_filter), None)
+            node_count = len(self.app_state.nodes)
+            line_count = len(self.app_state.lines)
+            success = self.file_manager.import_data(file_path, importer.name if importer else None)
+            if success:
+                self.status_bar.showMessage(
+                    f"Imported {len(self.app_state.nodes) - node_count} nodes and "
+                    f"{len(self.app_state.lines) - line_count} lines from {file_path}"
+                )
+            else:
+                QMessageBox.critical(self, "Error", "Failed to import data")
+    
     def export_data(self):
         """Export grid structure data"""
-        file_path, _ = QFileDialog.getSaveFileName(
-            self, "Export Data", "", "JSON Files (*.json);;All Files (*)"
+        file_path, selected_filter = QFileDialog.getSaveFileName(
+            self, "Export Data", "", export_filters()
         )
         
         if file_path:
-            success = self.file_manager.export_data(file_path)
+            # The chosen filter picks the format, and its extension is added
+            # when the file name has none. Other filters leave the format to
+            # the file extension.
+            exporter = next((e for e in EXPORTERS.values() if e.file_filter() == selected_filter), None)
+            if exporter and not os.path.splitext(file_path)[1]:
+                file_path += exporter.extension
+            success = self.file_manager.export_data(file_path, exporter.name if exporter else None)
             if success:
                 self.status_bar.showMessage(f"Data exported: {file_path}")
             else:
                 QMessageBox.critical(self, "Error", "Failed to export data")
     
+    def export_image(self):
+        """Export the whole drawing as a PNG image at a chosen resolution"""
+        file_path, _ = QFileDialog.getSaveFileName(
+            self, "Export Image", "", "PNG Images (*.png);;All Files (*)"
+        )
+        if not file_path:
+            return
+        
+        dpi, ok = QInputDialog.getInt(self, "Export Image", "Resolution (dpi):", 300, 72, 2400)
+        if not ok:
+            return
+        
+        # Screen drawings are taken as 96 dpi
+        scene = self.grid_view.build_export_scene()
+        source = scene.itemsBoundingRect().adjusted(-20, -20, 20, 20)
+        try:
+            width, height = export_scene_image(
+                scene, source, file_path, dpi / 96, dpi, QColor(self.app_state.grid_bg_color)
+            )
+        except (OSError, ValueError) as e:
+            QMessageBox.critical(self, "Error", f"Failed to export image: {e}")
+            return
+        
+        self.status_bar.showMessage(f"Image exported: {file_path} ({width} x {height} px)")
+    
     def undo(self):
         """Undo the last action"""
         if self.app_state.undo():
-            self.grid_view.update()
             self.status_bar.showMessage("Undo")
     
     def redo(self):
         """Redo the last undone action"""
         if self.app_state.redo():
-            self.grid_view.update()
             self.status_bar.showMessage("Redo")
     
+    def delete_selected(self):
+        """Delete all selected elements"""
+        count = len(self.app_state.selection)
+        if self.grid_view.delete_selection():
+            self.status_bar.showMessage(f"Deleted {count} selected elements")
+    
+    def move_selected(self):
+        """Move all selected elements by an offset in meters"""
+        if not self.app_state.selection:
+            self.status_bar.showMessage("Nothing selected")
+            return
+        
+        text, ok = QInputDialog.getText(self, "Move Selected", "Offset dx dy (m):", text="0 0")
+        if not ok:
+            return
+        
+        try:
+            dx, dy = [float(value) for value in text.split()]
+        except ValueError:
+            QMessageBox.warning(self, "Move Selected", "Enter two numbers separated by a space")
+            return
+        
+        # Convert meters to model coordinates (screen y points down)
+        if self.grid_view.move_selection(dx * self.app_state.scale_factor_x, -dy * self.app_state.scale_factor_y):
+            self.status_bar.showMessage(f"Moved {len(self.app_state.selection)} selected elements")
+    
+    def retype_selected(self):
+        """Apply the current node type to all selected nodes"""
+        if self.grid_view.retype_selection(self.app_state.current_node_type):
+            self.status_bar.showMessage(f"Node type set to {self.app_state.current_node_type.value}")
+    
+    def copy_selected(self):
+        """Copy the selected nodes and lines"""
+        if not self.app_state.selection:
+            self.status_bar.showMessage("Nothing selected")
+            return
+        
+        self.clipboard = Clipboard.from_selection(self.app_state, self.app_state.selection)
+        self.status_bar.showMessage(f"Copied {len(self.clipboard)} elements")
+    
+    def paste(self):
+        """Paste the copied elements at the cursor, snapped to the grid"""
+        if self.clipboard is None:
+            self.status_bar.showMessage("Nothing to paste")
+            return
+        
+        # Cursor position, or the middle of the view when it is elsewhere
+        view_rect = self.grid_view.viewport().rect()
+        position = self.grid_view.viewport().mapFromGlobal(QCursor.pos())
+        if not view_rect.contains(position):
+            position = view_rect.center()
+        scene_position = self.grid_view.mapToScene(position)
+        x, y = scene_position.x(), scene_position.y()
+        snap = self.grid_view.snap(x, y, kinds=(SNAP_NODE, SNAP_GRID))
+        if snap is not None:
+            x, y = snap[1], snap[2]
+        
+        # The copied point nearest their middle lands on the cursor
+        model_x, model_y = self.grid_view.screen_to_model(x, y)
+        anchor_x, anchor_y = self.clipboard.anchor()
+        self.insert_copies(self.clipboard, translation(model_x - anchor_x, model_y - anchor_y), "Pasted")
+    
+    def array_selected(self):
+        """Copy the selection several times, each copy offset from the previous one"""
+        if not self.app_state.selection:
+            self.status_bar.showMessage("Nothing selected")
+            return
+        
+        text, ok = QInputDialog.getText(self, "Array Selected", "Copies and offset dx dy (m):", text="3 1 0")
+        if not ok:
+            return
+        
+        try:
+            count, dx, dy = text.split()
+            count, dx, dy = int(count), float(dx), float(dy)
+            if count < 1:
+                raise ValueError
+        except ValueError:
+            QMessageBox.warning(self, "Array Selected", "Enter a number of copies and two numbers separated by spaces")
+            return
+        
+        clipboard = Clipboard.from_selection(self.app_state, self.app_state.selection)
+        self.insert_copies(clipboard, to_model(self.app_state, linear_array(count, dx, dy)), "Arrayed")
+    
+    def polar_array_selected(self):
+        """Copy the selection several times, each copy rotated from the previous one"""
+        if not self.app_state.selection:
+            self.status_bar.showMessage("Nothing selected")
+            return
+        
+        text, ok = QInputDialog.getText(
+            self, "Polar Array Selected", "Copies, angle (deg) and center x y (m):", text="3 90 0 0"
+        )
+        if not ok:
+            return
+        
+        try:
+            count, angle, cx, cy = text.split()
+            count, angle, cx, cy = int(count), float(angle), float(cx), float(cy)
+            if count < 1:
+                raise ValueError
+        except ValueError:
+            QMessageBox.warning(self, "Polar Array Selected", "Enter a number of copies and three numbers separated by spaces")
+            return
+        
+        clipboard = Clipboard.from_selection(self.app_state, self.app_state.selection)
+        self.insert_copies(clipboard, to_model(self.app_state, polar_array(count, cx, cy, angle)), "Arrayed")
+    
+    def mirror_selected(self):
+        """Copy the selection mirrored across an axis"""
+        if not self.app_state.selection:
+            self.status_bar.showMessage("Nothing selected")
+            return
+        
+        # Offer a vertical axis through the middle of the selection
+        clipboard = Clipboard.from_selection(self.app_state, self.app_state.selection)
+        anchor_x, anchor_y = clipboard.anchor()
+        x = (anchor_x - self.app_state.origin_x) / self.app_state.scale_factor_x
+        y = (self.app_state.origin_y - anchor_y) / self.app_state.scale_factor_y
+        text, ok = QInputDialog.getText(
+            self, "Mirror Selected", "Axis through x1 y1 x2 y2 (m):", text=f"{x:g} {y:g} {x:g} {y + 1:g}"
+        )
+        if not ok:
+            return
+        
+        try:
+            transform = mirror(*[float(value) for value in text.split()])
+        except (TypeError, ValueError):
+            QMessageBox.warning(self, "Mirror Selected", "Enter two distinct points as four numbers separated by spaces")
+            return
+        
+        self.insert_copies(clipboard, to_model(self.app_state, transform), "Mirrored")
+    
+    def insert_copies(self, clipboard, transforms, verb):
+        """Add transformed copies of some elements in one undo step and select them"""
+        nodes, lines = replicate(self.app_state, clipboard, transforms)
+        node_count, line_count = self.app_state.add_elements(nodes, lines)
+        
+        # Select the copies so they can be moved right away
+        new_nodes = self.app_state.nodes[len(self.app_state.nodes) - node_count:]
+        new_lines = self.app_state.lines[len(self.app_state.lines) - line_count:]
+        if node_count or line_count:
+            self.app_state.selection = {("node", i) for i in new_nodes} | {("line", i) for i in new_lines}
+            self.app_state.selected_element = None
+            self.grid_view.update_selection()
+        
+        self.status_bar.showMessage(f"{verb} {node_count} nodes and {line_count} members")
+    
     def change_plane(self, plane):
         """Change the active plane"""
         self.app_state.set_current_plane(plane)
@@ -458,6 +797,159 @@ class MainWindow(QMainWindow):
         self.grid_view.start_force_placement()
         self.status_bar.showMessage("Click on a node or line to add a force")
     
+    def mesh_grid(self):
+        """Generate nodes and members at the grid intersections"""
+        dialog = MeshDialog(self, self.app_state)
+        if not dialog.exec():
+            return
+        
+        nodes, lines = generate_grid_mesh(self.app_state, **dialog.get_options())
+        node_count, line_count = self.app_state.add_elements(nodes, lines)
+        self.status_bar.showMessage(f"Generated {node_count} nodes and {line_count} members")
+    
+    def find_intersections(self):
+        """Select all crossing members"""
+        intersections = find_line_intersections(self.app_state.line_positions)
+        
+        line_ids = self.app_state.lines
+        self.app_state.selection = {("line", line_ids[i]) for i, j, x, y in intersections} | \
+                                   {("line", line_ids[j]) for i, j, x, y in intersections}
+        self.app_state.selected_element = None
+        self.grid_view.update_selection()
+        self.status_bar.showMessage(f"Found {len(intersections)} crossings between members")
+    
+    def split_at_intersections(self):
+        """Split crossing members and insert nodes at the crossings"""
+        line_positions = self.app_state.line_positions
+        splits = collect_split_points(line_positions, find_line_intersections(line_positions))
+        
+        node_count, line_count = self.app_state.split_lines(splits, self.app_state.current_node_type)
+        self.status_bar.showMessage(f"Split {len(splits)} members, added {node_count} nodes")
+    
+    def compare_with_file(self):
+        """Compare the model with a saved revision and highlight the differences"""
+        file_path, _ = QFileDialog.getOpenFileName(
+            self, "Compare with File", "", "Project Files (*.json *.gridmap);;All Files (*)"
+        )
+        
+        if file_path:
+            try:
+                old = ModelGeometry.from_file(file_path)
+            except (OSError, ValueError, KeyError) as e:
+                QMessageBox.critical(self, "Error", f"Failed to read file: {e}")
+                return
+            
+            diff = diff_models(old, ModelGeometry.from_state(self.app_state))
+            self.grid_view.set_model_diff(diff)
+            QMessageBox.information(
+                self, "Comparison", f"Changes since {os.path.basename(file_path)}:\n\n{diff.summary()}"
+            )
+            self.status_bar.showMessage(f"Compared with {file_path}" if diff else f"No changes since {file_path}")
+    
+    def clear_comparison(self):
+        """Remove the highlights of a comparison"""
+        self.grid_view.set_model_diff(None)
+        self.status_bar.showMessage("Comparison cleared")
+    
+    def run_analysis(self):
+        """Analyse the structure and show a summary of the results"""
+        try:
+            result = self.frame_solver.solve(self.app_state)
+        except ValueError as e:
+            QMessageBox.warning(self, "Analysis", str(e))
+            return
+        
+        self.analysis_result = result
+        self.grid_view.set_analysis_result(result)
+        
+        # Summarize results
+        total_x, total_y = result.reactions[:, 0].sum(), result.reactions[:, 1].sum()
+        max_moment = abs(result.member_forces[:, [2, 5]]).max()
+        QMessageBox.information(
+            self, "Analysis Results",
+            f"Nodes: {len(result.node_xy)}\n"
+            f"Members: {len(result.members)}\n"
+            f"Max displacement: {result.max_displacement() * 1000:.3f} mm\n"
+            f"Sum of reactions: Rx = {total_x:.2f} kN, Ry = {total_y:.2f} kN\n"
+            f"Max end moment: {max_moment:.2f} kN.m"
+        )
+        self.status_bar.showMessage("Analysis complete")
+    
+    def edit_load_combinations(self):
+        """Edit the load combinations"""
+        dialog = LoadCasesDialog(self, self.app_state)
+        dialog.exec()
+    
+    def run_load_cases(self):
+        """Analyse every load case and summarize the combination envelope"""
+        try:
+            result = self.frame_solver.solve_cases(self.app_state)
+        except ValueError as e:
+            QMessageBox.warning(self, "Load Cases", str(e))
+            return
+        
+        self.load_case_result = result
+        
+        # Summarize each load case
+        lines = []
+        for name, displacement in zip(result.case_names, result.max_displacements()):
+            lines.append(f"{name}: max displacement {displacement * 1000:.3f} mm")
+        
+        # Envelope of the combinations
+        combinations = self.app_state.load_combinations
+        if combinations:
+            envelope = result.envelope(combinations)
+            moments_max, moments_min = envelope["member_forces"]
+            governing_max, governing_min = envelope["member_forces_governing"]
+            high = moments_max[:, [2, 5]].argmax()
+            low = moments_min[:, [2, 5]].argmin()
+            lines.append("")
+            lines.append(f"Max end moment: {moments_max[:, [2, 5]].flat[high]:.2f} kN.m "
+                         f"({governing_max[:, [2, 5]].flat[high]})")
+            lines.append(f"Min end moment: {moments_min[:, [2, 5]].flat[low]:.2f} kN.m "
+                         f"({governing_min[:, [2, 5]].flat[low]})")
+        
+        QMessageBox.information(self, "Load Case Results", "\n".join(lines))
+        self.status_bar.showMessage(f"Analysed {len(result.case_names)} load cases")
+    
+    def change_result_scale(self):
+        """Change the magnification of deformed shapes and diagrams"""
+        scale, ok = QInputDialog.getDouble(
+            self, "Diagram Scale", "Scale factor:", self.grid_view.result_scale, 0.01, 100.0, 2
+        )
+        if ok:
+            self.grid_view.set_result_scale(scale)
+    
+    def toggle_live_analysis(self, checked):
+        """Toggle automatic re-analysis after every edit"""
+        self.live_analysis = checked
+        if checked:
+            self.run_live_analysis()
+        else:
+            self.status_bar.showMessage("Live results: Off")
+    
+    def schedule_live_analysis(self, *args):
+        """Coalesce model changes into one live analysis run"""
+        if self.live_analysis:
+            self.live_analysis_timer.start()
+    
+    def run_live_analysis(self):
+        """Re-analyse the structure and report the results in the status bar"""
+        try:
+            self.analysis_result = self.frame_solver.solve(self.app_state)
+        except ValueError as e:
+            self.analysis_result = None
+            self.grid_view.set_analysis_result(None)
+            self.status_bar.showMessage(f"Live results: {e}")
+            return
+        
+        self.grid_view.set_analysis_result(self.analysis_result)
+        
+        self.status_bar.showMessage(
+            f"Live results: max displacement {self.analysis_result.max_displacement() * 1000:.3f} mm "
+            f"({self.frame_solver.last_mode})"
+        )
+    
     def show_grid_settings(self):
         """Show grid settings dialog"""
         dialog = GridSettingsDialog(self, self.app_state)
@@ -0,0 +1,145 @@
+import bisect
+
+# Element types tracked by a change set
+ELEMENT_TYPES = ("node", "line", "force")
+
+class IdRanges:
+    """Sorted, disjoint ranges of element ids
+    
+    New ids are allocated in increasing runs, so the ids added by a bulk
+    insert take a single range however many elements it holds.
+    """
+    
+    def __init__(self, ids=()):
+        self.ranges = []
+        self.extend(ids)
+    
+    def extend(self, ids):
+        """Add ids, merging runs that continue the last range"""
+        if isinstance(ids, IdRanges):
+            runs = ids.ranges
+        elif isinstance(ids, range):
+            runs = [ids]
+        else:
+            runs = (range(i, i + 1) for i in ids)
+        
+        ranges = self.ranges
+        for run in runs:
+            if not run:
+                continue
+            if ranges and ranges[-1].stop == run.start:
+                ranges[-1] = range(ranges[-1].start, run.stop)
+            elif ranges and run.start < ranges[-1].stop:
+                # Out of order ids are kept sorted, without merging
+                ranges.insert(bisect.bisect_right(ranges, run.start, key=lambda r: r.start), run)
+            else:
+                ranges.append(run)
+    
+    def _find(self, element_id):
+        """Return the position of the range holding an id, or -1"""
+        k = bisect.bisect_right(self.ranges, element_id, key=lambda run: run.start) - 1
+        return k if k >= 0 and element_id in self.ranges[k] else -1
+    
+    def __contains__(self, element_id):
+        return self._find(element_id) >= 0
+    
+    def discard(self, element_id):
+        """Remove an id, splitting its range"""
+        k = self._find(element_id)
+        if k < 0:
+            return
+        run = self.ranges[k]
+        self.ranges[k:k + 1] = [r for r in (range(run.start, element_id), range(element_id + 1, run.stop)) if r]
+    
+    def __iter__(self):
+        for run in self.ranges:
+            yield from run
+    
+    def __len__(self):
+        return sum(len(run) for run in self.ranges)
+    
+    def __bool__(self):
+        return bool(self.ranges)
+    
+    def __repr__(self):
+        return f"IdRanges({self.ranges!r})"
+
+class ChangeSet:
+    """Elements added, removed and modified by a batch of mutations
+    
+    Ids are kept per element type. The set is net: an element added and
+    removed within the batch appears in neither list, and a new element
+    is not listed as modified. When reset is set the element lists were
+    replaced as a whole, and listeners should rebuild from scratch.
+    """
+    
+    def __init__(self, reset=False):
+        self.reset = reset
+        self.added = {element_type: IdRanges() for element_type in ELEMENT_TYPES}
+        self.removed = {element_type: set() for element_type in ELEMENT_TYPES}
+        self.modified = {element_type: set() for element_type in ELEMENT_TYPES}
+    
+    def add(self, element_type, ids):
+        """Record new elements, given as a range or an iterable of ids"""
+        self.added[element_type].extend(ids)
+        return self
+    
+    def remove(self, element_type, ids):
+        """Record deleted elements"""
+        added = self.added[element_type]
+        removed = self.removed[element_type]
+        modified = self.modified[element_type]
+        for element_id in ids:
+            if added and element_id in added:
+                added.discard(element_id)
+            else:
+                removed.add(element_id)
+            modified.discard(element_id)
+        return self
+    
+    def modify(self, element_type, ids):
+        """Record elements whose position, type or host changed"""
+        added = self.added[element_type]
+        if added:
+            ids = (element_id for element_id in ids if element_id not in added)
+        self.modified[element_type].update(ids)
+        return self
+    
+    def update(self, other):
+        """Merge a later batch into this one"""
+        self.reset = self.reset or other.reset
+        for element_type in ELEMENT_TYPES:
+            self.add(element_type, other.added[element_type])
+            self.remove(element_type, other.removed[element_type])
+            self.modify(element_type, other.modified[element_type])
+        return self
+    
+    def element_types(self):
+        """Return the element types with changes, all of them after a reset"""
+        if self.reset:
+            return ELEMENT_TYPES
+        return tuple(
+            element_type for element_type in ELEMENT_TYPES
+            if self.added[element_type] or self.removed[element_type] or self.modified[element_type]
+        )
+    
+    def __len__(self):
+        """Return the number of element ids recorded"""
+        return sum(
+            len(self.added[element_type]) + len(self.removed[element_type]) + len(self.modified[element_type])
+            for element_type in ELEMENT_TYPES
+        )
+    
+    def __bool__(self):
+        return self.reset or any(
+            self.added[element_type] or self.removed[element_type] or self.modified[element_type]
+            for element_type in ELEMENT_TYPES
+        )
+    
+    def __repr__(self):
+        parts = ["reset"] if self.reset else []
+        for name in ("added", "removed", "modified"):
+            for element_type, ids in getattr(self, name).items():
+                if ids:
+                    parts.append(f"{name} {len(ids)} {element_type}s")
+        return f"ChangeSet({', '.join(parts)})"
\ No newline at end of file
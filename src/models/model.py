@@ -0,0 +1,1148 @@
+from contextlib import contextmanager
+import copy
+from itertools import chain
+import math
+import numpy as np
+
+from src.models.changes import ChangeSet
+from src.models.constants import NodeType, ForceType
+from src.models.spacings import Spacings
+
+class Model:
+    """Structural model: elements, grid spacings, load combinations and undo
+    
+    Plain Python, so scripts and batch jobs can build, edit, analyse and
+    save models without Qt. Listeners subscribe to notifications, which the
+    Qt application state forwards as signals.
+    """
+    # Notifications, sent once per batch of changes: elements_changed with
+    # the ChangeSet of the ids involved, then state_changed without
+    # arguments for listeners that only need to know
+    EVENTS = ("elements_changed", "state_changed")
+    
+    # Parallel lists holding each element type, the id list first
+    ELEMENT_LISTS = {
+        "node": ("nodes", "node_types", "node_positions"),
+        "line": ("lines", "line_positions"),
+        "force": ("forces", "force_positions", "force_types", "force_values", "force_hosts", "force_cases")
+    }
+    
+    def __init__(self):
+        super().__init__()
+        self._listeners = {event: [] for event in self.EVENTS}
+        
+        # Grid spacings
+        self.h_spacings = Spacings([1.0, 2.0, 5.0, 6.0])
+        self.v_spacings = Spacings([7.0, 8.0, 4.0, 5.0])
+        
+        # Coordinate system
+        self.origin_x = 100
+        self.origin_y = 700
+        self.zoom_level = 1.0
+        self.scale_factor_x = 100
+        self.scale_factor_y = 100
+        
+        # Elements, one slot per element in each list. Ids are never reused
+        # and a deletion moves the last element into the freed slot, so the
+        # lists stay dense and slots change while ids do not.
+        self.nodes = []  # Node ids
+        self.node_types = []  # Node types corresponding to nodes
+        self.node_positions = []  # (x, y) positions
+        self.lines = []  # Line ids
+        self.line_positions = []  # (x1, y1, x2, y2) positions
+        self.forces = []  # Force ids
+        self.force_positions = []  # (x, y) positions
+        self.force_types = []  # Force types
+        self.force_values = []  # Force values
+        self.force_hosts = []  # (host type, host id, position along line) or None
+        self.force_cases = []  # Load case name of each force
+        self._force_index = None  # (host type, host id) -> force ids, built lazily
+        self._adjacency = None  # Line ends attached to each node, built lazily
+        self._slots = dict.fromkeys(self.ELEMENT_LISTS)  # Type -> {id: slot}, built lazily
+        self._next_ids = dict.fromkeys(self.ELEMENT_LISTS, 0)  # Type -> next unused id
+        self.mapped_elements = None  # Source of the element lists until first used, see defer_element_lists
+        
+        # Current state
+        self.current_node_type = NodeType.SIMPLE
+        self.current_force_type = ForceType.POINT
+        self.current_force_value = 0.0
+        self.current_load_case = "LC1"
+        
+        # Load combinations: name -> {load case name: factor}
+        self.load_combinations = {}
+        
+        # Selection
+        self.selected_element = None  # (type, id)
+        self.selection = set()  # {(type, id)} for multi-selection
+        
+        # Undo/Redo stacks
+        self.undo_stack = []
+        self.redo_stack = []
+        self.max_undo_steps = 50
+        self._transaction_depth = 0  # Nesting level of the open transaction
+        self._transaction_undo = None  # Undo stack when it began
+        self._transaction_redo = None  # Redo stack when it began
+        self._transaction_changes = None  # ChangeSet collected until it ends
+        
+        # File management
+        self.current_file_path = None
+        
+        # Change counters: the revision counts the batches of changes, and
+        # each element type keeps the revision that last changed it
+        self.revision = 0
+        self.element_revisions = dict.fromkeys(self.ELEMENT_LISTS, 0)
+        self.saved_revision = 0  # Revision held by the file at current_file_path
+    
+    def save_state(self):
+        """Save current state for undo"""
+        # A transaction records a single undo step when it begins
+        if self._transaction_depth:
+            return
+        
+        state = {
+            "nodes": self.nodes.copy(),
+            "node_types": self.node_types.copy(),
+            "node_positions": [(x, y) for x, y in self.node_positions],
+            "lines": self.lines.copy(),
+            "line_positions": [(x1, y1, x2, y2) for x1, y1, x2, y2 in self.line_positions],
+            "forces": self.forces.copy(),
+            "force_positions": [(x, y) for x, y in self.force_positions],
+            "force_types": self.force_types.copy(),
+            "force_values": self.force_values.copy(),
+            "force_hosts": self.force_hosts.copy(),
+            "force_cases": self.force_cases.copy(),
+            "load_combinations": dict(self.load_combinations),
+            "origin_x": self.origin_x,
+            "origin_y": self.origin_y,
+            "zoom_level": self.zoom_level,
+            "scale_factor_x": self.scale_factor_x,
+            "scale_factor_y": self.scale_factor_y
+        }
+        
+        self.undo_stack.append(state)
+        self.redo_stack.clear()
+        
+        # Limit undo stack size
+        if len(self.undo_stack) > self.max_undo_steps:
+            self.undo_stack.pop(0)
+    
+    def undo(self):
+        """Undo the last action"""
+        if not self.undo_stack or self._transaction_depth:
+            return False
+        
+        # Save current state for redo
+        current_state = {
+            "nodes": self.nodes.copy(),
+            "node_types": self.node_types.copy(),
+            "node_positions": [(x, y) for x, y in self.node_positions],
+            "lines": self.lines.copy(),
+            "line_positions": [(x1, y1, x2, y2) for x1, y1, x2, y2 in self.line_positions],
+            "forces": self.forces.copy(),
+            "force_positions": [(x, y) for x, y in self.force_positions],
+            "force_types": self.force_types.copy(),
+            "force_values": self.force_values.copy(),
+            "force_hosts": self.force_hosts.copy(),
+            "force_cases": self.force_cases.copy(),
+            "load_combinations": dict(self.load_combinations),
+            "origin_x": self.origin_x,
+            "origin_y": self.origin_y,
+            "zoom_level": self.zoom_level,
+            "scale_factor_x": self.scale_factor_x,
+            "scale_factor_y": self.scale_factor_y
+        }
+        
+        self.redo_stack.append(current_state)
+        
+        # Restore previous state
+        state = self.undo_stack.pop()
+        self.restore_state(state)
+        
+        # Notify listeners
+        self._changed(ChangeSet(reset=True))
+        
+        return True
+    
+    def redo(self):
+        """Redo the last undone action"""
+        if not self.redo_stack or self._transaction_depth:
+            return False
+        
+        # Save current state for undo
+        current_state = {
+            "nodes": self.nodes.copy(),
+            "node_types": self.node_types.copy(),
+            "node_positions": [(x, y) for x, y in self.node_positions],
+            "lines": self.lines.copy(),
+            "line_positions": [(x1, y1, x2, y2) for x1, y1, x2, y2 in self.line_positions],
+            "forces": self.forces.copy(),
+            "force_positions": [(x, y) for x, y in self.force_positions],
+            "force_types": self.force_types.copy(),
+            "force_values": self.force_values.copy(),
+            "force_hosts": self.force_hosts.copy(),
+            "force_cases": self.force_cases.copy(),
+            "load_combinations": dict(self.load_combinations),
+            "origin_x": self.origin_x,
+            "origin_y": self.origin_y,
+            "zoom_level": self.zoom_level,
+            "scale_factor_x": self.scale_factor_x,
+            "scale_factor_y": self.scale_factor_y
+        }
+        
+        self.undo_stack.append(current_state)
+        
+        # Restore next state
+        state = self.redo_stack.pop()
+        self.restore_state(state)
+        
+        # Notify listeners
+        self._changed(ChangeSet(reset=True))
+        
+        return True
+    
+    def restore_state(self, state):
+        """Restore state from saved state"""
+        self.nodes = state["nodes"].copy()
+        self.node_types = state["node_types"].copy()
+        self.node_positions = [(x, y) for x, y in state["node_positions"]]
+        self.lines = state["lines"].copy()
+        self.line_positions = [(x1, y1, x2, y2) for x1, y1, x2, y2 in state["line_positions"]]
+        self.forces = state["forces"].copy()
+        self.force_positions = [(x, y) for x, y in state["force_positions"]]
+        self.force_types = state["force_types"].copy()
+        self.force_values = state["force_values"].copy()
+        self.force_hosts = state["force_hosts"].copy()
+        self.force_cases = state["force_cases"].copy()
+        self.load_combinations = dict(state["load_combinations"])
+        self._force_index = None
+        self.origin_x = state["origin_x"]
+        self.origin_y = state["origin_y"]
+        self.zoom_level = state["zoom_level"]
+        self.scale_factor_x = state["scale_factor_x"]
+        self.scale_factor_y = state["scale_factor_y"]
+        self._slots = dict.fromkeys(self.ELEMENT_LISTS)
+        self._adjacency = None
+        self._drop_mapped_elements()
+        
+        # Elements held by the selection may no longer exist
+        self.selected_element = None
+        self.selection = set()
+    
+    def begin(self):
+        """Begin a transaction
+        
+        The mutations up to the matching commit record a single undo step
+        and notify listeners once, with the changes of all of them.
+        Transactions nest, only the outermost one takes effect.
+        """
+        if not self._transaction_depth:
+            self._transaction_undo = self.undo_stack.copy()
+            self._transaction_redo = self.redo_stack.copy()
+            self.save_state()
+            self._transaction_changes = ChangeSet()
+        self._transaction_depth += 1
+    
+    def commit(self):
+        """End the innermost transaction, notifying listeners if it was the outermost
+        
+        An outermost transaction that changed nothing leaves no undo step,
+        and the redo history is kept.
+        
+        Returns:
+            True if a transaction was in progress
+        """
+        if not self._transaction_depth:
+            return False
+        
+        self._transaction_depth -= 1
+        if not self._transaction_depth:
+            changes = self._transaction_changes
+            if changes:
+                self._changed(changes)
+            else:
+                self.undo_stack = self._transaction_undo
+                self.redo_stack = self._transaction_redo
+            self._transaction_undo = self._transaction_redo = self._transaction_changes = None
+        
+        return True
+    
+    def rollback(self):
+        """Abandon the transaction in progress and every enclosing one
+        
+        The state from before the outermost begin is restored, with its
+        undo and redo stacks.
+        
+        Returns:
+            True if a transaction was in progress
+        """
+        if not self._transaction_depth:
+            return False
+        
+        self._transaction_depth = 0
+        self.restore_state(self.undo_stack.pop())
+        self.undo_stack = self._transaction_undo
+        self.redo_stack = self._transaction_redo
+        self._transaction_undo = self._transaction_redo = self._transaction_changes = None
+        self._changed(ChangeSet(reset=True))
+        
+        return True
+    
+    def _changed(self, changes):
+        """Notify listeners of a batch of changes, or hold it until the transaction ends"""
+        if self._transaction_depth:
+            self._transaction_changes.update(changes)
+            return
+        
+        self.revision += 1
+        for element_type in changes.element_types():
+            self.element_revisions[element_type] = self.revision
+        
+        self._notify("elements_changed", changes)
+        self._notify("state_changed")
+    
+    def subscribe(self, event, callback):
+        """Call back on every notification of an event, see EVENTS"""
+        self._listeners[event].append(callback)
+    
+    def unsubscribe(self, event, callback):
+        """Stop calling back on an event"""
+        self._listeners[event].remove(callback)
+    
+    def _notify(self, event, *args):
+        """Call the listeners of an event"""
+        for callback in self._listeners[event]:
+            callback(*args)
+    
+    def mark_modified(self, *element_types):
+        """Count a change to project data outside the element operations
+        
+        Args:
+            element_types: Element types whose saved form changes too, as
+                all of them do when a scale factor changes their meters
+        """
+        self.revision += 1
+        for element_type in element_types:
+            self.element_revisions[element_type] = self.revision
+    
+    def is_modified(self):
+        """Check whether the model changed since it was last saved or loaded"""
+        return self.revision != self.saved_revision
+    
+    @contextmanager
+    def transaction(self):
+        """Run the mutations of a with block as one transaction, rolled back if it raises
+        
+        Example:
+            with model.transaction():
+                for x, y in points:
+                    model.add_node(x, y, NodeType.SIMPLE)
+        """
+        self.begin()
+        try:
+            yield self
+        except BaseException:
+            self.rollback()
+            raise
+        self.commit()
+    
+    def element_lists(self, element_type):
+        """Return the parallel lists of an element type, the id list first"""
+        return [getattr(self, name) for name in self.ELEMENT_LISTS[element_type]]
+    
+    def slots(self, element_type):
+        """Return the map from element id to list slot for an element type"""
+        ids = getattr(self, self.ELEMENT_LISTS[element_type][0])
+        slots = self._slots[element_type]
+        if slots is None or len(slots) != len(ids):
+            slots = self._slots[element_type] = {element_id: slot for slot, element_id in enumerate(ids)}
+        return slots
+    
+    def slot(self, element_type, element_id):
+        """Return the list slot of an element, or None if it does not exist"""
+        return self.slots(element_type).get(element_id)
+    
+    def defer_element_lists(self, mapped):
+        """Leave the element lists to be built when one of them is first used
+        
+        Views can draw a large project from its source meanwhile, without
+        converting every element.
+        
+        Args:
+            mapped: Source of the elements, whose build(model) sets the
+                element lists and close() releases it. Ids are allocated
+                by the caller.
+        """
+        self._drop_mapped_elements()
+        for names in self.ELEMENT_LISTS.values():
+            for name in names:
+                self.__dict__.pop(name, None)
+        self.mapped_elements = mapped
+    
+    def build_element_lists(self):
+        """Build the deferred element lists now"""
+        mapped = self.mapped_elements
+        if mapped is not None:
+            self.mapped_elements = None
+            mapped.build(self)
+            mapped.close()
+    
+    def _drop_mapped_elements(self):
+        """Release the source of deferred element lists, once they were replaced"""
+        if self.mapped_elements is not None:
+            self.mapped_elements.close()
+            self.mapped_elements = None
+    
+    def __getattr__(self, name):
+        """Build the deferred element lists on first use of one of them"""
+        # Only called for missing attributes, which the element lists are
+        # while deferred
+        if self.__dict__.get("mapped_elements") is not None \
+                and any(name in names for names in self.ELEMENT_LISTS.values()):
+            self.build_element_lists()
+            return getattr(self, name)
+        fallback = getattr(super(), "__getattr__", None)
+        if fallback is None:
+            raise AttributeError(f"{type(self).__name__!r} object has no attribute {name!r}")
+        return fallback(name)
+    
+    def new_ids(self, element_type, count=1):
+        """Allocate a range of ids never used before for an element type"""
+        first = self._next_ids[element_type]
+        self._next_ids[element_type] = first + count
+        return range(first, first + count)
+    
+    def reindex(self):
+        """Rebuild the id lookups after the element lists were replaced"""
+        for element_type in self.ELEMENT_LISTS:
+            self._slots[element_type] = None
+            ids = getattr(self, self.ELEMENT_LISTS[element_type][0])
+            if ids:
+                self._next_ids[element_type] = max(self._next_ids[element_type], max(ids) + 1)
+        self._force_index = None
+        self._adjacency = None
+    
+    def _append_ids(self, element_type, count=1):
+        """Allocate ids for elements appended to the lists and add them to the id list"""
+        new_ids = self.new_ids(element_type, count)
+        ids = getattr(self, self.ELEMENT_LISTS[element_type][0])
+        slots = self._slots[element_type]
+        if slots is not None and len(slots) == len(ids):
+            slots.update(zip(new_ids, range(len(ids), len(ids) + count)))
+        ids.extend(new_ids)
+        return new_ids
+    
+    def _swap_remove(self, element_type, element_id):
+        """Remove an element in constant time by moving the last element into its slot"""
+        slots = self.slots(element_type)
+        slot = slots.pop(element_id)
+        lists = self.element_lists(element_type)
+        last = len(lists[0]) - 1
+        if element_type != "force" and self._adjacency is not None:
+            self._swap_remove_adjacency(element_type, slot, last)
+        if slot != last:
+            for values in lists:
+                values[slot] = values[last]
+            slots[lists[0][slot]] = slot
+        for values in lists:
+            values.pop()
+    
+    def _keep(self, element_type, keep):
+        """Keep only the elements of a type at the given slots"""
+        if element_type != "force" and self._adjacency is not None:
+            self._keep_adjacency(element_type, keep)
+        for name in self.ELEMENT_LISTS[element_type]:
+            values = getattr(self, name)
+            setattr(self, name, [values[i] for i in keep])
+        self._slots[element_type] = None
+        if element_type == "force":
+            self._force_index = None
+    
+    def _selected_slots(self, elements, element_type):
+        """Return the slots of the given elements of a type, skipping deleted ones"""
+        slots = self.slots(element_type)
+        return {slots[i] for t, i in elements if t == element_type and i in slots}
+    
+    def adjacency(self):
+        """Return the line ends attached to each node, built lazily
+        
+        A line end is numbered 2 * line slot for the start of the line and
+        2 * line slot + 1 for its end. It is attached to the nearest node
+        within a pixel, the one with the lowest id among equally near ones.
+        The index is patched as elements come and go: removals drop and
+        renumber their entries, appended elements are attached on the next
+        call, and moves attach the free ends the moved nodes reach. Edits
+        that bring nodes within reach of the same ends, and replacing the
+        element lists, rebuild it instead.
+        
+        Returns:
+            Tuple (end_node, starts, stops, ends) of arrays: end_node[e] is
+            the slot of the node line end e is attached to, or -1, and the
+            ends attached to node slot i are the entries of
+            ends[starts[i]:stops[i]] other than -1
+        """
+        if self._adjacency is not None:
+            end_node, starts = self._adjacency[:2]
+            if len(starts) > len(self.nodes) or len(end_node) > 2 * len(self.lines):
+                self._adjacency = None
+            elif len(starts) < len(self.nodes) or len(end_node) < 2 * len(self.lines):
+                self._adjacency = self._extend_adjacency(*self._adjacency)
+        if self._adjacency is not None:
+            return self._adjacency
+        
+        line_ends = np.asarray(self.line_positions, dtype=np.float64).reshape(-1, 2)
+        end_node = self.nodes_at(line_ends, nearest=True)
+        self._adjacency = (end_node, *self._group_ends(end_node))
+        return self._adjacency
+    
+    def _group_ends(self, end_node):
+        """Group the attached line ends by node, returning (starts, stops, ends)"""
+        attached = np.flatnonzero(end_node >= 0)
+        ends = attached[np.argsort(end_node[attached], kind="stable")]
+        counts = np.bincount(end_node[attached], minlength=len(self.nodes))
+        stops = np.cumsum(counts)
+        return stops - counts, stops, ends
+    
+    def _extend_adjacency(self, end_node, starts, stops, ends):
+        """Attach the nodes and lines appended since the adjacency was last brought up to date
+        
+        Returns None when a new node lies near another one, as the ends
+        between them may have to change node and a rebuild is needed.
+        """
+        node_count, end_count = len(starts), len(end_node)
+        if self._crowded(range(node_count, len(self.nodes))):
+            return None
+        line_ends = np.asarray(self.line_positions[end_count // 2:], dtype=np.float64).reshape(-1, 2)
+        
+        # New ends may lie on any node, free old ends only on new nodes
+        end_node = np.concatenate([end_node, self.nodes_at(line_ends, nearest=True)])
+        free = np.flatnonzero(end_node[:end_count] < 0)
+        if len(free) and node_count < len(self.nodes):
+            old_ends = np.asarray(self.line_positions, dtype=np.float64).reshape(-1, 2)[free]
+            end_node[free] = self.nodes_at(old_ends, first=node_count, nearest=True)
+        new_nodes = np.zeros(len(self.nodes) - node_count, dtype=np.int64)
+        starts = np.concatenate([starts, new_nodes])
+        stops = np.concatenate([stops, new_nodes])
+        added = np.concatenate([free, np.arange(end_count, len(end_node))])
+        return self._attach_ends(end_node, starts, stops, ends, added[end_node[added] >= 0])
+    
+    def _attach_ends(self, end_node, starts, stops, ends, added):
+        """Add line ends already set in end_node to the runs of their nodes"""
+        if not len(added):
+            return end_node, starts, stops, ends
+        
+        # Nodes gaining ends get their run moved to the end of the ends
+        # array, with the new ends after the ones they had
+        nodes = np.unique(end_node[added])
+        counts = stops[nodes] - starts[nodes]
+        offsets = np.cumsum(counts) - counts
+        kept = ends[np.repeat(starts[nodes] - offsets, counts) + np.arange(counts.sum())]
+        run_ends = np.concatenate([kept, added])
+        run_nodes = np.concatenate([np.repeat(nodes, counts), end_node[added]])
+        order = np.argsort(run_nodes, kind="stable")
+        run_counts = np.bincount(run_nodes, minlength=len(starts))[nodes]
+        starts[nodes] = len(ends) + np.cumsum(run_counts) - run_counts
+        stops[nodes] = starts[nodes] + run_counts
+        ends = np.concatenate([ends, run_ends[order]])
+        
+        # Moved runs leave their old entries behind, dropped once they
+        # outnumber the line ends
+        if len(ends) > 2 * len(end_node):
+            starts, stops, ends = self._group_ends(end_node)
+        return end_node, starts, stops, ends
+    
+    def _move_adjacency(self, node_slots):
+        """Patch the adjacency for moved nodes, whose attached ends moved with them"""
+        end_node, starts, stops, ends = self._adjacency
+        
+        # Moved nodes sharing reach of some ends with other nodes force a
+        # rebuild, as rounding may tip which of them is nearest
+        if self._crowded(node_slots):
+            self._adjacency = None
+            return
+        
+        # Free ends are looked up again, those the moved nodes reached and
+        # those of moved lines now lying on a node get attached
+        free = np.flatnonzero(end_node < 0)
+        if not len(free):
+            return
+        lines = np.asarray([self.line_positions[i] for i in (free // 2).tolist()], dtype=np.float64)
+        points = lines.reshape(-1, 2, 2)[np.arange(len(free)), free % 2]
+        end_node[free] = self.nodes_at(points, nearest=True)
+        self._adjacency = self._attach_ends(end_node, starts, stops, ends, free[end_node[free] >= 0])
+    
+    def _crowded(self, node_slots):
+        """Check whether any of the given nodes lies within two pixels of another node"""
+        slots = np.sort(np.fromiter(node_slots, dtype=np.int64))
+        if not len(slots):
+            return False
+        coordinates = chain.from_iterable(self.node_positions)
+        nodes = np.fromiter(coordinates, dtype=np.float64, count=2 * len(self.nodes)).reshape(-1, 2)
+        
+        # Only the nodes in the box around the given ones are looked up
+        points = nodes[slots]
+        inside = np.all((nodes > points.min(axis=0) - 2.0) & (nodes < points.max(axis=0) + 2.0), axis=1)
+        window = np.flatnonzero(inside)
+        found = self._points_near(nodes[window], points, 2.0, skip=np.searchsorted(window, slots))
+        return bool((found >= 0).any())
+    
+    def _swap_remove_adjacency(self, element_type, slot, last):
+        """Patch the adjacency for an element removed by moving the last one into its slot"""
+        end_node, starts, stops, ends = self.adjacency()
+        if element_type == "line":
+            # The removed ends leave their node, the last line's ends are renumbered
+            for e in (2 * slot, 2 * slot + 1):
+                if end_node[e] >= 0:
+                    run = ends[starts[end_node[e]]:stops[end_node[e]]]
+                    run[run == e] = -1
+            if slot != last:
+                for k in (0, 1):
+                    e = 2 * last + k
+                    if end_node[e] >= 0:
+                        run = ends[starts[end_node[e]]:stops[end_node[e]]]
+                        run[run == e] = 2 * slot + k
+                end_node[2 * slot:2 * slot + 2] = end_node[2 * last:2 * last + 2]
+            end_node = end_node[:2 * last]
+        else:
+            # Ends left on the removed node may belong to another node, so
+            # they force a rebuild. The last node takes the removed slot.
+            run = ends[starts[slot]:stops[slot]]
+            if (run >= 0).any():
+                self._adjacency = None
+                return
+            if slot != last:
+                run = ends[starts[last]:stops[last]]
+                end_node[run[run >= 0]] = slot
+                starts[slot], stops[slot] = starts[last], stops[last]
+            starts, stops = starts[:last], stops[:last]
+        self._adjacency = (end_node, starts, stops, ends)
+    
+    def _keep_adjacency(self, element_type, keep):
+        """Patch the adjacency for the elements of a type kept at the given slots"""
+        end_node, starts, stops, ends = self.adjacency()
+        keep = np.asarray(keep, dtype=np.int64)
+        if element_type == "line":
+            # Ends of dropped lines leave their node, kept ones are renumbered.
+            # Entries past the line ends only remain in runs no node uses.
+            renumber = np.full(len(end_node) + 1, -1, dtype=np.int64)
+            renumber[2 * keep] = 2 * np.arange(len(keep))
+            renumber[2 * keep + 1] = 2 * np.arange(len(keep)) + 1
+            ends = renumber[np.minimum(ends, len(end_node))]
+            end_node = end_node.reshape(-1, 2)[keep].ravel()
+        else:
+            # Ends left on dropped nodes may belong to another node, so they
+            # force a rebuild. Kept nodes are renumbered.
+            renumber = np.full(len(starts) + 1, -1, dtype=np.int64)
+            renumber[keep] = np.arange(len(keep))
+            if (renumber[end_node[end_node >= 0]] < 0).any():
+                self._adjacency = None
+                return
+            end_node = renumber[end_node]
+            starts, stops = starts[keep], stops[keep]
+        self._adjacency = (end_node, starts, stops, ends)
+    
+    def nodes_at(self, points, tolerance=1.0, first=0, nearest=False):
+        """Return the slot of a node within the tolerance of each point, or -1
+        
+        Args:
+            points: (n, 2) array of model coordinates
+            tolerance: Largest distance along each axis, a pixel by default
+            first: Slot of the first node looked up, earlier ones are skipped
+            nearest: Pick the nearest node, the one with the lowest id among
+                equally near ones, rather than the first one found
+        """
+        nodes = np.asarray(self.node_positions[first:], dtype=np.float64).reshape(-1, 2)
+        keys = np.asarray(self.nodes[first:], dtype=np.int64) if nearest else None
+        found = self._points_near(nodes, points, tolerance, keys)
+        found[found >= 0] += first
+        return found
+    
+    @staticmethod
+    def _points_near(targets, points, tolerance, keys=None, skip=None):
+        """Return the index of a target within the tolerance of each point, or -1
+        
+        Without keys the first target found is taken, trying the point's own
+        tolerance cell first. With keys the nearest one is, ties going to
+        the lowest key. The target at index skip[i], if given, is not
+        looked up for point i.
+        """
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        found = np.full(len(points), -1, dtype=np.int64)
+        if not len(targets) or not len(points):
+            return found
+        best = np.full(len(points), np.inf)
+        
+        # Targets are looked up in the tolerance cells around each point, its
+        # own cell first, and the targets sharing a cell are tried rank by rank.
+        # A cell key packs the x and y cell numbers into one integer.
+        target_cells = np.floor(targets / tolerance).astype(np.int64) @ (1 << 32, 1)
+        order = np.argsort(target_cells, kind="stable")
+        sorted_cells = target_cells[order]
+        point_cells = np.floor(points / tolerance).astype(np.int64)
+        for offset in ((0, 0), (-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1)):
+            todo = np.flatnonzero(found < 0) if keys is None else np.arange(len(points))
+            cells = (point_cells[todo] + offset) @ (1 << 32, 1)
+            rank = np.searchsorted(sorted_cells, cells, side="left")
+            stop = np.searchsorted(sorted_cells, cells, side="right")
+            while len(todo):
+                keep = rank < stop
+                todo, rank, stop = todo[keep], rank[keep], stop[keep]
+                candidates = order[rank]
+                gaps = targets[candidates] - points[todo]
+                near = np.all(np.abs(gaps) < tolerance, axis=1)
+                if skip is not None:
+                    near &= candidates != skip[todo]
+                if keys is None:
+                    found[todo[near]] = candidates[near]
+                    todo, rank, stop = todo[~near], rank[~near] + 1, stop[~near]
+                    continue
+                
+                # Every candidate is visited, keeping the nearest so far
+                distance = np.hypot(gaps[:, 0], gaps[:, 1])
+                tie = (distance == best[todo]) & (keys[candidates] < keys[found[todo]])
+                better = near & ((distance < best[todo]) | tie)
+                found[todo[better]] = candidates[better]
+                best[todo[better]] = distance[better]
+                rank += 1
+        
+        return found
+    
+    def line_ends_at(self, node_slots):
+        """Return the array of line ends attached to some nodes, numbered as in adjacency"""
+        end_node, starts, stops, ends = self.adjacency()
+        node_slots = np.fromiter(node_slots, dtype=np.int64)
+        counts = stops[node_slots] - starts[node_slots]
+        
+        # Concatenate the runs of ends of each node without a Python loop,
+        # leaving out the entries of removed ends
+        offsets = np.cumsum(counts) - counts
+        attached = ends[np.repeat(starts[node_slots] - offsets, counts) + np.arange(counts.sum())]
+        return attached[attached >= 0]
+    
+    def moved_node_slots(self, elements):
+        """Return the slots of the nodes moved with some elements
+        
+        Those are the selected nodes and the nodes at the ends of selected lines.
+        """
+        node_slots = self._selected_slots(elements, "node")
+        line_slots = self._selected_slots(elements, "line")
+        if line_slots:
+            end_node = self.adjacency()[0]
+            line_ends = 2 * np.fromiter(line_slots, dtype=np.int64)
+            attached = end_node[np.concatenate([line_ends, line_ends + 1])]
+            node_slots.update(attached[attached >= 0].tolist())
+        return node_slots
+    
+    def add_node(self, x, y, node_type):
+        """Add a new node and return its id"""
+        node_id = self._append_ids("node")[0]
+        self.node_types.append(node_type)
+        self.node_positions.append((x, y))
+        
+        # Notify listeners
+        self._changed(ChangeSet().add("node", [node_id]))
+        
+        return node_id
+    
+    def add_line(self, x1, y1, x2, y2):
+        """Add a new line and return its id"""
+        line_id = self._append_ids("line")[0]
+        self.line_positions.append((x1, y1, x2, y2))
+        
+        # Notify listeners
+        self._changed(ChangeSet().add("line", [line_id]))
+        
+        return line_id
+    
+    def add_force(self, x, y, force_type, force_value, host=None):
+        """Add a new force and return its id
+        
+        Args:
+            x, y: Position of a free force, ignored when a host is given
+            force_type: Type of the force
+            force_value: Value of the force
+            host: Optional ("node", id, 0.0) or ("line", id, t) tuple
+                binding the force to an element, t being the relative
+                position along the line
+        """
+        if host is not None:
+            x, y = self.host_position(host)
+        
+        force_id = self._append_ids("force")[0]
+        self.force_positions.append((x, y))
+        self.force_types.append(force_type)
+        self.force_values.append(force_value)
+        self.force_hosts.append(host)
+        self.force_cases.append(self.current_load_case)
+        self._force_index = None
+        
+        # Notify listeners
+        self._changed(ChangeSet().add("force", [force_id]))
+        
+        return force_id
+    
+    def add_elements(self, nodes=(), lines=()):
+        """Add a batch of nodes and lines as a single undoable operation
+        
+        Args:
+            nodes: Iterable of (x, y, node_type) tuples
+            lines: Iterable of (x1, y1, x2, y2) tuples
+            
+        Returns:
+            Tuple (node_count, line_count) of added elements
+        """
+        nodes = list(nodes)
+        lines = list(lines)
+        if not nodes and not lines:
+            return 0, 0
+        
+        # Save state for undo
+        self.save_state()
+        
+        # Extend the element lists in one pass
+        node_ids = self._append_ids("node", len(nodes))
+        self.node_types.extend(node_type for x, y, node_type in nodes)
+        self.node_positions.extend((x, y) for x, y, node_type in nodes)
+        
+        line_ids = self._append_ids("line", len(lines))
+        self.line_positions.extend(lines)
+        
+        # Notify listeners
+        self._changed(ChangeSet().add("node", node_ids).add("line", line_ids))
+        
+        return len(nodes), len(lines)
+    
+    def host_position(self, host):
+        """Return the position of a force host"""
+        host_type, host_id, t = host
+        if host_type == "node":
+            return self.node_positions[self.slot("node", host_id)]
+        
+        x1, y1, x2, y2 = self.line_positions[self.slot("line", host_id)]
+        return (x1 + t * (x2 - x1), y1 + t * (y2 - y1))
+    
+    def update_force_positions(self):
+        """Move every bound force to the current position of its host"""
+        for i, host in enumerate(self.force_hosts):
+            if host is not None:
+                self.force_positions[i] = self.host_position(host)
+    
+    def load_case_names(self):
+        """Return the names of all load cases, in order of first use"""
+        return list(dict.fromkeys(self.force_cases + [self.current_load_case]))
+    
+    def forces_on(self, element_type, element_id):
+        """Return the ids of the forces bound to a node or line"""
+        if self._force_index is None:
+            self._force_index = {}
+            for force_id, host in zip(self.forces, self.force_hosts):
+                if host is not None:
+                    self._force_index.setdefault(host[:2], []).append(force_id)
+        
+        return self._force_index.get((element_type, element_id), [])
+    
+    def _remove_hosted_forces(self, node_ids=(), line_ids=()):
+        """Drop the forces bound to removed nodes or lines and return their ids"""
+        force_ids = [force_id for i in node_ids for force_id in self.forces_on("node", i)]
+        force_ids += [force_id for i in line_ids for force_id in self.forces_on("line", i)]
+        for force_id in force_ids:
+            self._swap_remove("force", force_id)
+        if force_ids:
+            self._force_index = None
+        return force_ids
+    
+    def delete_node(self, node_id):
+        """Delete a node and all connected lines"""
+        slot = self.slot("node", node_id)
+        if slot is None:
+            return False
+        
+        # Find all connected lines
+        lines_to_remove = [self.lines[i] for i in dict.fromkeys((self.line_ends_at([slot]) // 2).tolist())]
+        
+        # Remove forces bound to the node and its lines
+        force_ids = self._remove_hosted_forces([node_id], lines_to_remove)
+        
+        # Remove the lines, then the node
+        for line_id in lines_to_remove:
+            self._swap_remove("line", line_id)
+        self._swap_remove("node", node_id)
+        
+        # Notify listeners
+        self._changed(ChangeSet().remove("node", [node_id]).remove("line", lines_to_remove).remove("force", force_ids))
+        
+        return True
+    
+    def delete_line(self, line_id):
+        """Delete a line"""
+        if self.slot("line", line_id) is None:
+            return False
+        
+        # Remove forces bound to the line
+        force_ids = self._remove_hosted_forces(line_ids=[line_id])
+        
+        # Remove the line
+        self._swap_remove("line", line_id)
+        
+        # Notify listeners
+        self._changed(ChangeSet().remove("line", [line_id]).remove("force", force_ids))
+        
+        return True
+    
+    def delete_force(self, force_id):
+        """Delete a force"""
+        if self.slot("force", force_id) is None:
+            return False
+        
+        # Remove the force
+        self._swap_remove("force", force_id)
+        self._force_index = None
+        
+        # Notify listeners
+        self._changed(ChangeSet().remove("force", [force_id]))
+        
+        return True
+    
+    def _point_buckets(self, points):
+        """Bucket points by pixel cell for tolerance lookups"""
+        buckets = {}
+        for x, y in points:
+            buckets.setdefault((math.floor(x), math.floor(y)), []).append((x, y))
+        return buckets
+    
+    def _bucket_contains(self, buckets, x, y, tolerance=1):
+        """Check whether a bucketed point lies within tolerance of (x, y)"""
+        cell_x, cell_y = math.floor(x), math.floor(y)
+        for cx in (cell_x - 1, cell_x, cell_x + 1):
+            for cy in (cell_y - 1, cell_y, cell_y + 1):
+                for px, py in buckets.get((cx, cy), ()):
+                    if abs(px - x) < tolerance and abs(py - y) < tolerance:
+                        return True
+        return False
+    
+    def delete_elements(self, elements):
+        """Delete a group of elements as a single undoable operation
+        
+        Lines connected to a deleted node are deleted with it.
+        """
+        node_slots = self._selected_slots(elements, "node")
+        line_slots = self._selected_slots(elements, "line")
+        force_slots = self._selected_slots(elements, "force")
+        
+        if not (node_slots or line_slots or force_slots):
+            return False
+        
+        # Save state for undo
+        self.save_state()
+        
+        # Find lines connected to the deleted nodes
+        if node_slots:
+            line_slots.update((self.line_ends_at(node_slots) // 2).tolist())
+        
+        # Remove the deleted forces and the forces bound to deleted hosts
+        removed = {("node", self.nodes[i]) for i in node_slots} | {("line", self.lines[i]) for i in line_slots}
+        for i, host in enumerate(self.force_hosts):
+            if host is not None and host[:2] in removed:
+                force_slots.add(i)
+        changes = ChangeSet().remove("force", [self.forces[i] for i in force_slots])
+        changes.remove("node", [self.nodes[i] for i in node_slots]).remove("line", [self.lines[i] for i in line_slots])
+        
+        # Rebuild the element lists without the deleted entries
+        self._keep("force", [i for i in range(len(self.forces)) if i not in force_slots])
+        self._keep("line", [i for i in range(len(self.lines)) if i not in line_slots])
+        self._keep("node", [i for i in range(len(self.nodes)) if i not in node_slots])
+        
+        # Clear selection
+        self.selected_element = None
+        self.selection = set()
+        
+        # Notify listeners
+        self._changed(changes)
+        
+        return True
+    
+    def move_elements(self, elements, dx, dy):
+        """Move a group of elements as a single undoable operation
+        
+        Selected lines carry their end nodes along, and every line end
+        attached to a moved node follows it.
+        """
+        node_slots = self.moved_node_slots(elements)
+        line_slots = self._selected_slots(elements, "line")
+        force_slots = self._selected_slots(elements, "force")
+        
+        if not (node_slots or line_slots or force_slots):
+            return False
+        
+        # Save state for undo
+        self.save_state()
+        
+        # Move line ends attached to moved nodes, and selected lines whole.
+        # Only the lines involved are visited, through the adjacency index.
+        moved_ends = set(self.line_ends_at(node_slots).tolist())
+        moved_ends.update(e for i in line_slots for e in (2 * i, 2 * i + 1))
+        moved_line_slots = {e // 2 for e in moved_ends}
+        for i in moved_line_slots:
+            x1, y1, x2, y2 = self.line_positions[i]
+            if 2 * i in moved_ends:
+                x1, y1 = x1 + dx, y1 + dy
+            if 2 * i + 1 in moved_ends:
+                x2, y2 = x2 + dx, y2 + dy
+            self.line_positions[i] = (x1, y1, x2, y2)
+        
+        # Move nodes and forces
+        for i in node_slots:
+            x, y = self.node_positions[i]
+            self.node_positions[i] = (x + dx, y + dy)
+        if self._adjacency is not None:
+            self._move_adjacency(node_slots)
+        
+        # Free forces move by the offset, bound forces follow their host
+        moved_forces = []
+        for i in force_slots:
+            if self.force_hosts[i] is None:
+                x, y = self.force_positions[i]
+                self.force_positions[i] = (x + dx, y + dy)
+                moved_forces.append(self.forces[i])
+        moved_nodes = [self.nodes[i] for i in node_slots]
+        moved_lines = [self.lines[i] for i in moved_line_slots]
+        bound_forces = [f for i in moved_nodes for f in self.forces_on("node", i)]
+        bound_forces += [f for i in moved_lines for f in self.forces_on("line", i)]
+        for force_id in bound_forces:
+            i = self.slot("force", force_id)
+            self.force_positions[i] = self.host_position(self.force_hosts[i])
+        
+        # Notify listeners
+        moved_forces += bound_forces
+        self._changed(ChangeSet().modify("node", moved_nodes).modify("line", moved_lines).modify("force", moved_forces))
+        
+        return True
+    
+    def set_node_types(self, elements, node_type):
+        """Change the type of all selected nodes as a single undoable operation"""
+        node_slots = self._selected_slots(elements, "node")
+        
+        if not node_slots:
+            return False
+        
+        # Save state for undo
+        self.save_state()
+        
+        for i in node_slots:
+            self.node_types[i] = node_type
+        
+        # Notify listeners
+        self._changed(ChangeSet().modify("node", [self.nodes[i] for i in node_slots]))
+        
+        return True
+    
+    def split_lines(self, splits, node_type):
+        """Split lines at interior points as a single undoable operation
+        
+        Args:
+            splits: Dictionary mapping line slot to a list of (x, y) points
+            node_type: Type of the nodes added at the split points
+            
+        Returns:
+            Tuple (node_count, line_count) of added nodes and line pieces
+        """
+        if not splits:
+            return 0, 0
+        
+        # Save state for undo
+        self.save_state()
+        
+        # Replace every split line by its pieces, ordered along the line.
+        # Lines that are not split keep their id, the pieces get new ones.
+        lines = []
+        line_positions = []
+        pieces = {}  # Split line id -> [(piece id, start t, end t)]
+        for i, (x1, y1, x2, y2) in enumerate(self.line_positions):
+            points = splits.get(i)
+            if not points:
+                lines.append(self.lines[i])
+                line_positions.append((x1, y1, x2, y2))
+                continue
+            
+            dx, dy = x2 - x1, y2 - y1
+            length_squared = (dx * dx + dy * dy) or 1.0
+            params = sorted({((x - x1) * dx + (y - y1) * dy) / length_squared: (x, y) for x, y in points}.items())
+            chain = [(0.0, (x1, y1))] + params + [(1.0, (x2, y2))]
+            line_pieces = pieces[self.lines[i]] = []
+            for (ta, (ax, ay)), (tb, (bx, by)) in zip(chain, chain[1:]):
+                if ax != bx or ay != by:
+                    piece_id = self.new_ids("line")[0]
+                    line_pieces.append((piece_id, ta, tb))
+                    lines.append(piece_id)
+                    line_positions.append((ax, ay, bx, by))
+        
+        # Rebind forces on split lines to the piece they fall on
+        changes = ChangeSet().remove("line", pieces)
+        for f, host in enumerate(self.force_hosts):
+            if host is None or host[0] != "line" or not pieces.get(host[1]):
+                continue
+            host_type, line_id, t = host
+            for piece_id, ta, tb in pieces[line_id]:
+                if t <= tb or piece_id == pieces[line_id][-1][0]:
+                    self.force_hosts[f] = ("line", piece_id, (t - ta) / (tb - ta) if tb > ta else 0.0)
+                    changes.modify("force", [self.forces[f]])
+                    break
+        self._force_index = None
+        for line_pieces in pieces.values():
+            changes.add("line", [piece_id for piece_id, ta, tb in line_pieces])
+        
+        line_count = len(line_positions) - len(self.line_positions)
+        self.lines = lines
+        self.line_positions = line_positions
+        self._slots["line"] = None
+        self._adjacency = None
+        
+        # Add nodes at split points that don't have one yet
+        buckets = self._point_buckets(self.node_positions)
+        node_count = 0
+        for points in splits.values():
+            for x, y in points:
+                if self._bucket_contains(buckets, x, y):
+                    continue
+                buckets.setdefault((math.floor(x), math.floor(y)), []).append((x, y))
+                changes.add("node", self._append_ids("node"))
+                self.node_types.append(node_type)
+                self.node_positions.append((x, y))
+                node_count += 1
+        
+        # Split lines no longer exist
+        self.selected_element = None
+        self.selection = set()
+        
+        # Notify listeners
+        self._changed(changes)
+        
+        return node_count, line_count
+    
+    def clear_all(self):
+        """Clear all elements"""
+        # Save state for undo
+        self.save_state()
+        
+        # Clear all lists
+        self.nodes = []
+        self.node_types = []
+        self.node_positions = []
+        self.lines = []
+        self.line_positions = []
+        self.forces = []
+        self.force_positions = []
+        self.force_types = []
+        self.force_values = []
+        self.force_hosts = []
+        self.force_cases = []
+        self._force_index = None
+        self._adjacency = None
+        self._slots = dict.fromkeys(self.ELEMENT_LISTS)
+        self._drop_mapped_elements()
+        
+        # Clear selection
+        self.selected_element = None
+        self.selection = set()
+        
+        # Notify listeners
+        self._changed(ChangeSet(reset=True))
\ No newline at end of file
@@ -0,0 +1,150 @@
+import bisect
+import math
+
+class Spacings:
+    """Grid spacings stored as runs of equal values
+    
+    Behaves as a read-only sequence of spacings, so `200*1.5` takes one run
+    instead of 200 floats. Offsets of the grid lines are computed per run,
+    and line lookups by distance use a binary search over the runs.
+    """
+    
+    def __init__(self, values=()):
+        self.runs = []  # (count, spacing)
+        self._starts = None  # Lookup tables, built lazily
+        self._offsets = None
+        for value in values:
+            self.append(float(value))
+    
+    @classmethod
+    def parse(cls, text):
+        """Parse whitespace separated spacings, with COUNT*SPACING for repeats
+        
+        Example:
+            "200*1.5 3.0" is 200 spacings of 1.5 followed by one of 3.0
+        
+        Raises:
+            ValueError: If a term is not a positive spacing or repeat count
+        """
+        spacings = cls()
+        for term in text.split():
+            count, _, value = term.rpartition("*")
+            count = int(count) if count else 1
+            value = float(value)
+            if count < 1 or not value > 0 or math.isinf(value):
+                raise ValueError(f"Invalid spacing: {term}")
+            spacings.append(value, count)
+        return spacings
+    
+    def append(self, value, count=1):
+        """Append count spacings of the same value"""
+        if self.runs and self.runs[-1][1] == value:
+            self.runs[-1] = (self.runs[-1][0] + count, value)
+        else:
+            self.runs.append((count, value))
+        self._starts = None
+    
+    def _index(self):
+        """Return the first spacing index and the offset where each run starts"""
+        if self._starts is None:
+            self._starts = [0]
+            self._offsets = [0.0]
+            for count, value in self.runs:
+                self._starts.append(self._starts[-1] + count)
+                self._offsets.append(self._offsets[-1] + count * value)
+        return self._starts, self._offsets
+    
+    def __len__(self):
+        return self._index()[0][-1]
+    
+    def __iter__(self):
+        for count, value in self.runs:
+            for _ in range(count):
+                yield value
+    
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        starts = self._index()[0]
+        if not 0 <= index < starts[-1]:
+            raise IndexError("spacing index out of range")
+        return self.runs[bisect.bisect_right(starts, index) - 1][1]
+    
+    def __eq__(self, other):
+        if isinstance(other, Spacings):
+            return self.runs == other.runs
+        return list(self) == list(other)
+    
+    def __repr__(self):
+        return f"Spacings({str(self)!r})"
+    
+    def __str__(self):
+        """Format the spacings in the syntax read by parse"""
+        return " ".join(str(value) if count == 1 else f"{count}*{value}" for count, value in self.runs)
+    
+    def total(self):
+        """Return the sum of the spacings"""
+        return self._index()[1][-1]
+    
+    def offset(self, line):
+        """Return the distance from the axis to grid line `line` (line 0 is the axis)"""
+        if not self.runs:
+            return 0.0
+        starts, offsets = self._index()
+        run = max(0, min(bisect.bisect_right(starts, line) - 1, len(self.runs) - 1))
+        return offsets[run] + (line - starts[run]) * self.runs[run][1]
+    
+    def nearest(self, distance):
+        """Return (line, offset) of the grid line nearest to a distance from the axis"""
+        starts, offsets = self._index()
+        run = bisect.bisect_right(offsets, distance) - 1
+        if run < 0 or not self.runs:
+            return 0, 0.0
+        if run >= len(self.runs):
+            return starts[-1], offsets[-1]
+        
+        count, value = self.runs[run]
+        step = min(count, max(0, round((distance - offsets[run]) / value)))
+        return starts[run] + step, offsets[run] + step * value
+    
+    def lines_between(self, low, high, min_gap=0.0, axis=True):
+        """Yield (line, offset) of the grid lines between two distances
+        
+        Lines closer than min_gap to the previous line yielded are skipped,
+        without visiting them, so a zoomed out axis of many thousands of
+        spacings only costs as much as the lines actually drawn. Within a
+        run the lines kept are multiples of the same stride, so they stay put
+        while the bounds move. The axis itself (line 0) is left out unless
+        axis is set, but later lines still keep their distance from it.
+        """
+        starts, offsets = self._index()
+        low = max(low, 0.0)
+        last = low - min_gap
+        if low <= 0 <= high:
+            if axis:
+                yield 0, 0.0
+            last = 0.0
+        
+        # First run ending at or after the low bound
+        run = max(0, bisect.bisect_left(offsets, low) - 1)
+        for run in range(run, len(self.runs)):
+            start = offsets[run]
+            if start > high:
+                break
+            count, value = self.runs[run]
+            
+            # Lines start + k * value for k = 1..count, from the low bound
+            # and from the previous line plus the gap
+            k = max(1, math.ceil((max(low, last + min_gap) - start) / value))
+            stride = max(1, math.ceil(min_gap / value))
+            if stride <= count:
+                k = -(-k // stride) * stride
+            while k <= count:
+                position = start + k * value
+                if position > high:
+                    return
+                yield starts[run] + k, position
+                last = position
+                k += stride
\ No newline at end of file
@@ -4,7 +4,8 @@ from PyQt6.QtWidgets import (
 )
 from PyQt6.QtCore import Qt, pyqtSignal
 
-from src.models.constants import NodeType
+from src.models.constants import NodeType, ForceType
+from src.models.spacings import Spacings
 
 class LeftPanel(QScrollArea):
     # Signal emitted when grid settings are updated
@@ -35,6 +36,9 @@ class LeftPanel(QScrollArea):
         # Add node types group
         self.add_node_types_group(layout)
         
+        # Add force types group
+        self.add_force_types_group(layout)
+        
         # Add force value group
         self.add_force_value_group(layout)
         
@@ -70,6 +74,28 @@ class LeftPanel(QScrollArea):
         group_box.setLayout(group_layout)
         layout.addWidget(group_box)
     
+    def add_force_types_group(self, layout):
+        """Add force types selection group"""
+        group_box = QGroupBox("Force Types")
+        group_layout = QVBoxLayout()
+        
+        # Create radio buttons for force types
+        self.point_radio = QRadioButton("Point Load")
+        self.point_radio.setChecked(True)
+        self.point_radio.clicked.connect(lambda: self.set_force_type(ForceType.POINT))
+        group_layout.addWidget(self.point_radio)
+        
+        self.rectangle_radio = QRadioButton("Uniform Load")
+        self.rectangle_radio.clicked.connect(lambda: self.set_force_type(ForceType.RECTANGLE))
+        group_layout.addWidget(self.rectangle_radio)
+        
+        self.triangle_radio = QRadioButton("Triangular Load")
+        self.triangle_radio.clicked.connect(lambda: self.set_force_type(ForceType.TRIANGLE))
+        group_layout.addWidget(self.triangle_radio)
+        
+        group_box.setLayout(group_layout)
+        layout.addWidget(group_box)
+    
     def add_force_value_group(self, layout):
         """Add force value input group"""
         group_box = QGroupBox("Force Value")
@@ -81,6 +107,12 @@ class LeftPanel(QScrollArea):
         self.force_value.textChanged.connect(self.update_force_value)
         group_layout.addRow("Value (kN):", self.force_value)
         
+        # Load case of new forces
+        self.load_case = QLineEdit(self.app_state.current_load_case)
+        self.load_case.setPlaceholderText("Enter load case name")
+        self.load_case.textChanged.connect(self.update_load_case)
+        group_layout.addRow("Load case:", self.load_case)
+        
         group_box.setLayout(group_layout)
         layout.addWidget(group_box)
     
@@ -91,12 +123,12 @@ class LeftPanel(QScrollArea):
         
         # Horizontal spacing input
         self.h_spacing = QLineEdit("1 2 5 6")
-        self.h_spacing.setPlaceholderText("Enter horizontal spacings separated by spaces")
+        self.h_spacing.setPlaceholderText("Spacings separated by spaces, e.g. 200*1.5 3.0")
         group_layout.addRow("Horizontal:", self.h_spacing)
         
         # Vertical spacing input
         self.v_spacing = QLineEdit("7 8 4 5")
-        self.v_spacing.setPlaceholderText("Enter vertical spacings separated by spaces")
+        self.v_spacing.setPlaceholderText("Spacings separated by spaces, e.g. 200*1.5 3.0")
         group_layout.addRow("Vertical:", self.v_spacing)
         
         # Update button
@@ -111,6 +143,10 @@ class LeftPanel(QScrollArea):
         """Set the current node type"""
         self.app_state.current_node_type = node_type
     
+    def set_force_type(self, force_type):
+        """Set the current force type"""
+        self.app_state.current_force_type = force_type
+    
     def update_force_value(self):
         """Update the current force value"""
         try:
@@ -120,22 +156,30 @@ class LeftPanel(QScrollArea):
             # Invalid input, ignore
             pass
     
+    def update_load_case(self):
+        """Update the load case of new forces"""
+        name = self.load_case.text().strip()
+        if name:
+            self.app_state.current_load_case = name
+    
     def update_grid_spacing(self):
         """Update grid spacing based on input fields"""
         # Parse horizontal spacings
         try:
-            h_spacings = [float(x) for x in self.h_spacing.text().split() if x.strip()]
-            if h_spacings:
+            h_spacings = Spacings.parse(self.h_spacing.text())
+            if len(h_spacings) and h_spacings != self.app_state.h_spacings:
                 self.app_state.h_spacings = h_spacings
+                self.app_state.mark_modified()
         except ValueError:
             # Invalid input, ignore
             pass
         
         # Parse vertical spacings
         try:
-            v_spacings = [float(x) for x in self.v_spacing.text().split() if x.strip()]
-            if v_spacings:
+            v_spacings = Spacings.parse(self.v_spacing.text())
+            if len(v_spacings) and v_spacings != self.app_state.v_spacings:
                 self.app_state.v_spacings = v_spacings
+                self.app_state.mark_modified()
         except ValueError:
             # Invalid input, ignore
             pass
@@ -0,0 +1,46 @@
+import os
+import tempfile
+from contextlib import contextmanager
+
+@contextmanager
+def atomic_write(file_path, mode="w", **kwargs):
+    """Open a temporary file that replaces file_path once fully written
+    
+    The temporary file sits next to the target, is flushed to disk and then
+    renamed over it, so a crash or error while writing leaves the previous
+    file intact. The new file keeps the permissions of the one it replaces.
+    
+    Example:
+        with atomic_write(file_path) as f:
+            json.dump(data, f)
+    """
+    directory = os.path.dirname(os.path.abspath(file_path))
+    fd, temp_path = tempfile.mkstemp(prefix=".", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, mode, **kwargs) as f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        
+        # mkstemp creates private files: keep the permissions of the file
+        # replaced, or else those a plain open would give
+        if os.path.exists(file_path):
+            permissions = os.stat(file_path).st_mode & 0o777
+        else:
+            umask = os.umask(0)
+            os.umask(umask)
+            permissions = 0o666 & ~umask
+        os.chmod(temp_path, permissions)
+        os.replace(temp_path, file_path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    
+    # Make the rename itself durable, where directories can be synced
+    if hasattr(os, "O_DIRECTORY"):
+        dir_fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
\ No newline at end of file
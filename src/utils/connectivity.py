@@ -0,0 +1,191 @@
+import math
+
+import numpy as np
+
+from src.models.constants import NodeType, ForceType
+
+# Integer codes for node types in exported arrays
+NODE_TYPE_CODES = {
+    NodeType.SIMPLE: 0,
+    NodeType.FIXED: 1,
+    NodeType.HINGE: 2,
+    NodeType.ELASTIC: 3
+}
+
+# Integer codes for force types in exported arrays
+FORCE_TYPE_CODES = {
+    ForceType.POINT: 0,
+    ForceType.RECTANGLE: 1,
+    ForceType.TRIANGLE: 2,
+    ForceType.CIRCULAR: 3
+}
+
+# Boundary conditions per node type for the (ux, uy, rz) degrees of freedom:
+# 0 = free, 1 = restrained, 2 = elastic spring
+FREE = 0
+RESTRAINED = 1
+SPRING = 2
+
+SUPPORT_CONDITIONS = {
+    NodeType.SIMPLE: (FREE, FREE, FREE),
+    NodeType.FIXED: (RESTRAINED, RESTRAINED, RESTRAINED),
+    NodeType.HINGE: (RESTRAINED, RESTRAINED, FREE),
+    NodeType.ELASTIC: (SPRING, SPRING, FREE)
+}
+
+def build_connectivity(app_state, tolerance=0.5):
+    """Build node-indexed connectivity arrays from the application state
+    
+    Line ends are matched to the nodes within the tolerance with
+    Model.nodes_at, which also searches the neighbouring cells, so points
+    on both sides of a cell boundary still match. Line ends without a node
+    get an extra node of type simple, appended after the existing ones,
+    shared by the free ends within the tolerance of each other.
+    
+    Args:
+        app_state: Application state
+        tolerance: Matching tolerance in model coordinates (pixels)
+        
+    Returns:
+        Dictionary with the arrays:
+            node_xy: (n, 2) float64 node coordinates in meters, y pointing up
+            node_type: (n,) int8 NODE_TYPE_CODES
+            node_bc: (n, 3) int8 boundary conditions for (ux, uy, rz)
+            members: (m, 2) int64 start and end node indexes
+            force_type, force_value, force_host, force_host_index, force_t:
+                forces with their host kind (0 = free, 1 = node, 2 = member)
+                and host index into the node or member arrays
+            force_case: (f,) int32 load case index of every force
+            load_cases: load case names, in order of first use
+    """
+    node_px = np.asarray(app_state.node_positions, dtype=np.float64).reshape(-1, 2)
+    line_px = np.asarray(app_state.line_positions, dtype=np.float64).reshape(-1, 4)
+    node_count = len(node_px)
+    member_count = len(line_px)
+    
+    # Coincident nodes are merged into the first of them. Following the
+    # matches until they settle keeps every node pointing at a kept one.
+    node_of = app_state.nodes_at(node_px, tolerance)
+    while len(node_of) and np.any(node_of[node_of] != node_of):
+        node_of = node_of[node_of]
+    
+    # Line ends on a node use it, start ends first then end ends
+    ends = np.vstack([line_px[:, :2], line_px[:, 2:]])
+    end_node = app_state.nodes_at(ends, tolerance)
+    on_node = end_node >= 0
+    end_node[on_node] = node_of[end_node[on_node]]
+    
+    # Free ends within the tolerance of each other share an extra node,
+    # found through the tolerance cells around each end
+    extra_px = []
+    buckets = {}  # Tolerance cell -> [(x, y, extra node)]
+    free = np.flatnonzero(~on_node)
+    for k, (x, y) in zip(free.tolist(), ends[free].tolist()):
+        cell_x, cell_y = math.floor(x / tolerance), math.floor(y / tolerance)
+        node = next((
+            extra for cx in (cell_x - 1, cell_x, cell_x + 1) for cy in (cell_y - 1, cell_y, cell_y + 1)
+            for px, py, extra in buckets.get((cx, cy), ()) if abs(px - x) < tolerance and abs(py - y) < tolerance
+        ), None)
+        if node is None:
+            node = node_count + len(extra_px)
+            extra_px.append((x, y))
+            buckets.setdefault((cell_x, cell_y), []).append((x, y, node))
+        end_node[k] = node
+    
+    members = end_node.reshape(2, member_count).T
+    all_px = np.vstack([node_px, np.reshape(extra_px, (-1, 2))])
+    
+    # Convert to real-world coordinates
+    node_xy = np.empty_like(all_px)
+    node_xy[:, 0] = (all_px[:, 0] - app_state.origin_x) / app_state.scale_factor_x
+    node_xy[:, 1] = (app_state.origin_y - all_px[:, 1]) / app_state.scale_factor_y
+    
+    # Node type and boundary condition codes, extra nodes are simple
+    type_codes = {t.value: code for t, code in NODE_TYPE_CODES.items()}
+    node_type = np.array([type_codes[t] for t in app_state.node_types] + [0] * len(extra_px), dtype=np.int8)
+    bc_table = np.array([SUPPORT_CONDITIONS[t] for t in NODE_TYPE_CODES], dtype=np.int8)
+    node_bc = bc_table[node_type]
+    
+    # Forces, with hosts renumbered into the node and member arrays
+    hosts = app_state.force_hosts
+    force_host = np.array([0 if h is None else (1 if h[0] == "node" else 2) for h in hosts], dtype=np.int8)
+    slot = app_state.slot
+    force_host_index = np.array(
+        [-1 if h is None else (node_of[slot("node", h[1])] if h[0] == "node" else slot("line", h[1])) for h in hosts],
+        dtype=np.int64
+    )
+    
+    # Load cases numbered in order of first use
+    load_cases = list(dict.fromkeys(app_state.force_cases))
+    case_codes = {name: i for i, name in enumerate(load_cases)}
+    
+    return {
+        "node_xy": node_xy,
+        "node_type": node_type,
+        "node_bc": node_bc,
+        "members": members,
+        "force_type": np.array([FORCE_TYPE_CODES[ForceType(t)] for t in app_state.force_types], dtype=np.int8),
+        "force_value": np.array(app_state.force_values, dtype=np.float64),
+        "force_host": force_host,
+        "force_host_index": force_host_index,
+        "force_t": np.array([0.0 if h is None else h[2] for h in hosts], dtype=np.float64),
+        "force_case": np.array([case_codes[c] for c in app_state.force_cases], dtype=np.int32),
+        "load_cases": np.array(load_cases, dtype=str)
+    }
+
+def csr_from_coo(rows, cols, data, shape):
+    """Build CSR arrays (indptr, indices, data) from coordinate entries
+    
+    Entries are sorted by row, then column. Duplicates are kept.
+    """
+    order = np.lexsort((cols, rows))
+    indptr = np.zeros(shape[0] + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows, minlength=shape[0]), out=indptr[1:])
+    return indptr, cols[order].astype(np.int64), data[order]
+
+def incidence_matrix(members, node_count):
+    """Return the node-member incidence matrix in CSR form
+    
+    Entry (node, member) is -1 at the member start and +1 at its end.
+    """
+    member_count = len(members)
+    rows = np.concatenate([members[:, 0], members[:, 1]])
+    cols = np.concatenate([np.arange(member_count), np.arange(member_count)])
+    data = np.concatenate([-np.ones(member_count, dtype=np.int8), np.ones(member_count, dtype=np.int8)])
+    return csr_from_coo(rows, cols, data, (node_count, member_count))
+
+def adjacency_matrix(members, node_count):
+    """Return the symmetric node adjacency matrix in CSR form"""
+    pairs = np.vstack([members, members[:, ::-1]])
+    pairs = pairs[pairs[:, 0] != pairs[:, 1]]
+    
+    # Drop parallel members, sorting on a packed (row, column) key
+    keys = np.sort(pairs[:, 0] * node_count + pairs[:, 1])
+    keys = keys[np.concatenate([[True], keys[1:] != keys[:-1]])] if len(keys) else keys
+    rows, cols = keys // max(node_count, 1), keys % max(node_count, 1)
+    return csr_from_coo(rows, cols, np.ones(len(keys), dtype=np.int8), (node_count, node_count))
+
+def export_connectivity(app_state, file_path):
+    """Write connectivity arrays and CSR incidence/adjacency matrices to a .npz file
+    
+    A CSR matrix named X is stored as X_indptr, X_indices, X_data and X_shape,
+    ready for scipy.sparse.csr_matrix((data, indices, indptr), shape).
+    """
+    arrays = build_connectivity(app_state)
+    node_count = len(arrays["node_xy"])
+    
+    for name, matrix, shape in (
+        ("incidence", incidence_matrix(arrays["members"], node_count), (node_count, len(arrays["members"]))),
+        ("adjacency", adjacency_matrix(arrays["members"], node_count), (node_count, node_count))
+    ):
+        indptr, indices, data = matrix
+        arrays[f"{name}_indptr"] = indptr
+        arrays[f"{name}_indices"] = indices
+        arrays[f"{name}_data"] = data
+        arrays[f"{name}_shape"] = np.array(shape, dtype=np.int64)
+    
+    # Code tables, so the file is self-describing
+    arrays["node_type_names"] = np.array([t.value for t in NODE_TYPE_CODES])
+    arrays["force_type_names"] = np.array([t.value for t in FORCE_TYPE_CODES])
+    
+    np.savez(file_path, **arrays)
\ No newline at end of file
@@ -4,7 +4,12 @@ from PyQt6.QtCore import Qt, QPointF, QRectF
 from src.models.constants import NodeType, ForceType
 
 def draw_node(scene, x, y, node_type, zoom_level=1.0):
-    """Draw a node on the scene with the given type"""
+    """Draw a node on the scene with the given type
+    
+    Returns:
+        The item of the glyph, parent of its other items so they are
+        removed with it, or None for an unknown type
+    """
     # Base size adjusted for zoom
     base_size = 8
     size = base_size * zoom_level
@@ -42,8 +47,8 @@ def draw_node(scene, x, y, node_type, zoom_level=1.0):
         # Draw cross
         cross_pen = QPen(QColor("white"))
         cross_pen.setWidth(max(2, int(2 * zoom_level)))
-        scene.addLine(x-size, y, x+size, y, cross_pen)
-        scene.addLine(x, y-size, x, y+size, cross_pen)
+        scene.addLine(x-size, y, x+size, y, cross_pen).setParentItem(node)
+        scene.addLine(x, y-size, x, y+size, cross_pen).setParentItem(node)
         
         return node
     
@@ -60,17 +65,22 @@ def draw_node(scene, x, y, node_type, zoom_level=1.0):
         spring_pen.setWidth(max(1, int(zoom_level)))
         
         # Draw diagonal springs
-        scene.addLine(x-size*1.6, y-size*1.6, x-size, y-size, spring_pen)
-        scene.addLine(x-size*1.6, y+size*1.6, x-size, y+size, spring_pen)
-        scene.addLine(x+size*1.6, y-size*1.6, x+size, y-size, spring_pen)
-        scene.addLine(x+size*1.6, y+size*1.6, x+size, y+size, spring_pen)
+        scene.addLine(x-size*1.6, y-size*1.6, x-size, y-size, spring_pen).setParentItem(node)
+        scene.addLine(x-size*1.6, y+size*1.6, x-size, y+size, spring_pen).setParentItem(node)
+        scene.addLine(x+size*1.6, y-size*1.6, x+size, y-size, spring_pen).setParentItem(node)
+        scene.addLine(x+size*1.6, y+size*1.6, x+size, y+size, spring_pen).setParentItem(node)
         
         return node
     
     return None
 
 def draw_force(scene, x, y, force_type, value, zoom_level=1.0):
-    """Draw a force on the scene with the given type and value"""
+    """Draw a force on the scene with the given type and value
+    
+    Returns:
+        The item of the glyph, parent of its other items so they are
+        removed with it, or None for an unknown type
+    """
     # Base size adjusted for zoom
     base_size = 10
     size = base_size * zoom_level
@@ -89,12 +99,13 @@ def draw_force(scene, x, y, force_type, value, zoom_level=1.0):
         path.closeSubpath()
         
         brush = QBrush(QColor("red"), Qt.BrushStyle.SolidPattern)
-        scene.addPath(path, pen, brush)
+        scene.addPath(path, pen, brush).setParentItem(arrow)
         
         # Add value text
         text = scene.addText(f"{value} kN")
         text.setPos(x+size, y-size*2.5)
         text.setDefaultTextColor(QColor("red"))
+        text.setParentItem(arrow)
         
         return arrow
     
@@ -112,6 +123,7 @@ def draw_force(scene, x, y, force_type, value, zoom_level=1.0):
         text = scene.addText(f"{value} kN/m")
         text.setPos(x-width/2, y-height-20)
         text.setDefaultTextColor(QColor("black"))
+        text.setParentItem(rect)
         
         return rect
     
@@ -132,4 +144,22 @@ def draw_force(scene, x, y, force_type, value, zoom_level=1.0):
         
         return scene.addPath(path, pen, brush)
     
-    return None
\ No newline at end of file
+    return None
+
+def force_extent(x, y, force_type, zoom_level=1.0):
+    """Return the bounding box (xmin, ymin, xmax, ymax) of a force glyph
+    
+    Matches the shapes drawn by draw_force, excluding the value label.
+    """
+    base_size = 10
+    size = base_size * zoom_level
+    
+    if force_type == ForceType.POINT:
+        # Arrow shaft and head
+        return (x - size * 0.5, y - size * 2, x + size * 0.5, y)
+    
+    if force_type in (ForceType.RECTANGLE, ForceType.TRIANGLE):
+        # Glyph box above the application point
+        return (x - size, y - size * 3, x + size, y)
+    
+    return (x - size, y - size, x + size, y + size)
\ No newline at end of file
@@ -0,0 +1,209 @@
+import csv
+import json
+import math
+import os
+
+from src.utils.connectivity import build_connectivity, export_connectivity, NODE_TYPE_CODES
+
+# Registered exporters: format name -> Exporter
+EXPORTERS = {}
+
+# Elements formatted per write call by the streaming writers
+BATCH_SIZE = 10000
+
+class Exporter:
+    """A registered export format"""
+    
+    def __init__(self, name, extension, description, writer):
+        self.name = name
+        self.extension = extension
+        self.description = description
+        self.writer = writer
+    
+    def file_filter(self):
+        """Return the file dialog filter of the format"""
+        return f"{self.description} (*{self.extension})"
+
+def register_exporter(name, extension, description):
+    """Register a writer(app_state, file_path) function for a format
+    
+    Usage:
+        @register_exporter("json", ".json", "JSON Files")
+        def write_json(app_state, file_path):
+            ...
+    """
+    def decorator(writer):
+        EXPORTERS[name] = Exporter(name, extension, description, writer)
+        return writer
+    return decorator
+
+def exporter_for(file_path=None, format_name=None):
+    """Find the exporter of a format name, or else of a file extension
+    
+    Raises:
+        ValueError: If no registered exporter matches
+    """
+    if format_name is not None:
+        if format_name not in EXPORTERS:
+            raise ValueError(f"Unknown export format: {format_name}")
+        return EXPORTERS[format_name]
+    
+    extension = os.path.splitext(file_path or "")[1].lower()
+    for exporter in EXPORTERS.values():
+        if exporter.extension == extension:
+            return exporter
+    
+    raise ValueError(f"No exporter for '{extension}' files")
+
+def export_filters():
+    """Return the file dialog filter string of all exporters"""
+    return ";;".join(exporter.file_filter() for exporter in EXPORTERS.values())
+
+def export_model(app_state, file_path, format_name=None):
+    """Export the model with the exporter of a format or file extension"""
+    exporter = exporter_for(file_path, format_name)
+    exporter.writer(app_state, file_path)
+    return exporter
+
+def to_meters(app_state, x, y):
+    """Convert screen coordinates to real-world coordinates"""
+    return ((x - app_state.origin_x) / app_state.scale_factor_x,
+            (app_state.origin_y - y) / app_state.scale_factor_y)
+
+def forces_block(app_state):
+    """Convert the forces to a columnar block with one list per field
+    
+    Bound forces reference their host by element number (its slot plus
+    one) and, for lines, by relative position t along the member.
+    """
+    block = {
+        "type": [],
+        "value": [],
+        "case": [],
+        "host": [],
+        "host_id": [],
+        "t": [],
+        "x": [],
+        "y": []
+    }
+    
+    for i, (x, y) in enumerate(app_state.force_positions):
+        host = app_state.force_hosts[i]
+        x_meters, y_meters = to_meters(app_state, x, y)
+        
+        block["type"].append(app_state.force_types[i])
+        block["value"].append(app_state.force_values[i])
+        block["case"].append(app_state.force_cases[i])
+        block["host"].append(host[0] if host else None)
+        block["host_id"].append(app_state.slot(*host[:2]) + 1 if host else None)
+        block["t"].append(round(host[2], 6) if host else None)
+        block["x"].append(round(x_meters, 2))
+        block["y"].append(round(y_meters, 2))
+    
+    return block
+
+def write_batches(f, items, format_item, separator=""):
+    """Write formatted items in batches instead of one call per item"""
+    batch = []
+    first = True
+    for item in items:
+        batch.append(format_item(item))
+        if len(batch) >= BATCH_SIZE:
+            f.write(("" if first else separator) + separator.join(batch))
+            batch = []
+            first = False
+    
+    if batch:
+        f.write(("" if first else separator) + separator.join(batch))
+
+@register_exporter("json", ".json", "JSON Files")
+def write_json(app_state, file_path):
+    """Write nodes, lines and forces as JSON, one element per line"""
+    def node_entry(item):
+        i, ((x, y), node_type) = item
+        x_meters, y_meters = to_meters(app_state, x, y)
+        return "\n    " + json.dumps({
+            "id": i + 1,
+            "type": node_type,
+            "coordinates": {"x": round(x_meters, 2), "y": round(y_meters, 2)}
+        })
+    
+    def line_entry(item):
+        i, (x1, y1, x2, y2) = item
+        x1_meters, y1_meters = to_meters(app_state, x1, y1)
+        x2_meters, y2_meters = to_meters(app_state, x2, y2)
+        length = math.sqrt((x2_meters - x1_meters) ** 2 + (y2_meters - y1_meters) ** 2)
+        return "\n    " + json.dumps({
+            "id": i + 1,
+            "start_node": {"x": round(x1_meters, 2), "y": round(y1_meters, 2)},
+            "end_node": {"x": round(x2_meters, 2), "y": round(y2_meters, 2)},
+            "length": round(length, 2)
+        })
+    
+    with open(file_path, "w") as f:
+        f.write('{\n"nodes": [')
+        write_batches(f, enumerate(zip(app_state.node_positions, app_state.node_types)), node_entry, ",")
+        f.write('\n],\n"lines": [')
+        write_batches(f, enumerate(app_state.line_positions), line_entry, ",")
+        f.write('\n],\n"forces": ')
+        json.dump(forces_block(app_state), f)
+        f.write("\n}\n")
+
+@register_exporter("csv", ".csv", "CSV Tables")
+def write_csv(app_state, file_path):
+    """Write a node table and a member table referencing node ids
+    
+    Members go to a second file named after the first, with a _members
+    suffix. Line ends without a node get an extra node, see
+    build_connectivity.
+    """
+    model = build_connectivity(app_state)
+    type_names = {code: node_type.value for node_type, code in NODE_TYPE_CODES.items()}
+    
+    with open(file_path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["id", "x", "y", "type"])
+        node_xy = model["node_xy"].round(4).tolist()
+        types = model["node_type"].tolist()
+        writer.writerows((i + 1, x, y, type_names[t]) for i, ((x, y), t) in enumerate(zip(node_xy, types)))
+    
+    stem, extension = os.path.splitext(file_path)
+    with open(f"{stem}_members{extension}", "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["id", "start_node", "end_node", "length"])
+        members = model["members"]
+        delta = model["node_xy"][members[:, 1]] - model["node_xy"][members[:, 0]]
+        lengths = (delta ** 2).sum(axis=1) ** 0.5
+        writer.writerows(
+            (i + 1, start + 1, end + 1, length)
+            for i, ((start, end), length) in enumerate(zip(members.tolist(), lengths.round(4).tolist()))
+        )
+
+@register_exporter("dxf", ".dxf", "DXF Drawings")
+def write_dxf(app_state, file_path):
+    """Write members as LINE and nodes as POINT entities of an R12 DXF
+    
+    Members go on the MEMBERS layer and nodes on one NODES_<TYPE> layer
+    per node type. Coordinates are in meters.
+    """
+    def line_entity(line):
+        x1, y1 = to_meters(app_state, line[0], line[1])
+        x2, y2 = to_meters(app_state, line[2], line[3])
+        return f"0\nLINE\n8\nMEMBERS\n10\n{x1:.4f}\n20\n{y1:.4f}\n30\n0.0\n11\n{x2:.4f}\n21\n{y2:.4f}\n31\n0.0\n"
+    
+    def point_entity(item):
+        (x, y), node_type = item
+        x, y = to_meters(app_state, x, y)
+        layer = "NODES_" + node_type.upper().replace(" ", "_")
+        return f"0\nPOINT\n8\n{layer}\n10\n{x:.4f}\n20\n{y:.4f}\n30\n0.0\n"
+    
+    with open(file_path, "w") as f:
+        f.write("0\nSECTION\n2\nENTITIES\n")
+        write_batches(f, app_state.line_positions, line_entity)
+        write_batches(f, zip(app_state.node_positions, app_state.node_types), point_entity)
+        f.write("0\nENDSEC\n0\nEOF\n")
+
+@register_exporter("npz", ".npz", "Connectivity Arrays")
+def write_npz(app_state, file_path):
+    """Write connectivity arrays and CSR matrices, see export_connectivity"""
+    export_connectivity(app_state, file_path)
\ No newline at end of file
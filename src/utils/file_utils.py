@@ -2,13 +2,37 @@ import json
 import os
 import math
 
+from src.utils.atomic_file import atomic_write
+from src.utils.exporters import export_model, forces_block
+from src.utils.importers import import_model
+from src.utils.project_map import write_project_map, read_project_map, is_project_map, PROJECT_MAP_EXTENSION
+
 class FileManager:
     def __init__(self, app_state):
         self.app_state = app_state
+        self.map_layout = None  # MapLayout of the mapped project at current_file_path
     
     def save_file(self, file_path):
-        """Save the grid structure to a file"""
+        """Save the grid structure to a file
+        
+        Saving an unchanged model over the file it came from is skipped.
+        Files are written in full to a temporary file renamed over the old
+        one, so a failed save leaves the previous file intact.
+        """
         try:
+            if file_path == self.app_state.current_file_path and not self.app_state.is_modified() \
+                    and os.path.exists(file_path):
+                return True
+            
+            # Mapped projects are written as fixed-width binary records,
+            # reusing the sections of the previous save that did not change
+            if file_path.endswith(PROJECT_MAP_EXTENSION):
+                layout = self.map_layout if file_path == self.app_state.current_file_path else None
+                self.map_layout = write_project_map(self.app_state, file_path, layout=layout)
+                self.app_state.current_file_path = file_path
+                self.app_state.saved_revision = self.app_state.revision
+                return True
+            
             data = {
                 "nodes": [],
                 "lines": []
@@ -55,12 +79,18 @@ class FileManager:
                 }
                 data["lines"].append(line_data)
             
+            # Save forces and load combinations
+            data["forces"] = self.forces_to_data()
+            data["load_combinations"] = self.app_state.load_combinations
+            
             # Save to file
-            with open(file_path, 'w') as f:
+            with atomic_write(file_path) as f:
                 json.dump(data, f, indent=4)
             
             # Update current file path
             self.app_state.current_file_path = file_path
+            self.app_state.saved_revision = self.app_state.revision
+            self.map_layout = None
             
             return True
         except Exception as e:
@@ -70,105 +100,104 @@ class FileManager:
     def load_file(self, file_path):
         """Load the grid structure from a file"""
         try:
+            # The file replaces the model as a single undoable step, and a
+            # file that fails to load leaves the model as it was
+            if is_project_map(file_path):
+                with self.app_state.transaction():
+                    layout = read_project_map(self.app_state, file_path)
+                self.app_state.current_file_path = file_path
+                self.app_state.saved_revision = layout.revision = self.app_state.revision
+                self.map_layout = layout
+                return True
+            
             with open(file_path, 'r') as f:
                 data = json.load(f)
             
-            # Clear current structure
-            self.app_state.clear_all()
+            with self.app_state.transaction():
+                # Clear current structure
+                self.app_state.clear_all()
             
-            # Load nodes
-            for node_data in data["nodes"]:
-                # Convert from real-world coordinates to screen coordinates
-                x = self.app_state.origin_x + node_data["coordinates"]["x"] * self.app_state.scale_factor_x
-                y = self.app_state.origin_y - node_data["coordinates"]["y"] * self.app_state.scale_factor_y
+                # Load nodes
+                for node_data in data["nodes"]:
+                    # Convert from real-world coordinates to screen coordinates
+                    x = self.app_state.origin_x + node_data["coordinates"]["x"] * self.app_state.scale_factor_x
+                    y = self.app_state.origin_y - node_data["coordinates"]["y"] * self.app_state.scale_factor_y
                 
-                # Add node
-                self.app_state.nodes.append(len(self.app_state.nodes))
-                self.app_state.node_types.append(node_data["type"])
-                self.app_state.node_positions.append((x, y))
-            
-            # Load lines
-            for line_data in data["lines"]:
-                # Convert from real-world coordinates to screen coordinates
-                x1 = self.app_state.origin_x + line_data["start_node"]["x"] * self.app_state.scale_factor_x
-                y1 = self.app_state.origin_y - line_data["start_node"]["y"] * self.app_state.scale_factor_y
-                x2 = self.app_state.origin_x + line_data["end_node"]["x"] * self.app_state.scale_factor_x
-                y2 = self.app_state.origin_y - line_data["end_node"]["y"] * self.app_state.scale_factor_y
+                    # Add node
+                    self.app_state.nodes.append(self.app_state.new_ids("node")[0])
+                    self.app_state.node_types.append(node_data["type"])
+                    self.app_state.node_positions.append((x, y))
+            
+                # Load lines
+                for line_data in data["lines"]:
+                    # Convert from real-world coordinates to screen coordinates
+                    x1 = self.app_state.origin_x + line_data["start_node"]["x"] * self.app_state.scale_factor_x
+                    y1 = self.app_state.origin_y - line_data["start_node"]["y"] * self.app_state.scale_factor_y
+                    x2 = self.app_state.origin_x + line_data["end_node"]["x"] * self.app_state.scale_factor_x
+                    y2 = self.app_state.origin_y - line_data["end_node"]["y"] * self.app_state.scale_factor_y
                 
-                # Add line
-                self.app_state.lines.append(len(self.app_state.lines))
-                self.app_state.line_positions.append((x1, y1, x2, y2))
+                    # Add line
+                    self.app_state.lines.append(self.app_state.new_ids("line")[0])
+                    self.app_state.line_positions.append((x1, y1, x2, y2))
+            
+                # Load forces (older files have none)
+                if "forces" in data:
+                    self.forces_from_data(data["forces"])
+                self.app_state.reindex()
+                
+                # Load combinations (older files have none)
+                self.app_state.load_combinations = data.get("load_combinations", {})
             
             # Update current file path
             self.app_state.current_file_path = file_path
-            
-            # Signal that the state has changed
-            self.app_state.state_changed.emit()
+            self.app_state.saved_revision = self.app_state.revision
+            self.map_layout = None
             
             return True
         except Exception as e:
             print(f"Error loading file: {str(e)}")
             return False
     
-    def export_data(self, file_path):
-        """Export grid structure data in a format suitable for analysis"""
+    def export_data(self, file_path, format_name=None):
+        """Export grid structure data with the exporter of a format or file extension"""
         try:
-            # Create data structure
-            data = {
-                "nodes": [],
-                "lines": []
-            }
-            
-            # Add node data
-            for i, (x, y) in enumerate(self.app_state.node_positions):
-                # Convert to real-world coordinates
-                x_meters = (x - self.app_state.origin_x) / self.app_state.scale_factor_x
-                y_meters = (self.app_state.origin_y - y) / self.app_state.scale_factor_y
-                
-                node_data = {
-                    "id": i + 1,
-                    "type": self.app_state.node_types[i],
-                    "coordinates": {
-                        "x": round(x_meters, 2),
-                        "y": round(y_meters, 2)
-                    }
-                }
-                data["nodes"].append(node_data)
-            
-            # Add line data
-            for i, (x1, y1, x2, y2) in enumerate(self.app_state.line_positions):
-                # Convert to real-world coordinates
-                x1_meters = (x1 - self.app_state.origin_x) / self.app_state.scale_factor_x
-                y1_meters = (self.app_state.origin_y - y1) / self.app_state.scale_factor_y
-                x2_meters = (x2 - self.app_state.origin_x) / self.app_state.scale_factor_x
-                y2_meters = (self.app_state.origin_y - y2) / self.app_state.scale_factor_y
-                
-                # Calculate length
-                length = math.sqrt((x2_meters - x1_meters) ** 2 + (y2_meters - y1_meters) ** 2)
-                
-                line_data = {
-                    "id": i + 1,
-                    "start_node": {
-                        "x": round(x1_meters, 2),
-                        "y": round(y1_meters, 2)
-                    },
-                    "end_node": {
-                        "x": round(x2_meters, 2),
-                        "y": round(y2_meters, 2)
-                    },
-                    "length": round(length, 2)
-                }
-                data["lines"].append(line_data)
-            
-            # Create data directory if it doesn't exist
-            os.makedirs("data", exist_ok=True)
-            os.makedirs("data/grille", exist_ok=True)
-            
-            # Save to file
-            with open(file_path, 'w') as f:
-                json.dump(data, f, indent=4)
-            
+            export_model(self.app_state, file_path, format_name)
             return True
         except Exception as e:
             print(f"Error exporting data: {str(e)}")
-            return False
\ No newline at end of file
+            return False
+    
+    def import_data(self, file_path, format_name=None):
+        """Import DXF or CSV geometry into the model as a single undoable operation"""
+        try:
+            import_model(self.app_state, file_path, format_name)
+            return True
+        except Exception as e:
+            print(f"Error importing data: {str(e)}")
+            return False
+    
+    def forces_to_data(self):
+        """Convert the forces to a columnar block, see exporters.forces_block"""
+        return forces_block(self.app_state)
+    
+    def forces_from_data(self, block):
+        """Load forces from a columnar block written by forces_to_data"""
+        for i in range(len(block["type"])):
+            host = None
+            if block["host"][i]:
+                # Hosts are stored by element number, starting at 1
+                host_type = block["host"][i]
+                host_ids = self.app_state.nodes if host_type == "node" else self.app_state.lines
+                host = (host_type, host_ids[block["host_id"][i] - 1], block["t"][i])
+                x, y = self.app_state.host_position(host)
+            else:
+                # Convert from real-world coordinates to screen coordinates
+                x = self.app_state.origin_x + block["x"][i] * self.app_state.scale_factor_x
+                y = self.app_state.origin_y - block["y"][i] * self.app_state.scale_factor_y
+            
+            self.app_state.forces.append(self.app_state.new_ids("force")[0])
+            self.app_state.force_positions.append((x, y))
+            self.app_state.force_types.append(block["type"][i])
+            self.app_state.force_values.append(block["value"][i])
+            self.app_state.force_hosts.append(host)
+            self.app_state.force_cases.append(block["case"][i] if "case" in block else self.app_state.current_load_case)
\ No newline at end of file
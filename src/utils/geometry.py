@@ -63,4 +63,104 @@ def point_line_distance(point, line):
     # Calculate the distance
     distance = abs(A * x + B * y + C) / math.sqrt(A ** 2 + B ** 2)
     
-    return distance
\ No newline at end of file
+    return distance
+
+def point_in_polygon(point, polygon):
+    """Check whether a point lies inside a polygon (even-odd rule)
+    
+    Args:
+        point: Tuple (x, y) representing the point
+        polygon: List of (x, y) vertices
+        
+    Returns:
+        True if the point is inside the polygon
+    """
+    x, y = point
+    inside = False
+    
+    j = len(polygon) - 1
+    for i in range(len(polygon)):
+        xi, yi = polygon[i]
+        xj, yj = polygon[j]
+        
+        # Toggle on every edge crossed by a horizontal ray from the point
+        if (yi > y) != (yj > y):
+            x_cross = xi + (y - yi) * (xj - xi) / (yj - yi)
+            if x < x_cross:
+                inside = not inside
+        j = i
+    
+    return inside
+
+def segment_intersects_rect(line, rect):
+    """Check whether a line segment touches an axis-aligned rectangle
+    
+    Args:
+        line: Tuple (x1, y1, x2, y2) representing the segment
+        rect: Tuple (xmin, ymin, xmax, ymax) representing the rectangle
+        
+    Returns:
+        True if any part of the segment lies inside the rectangle
+    """
+    x1, y1, x2, y2 = line
+    xmin, ymin, xmax, ymax = rect
+    
+    # Clip the segment parameter range against each slab (Liang-Barsky)
+    t0, t1 = 0.0, 1.0
+    dx = x2 - x1
+    dy = y2 - y1
+    for p, q in ((-dx, x1 - xmin), (dx, xmax - x1), (-dy, y1 - ymin), (dy, ymax - y1)):
+        if p == 0:
+            if q < 0:
+                return False
+        else:
+            t = q / p
+            if p < 0:
+                t0 = max(t0, t)
+            else:
+                t1 = min(t1, t)
+            if t0 > t1:
+                return False
+    
+    return True
+
+def project_point_on_segment(point, line):
+    """Project a point onto a line segment
+    
+    Args:
+        point: Tuple (x, y) representing the point
+        line: Tuple (x1, y1, x2, y2) representing the segment
+        
+    Returns:
+        Float parameter t in [0, 1] of the closest point along the segment
+    """
+    x, y = point
+    x1, y1, x2, y2 = line
+    
+    dx = x2 - x1
+    dy = y2 - y1
+    length_squared = dx * dx + dy * dy
+    
+    # Degenerate segment: every point projects onto the start
+    if length_squared == 0:
+        return 0.0
+    
+    t = ((x - x1) * dx + (y - y1) * dy) / length_squared
+    return max(0.0, min(1.0, t))
+
+def point_segment_distance(point, line):
+    """Calculate the distance from a point to a line segment
+    
+    Unlike point_line_distance, points beyond the segment ends are measured
+    to the nearest end.
+    
+    Args:
+        point: Tuple (x, y) representing the point
+        line: Tuple (x1, y1, x2, y2) representing the segment
+        
+    Returns:
+        Float representing the distance
+    """
+    x1, y1, x2, y2 = line
+    t = project_point_on_segment(point, line)
+    return calculate_distance(point[0], point[1], x1 + t * (x2 - x1), y1 + t * (y2 - y1))
\ No newline at end of file
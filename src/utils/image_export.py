@@ -0,0 +1,117 @@
+import math
+import os
+import struct
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from PyQt6.QtCore import Qt, QRectF
+from PyQt6.QtGui import QImage, QPainter, QColor
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+# Pixels rendered per strip, bounding the memory of each strip in flight
+STRIP_PIXELS = 4 * 1024 * 1024
+
+def png_chunk(chunk_type, data):
+    """Build a PNG chunk with its length and CRC"""
+    return struct.pack(">I", len(data)) + chunk_type + data + struct.pack(">I", zlib.crc32(chunk_type + data))
+
+def filter_rows(pixels):
+    """Apply the PNG Sub filter to (rows, width * 3) RGB bytes
+    
+    Returns:
+        Filtered scanlines, each prefixed with its filter type byte
+    """
+    filtered = np.empty((pixels.shape[0], pixels.shape[1] + 1), dtype=np.uint8)
+    filtered[:, 0] = 1
+    filtered[:, 1:4] = pixels[:, :3]
+    np.subtract(pixels[:, 3:], pixels[:, :-3], out=filtered[:, 4:])
+    return filtered.tobytes()
+
+def compress_strip(scanlines, level, last):
+    """Deflate one strip as a raw block sequence that can be concatenated
+    
+    Strips end on a byte boundary with a sync flush, except the last one
+    which closes the stream.
+    """
+    compressor = zlib.compressobj(level, zlib.DEFLATED, -15)
+    data = compressor.compress(scanlines)
+    return data + compressor.flush(zlib.Z_FINISH if last else zlib.Z_SYNC_FLUSH)
+
+def render_strip(scene, source, width, top, rows, scale, background):
+    """Render rows [top, top + rows) of the output image
+    
+    Returns:
+        (rows, width * 3) array of RGB bytes
+    """
+    image = QImage(width, rows, QImage.Format.Format_RGB888)
+    image.fill(background)
+    
+    painter = QPainter(image)
+    painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+    painter.setRenderHint(QPainter.RenderHint.TextAntialiasing)
+    strip_source = QRectF(source.left(), source.top() + top / scale, source.width(), rows / scale)
+    scene.render(painter, QRectF(0, 0, width, rows), strip_source, Qt.AspectRatioMode.IgnoreAspectRatio)
+    painter.end()
+    
+    # Rows are padded to 32 bits in the image buffer
+    bits = image.constBits()
+    bits.setsize(image.sizeInBytes())
+    return np.frombuffer(bits, dtype=np.uint8).reshape(rows, image.bytesPerLine())[:, :width * 3].copy()
+
+def export_scene_image(scene, source, file_path, scale=1.0, dpi=96, background=QColor("white"),
+                       workers=None, level=6):
+    """Render a scene area to a PNG file of any size
+    
+    The image is rendered in horizontal strips. Each strip is filtered and
+    deflated by a pool of worker threads while the next ones are painted,
+    and written as soon as the strips before it are done, so only a few
+    strips are ever held in memory.
+    
+    Args:
+        scene: QGraphicsScene to render
+        source: Scene rectangle to export
+        file_path: Path of the PNG file
+        scale: Output pixels per scene unit
+        dpi: Resolution stored in the file
+        background: Color behind the scene items
+        workers: Number of compression threads, defaults to the CPU count
+        level: zlib compression level
+    
+    Returns:
+        Tuple (width, height) of the image in pixels
+    """
+    width = max(1, math.ceil(source.width() * scale))
+    height = max(1, math.ceil(source.height() * scale))
+    strip_rows = max(1, min(height, STRIP_PIXELS // width))
+    workers = workers or os.cpu_count() or 1
+    
+    with open(file_path, "wb") as f, ThreadPoolExecutor(max_workers=workers) as executor:
+        # Header: 8-bit RGB, and the resolution in pixels per meter
+        f.write(PNG_SIGNATURE)
+        f.write(png_chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)))
+        pixels_per_meter = round(dpi / 0.0254)
+        f.write(png_chunk(b"pHYs", struct.pack(">IIB", pixels_per_meter, pixels_per_meter, 1)))
+        
+        # One zlib stream made of the strips' raw deflate blocks
+        f.write(png_chunk(b"IDAT", b"\x78\x9c"))
+        checksum = 1
+        pending = []
+        for top in range(0, height, strip_rows):
+            rows = min(strip_rows, height - top)
+            scanlines = filter_rows(render_strip(scene, source, width, top, rows, scale, background))
+            checksum = zlib.adler32(scanlines, checksum)
+            pending.append(executor.submit(compress_strip, scanlines, level, top + rows >= height))
+            
+            # Write finished strips in order, keeping a bounded queue
+            while len(pending) > workers or (pending and pending[0].done()):
+                f.write(png_chunk(b"IDAT", pending.pop(0).result()))
+        
+        for future in pending:
+            f.write(png_chunk(b"IDAT", future.result()))
+        
+        f.write(png_chunk(b"IDAT", struct.pack(">I", checksum)))
+        f.write(png_chunk(b"IEND", b""))
+    
+    return width, height
\ No newline at end of file
@@ -0,0 +1,347 @@
+import csv
+import math
+import os
+
+from src.models.constants import NodeType
+
+# Registered importers: format name -> Importer
+IMPORTERS = {}
+
+# Distance below which imported points share a node (m)
+DEFAULT_TOLERANCE = 1e-3
+
+# Meters per drawing unit for the DXF $INSUNITS codes, unitless drawings are in meters
+DXF_UNITS = {0: 1.0, 1: 0.0254, 2: 0.3048, 4: 0.001, 5: 0.01, 6: 1.0, 14: 0.1}
+
+NODE_TYPES = {node_type.value for node_type in NodeType}
+
+class Importer:
+    """A registered import format"""
+    
+    def __init__(self, name, extension, description, reader):
+        self.name = name
+        self.extension = extension
+        self.description = description
+        self.reader = reader
+    
+    def file_filter(self):
+        """Return the file dialog filter of the format"""
+        return f"{self.description} (*{self.extension})"
+
+def register_importer(name, extension, description):
+    """Register a reader(file_path) generator for a format
+    
+    Readers yield items in meters, one at a time:
+        ("node", x, y, node_type or None)
+        ("line", x1, y1, x2, y2)
+    """
+    def decorator(reader):
+        IMPORTERS[name] = Importer(name, extension, description, reader)
+        return reader
+    return decorator
+
+def importer_for(file_path=None, format_name=None):
+    """Find the importer of a format name, or else of a file extension
+    
+    Raises:
+        ValueError: If no registered importer matches
+    """
+    if format_name is not None:
+        if format_name not in IMPORTERS:
+            raise ValueError(f"Unknown import format: {format_name}")
+        return IMPORTERS[format_name]
+    
+    extension = os.path.splitext(file_path or "")[1].lower()
+    for importer in IMPORTERS.values():
+        if importer.extension == extension:
+            return importer
+    
+    raise ValueError(f"No importer for '{extension}' files")
+
+def import_filters():
+    """Return the file dialog filter string of all importers"""
+    return ";;".join(importer.file_filter() for importer in IMPORTERS.values())
+
+class NodeHash:
+    """Spatial hash merging points closer than a tolerance into shared nodes"""
+    
+    def __init__(self, tolerance=DEFAULT_TOLERANCE):
+        self.tolerance = tolerance
+        self.limit = tolerance * tolerance
+        
+        # Cells twice the tolerance wide, so a match can only lie in the
+        # point's cell or in the nearest neighbour along each axis
+        self.inverse = 0.5 / tolerance
+        self.cells = {}  # (cell_x, cell_y) -> point indexes
+        self.points = []  # (x, y) of every node
+    
+    def insert(self, x, y):
+        """Add a point without merging, returning its index"""
+        index = len(self.points)
+        self.points.append((x, y))
+        self.cells.setdefault((math.floor(x * self.inverse), math.floor(y * self.inverse)), []).append(index)
+        return index
+    
+    def find(self, x, y):
+        """Return the index of a point within tolerance of (x, y), or None"""
+        fx, fy = x * self.inverse, y * self.inverse
+        cell_x, cell_y = math.floor(fx), math.floor(fy)
+        side_x = cell_x - 1 if fx - cell_x < 0.5 else cell_x + 1
+        side_y = cell_y - 1 if fy - cell_y < 0.5 else cell_y + 1
+        cells, points, limit = self.cells, self.points, self.limit
+        
+        for cell in ((cell_x, cell_y), (side_x, cell_y), (cell_x, side_y), (side_x, side_y)):
+            for index in cells.get(cell, ()):
+                px, py = points[index]
+                dx, dy = px - x, py - y
+                if dx * dx + dy * dy <= limit:
+                    return index
+        return None
+    
+    def add(self, x, y):
+        """Return the index of the node at (x, y), adding one if there is none"""
+        index = self.find(x, y)
+        if index is None:
+            index = self.insert(x, y)
+        return index
+
+def build_elements(app_state, items, tolerance=DEFAULT_TOLERANCE, node_type=None):
+    """Merge imported items into shared nodes and deduplicated lines
+    
+    Points are merged with the existing nodes as well, so imported members
+    connect to the structure already drawn. Zero-length lines and lines
+    that already exist are dropped.
+    
+    Args:
+        app_state: Application state receiving the elements
+        items: Iterable of reader items, see register_importer
+        tolerance: Distance below which points share a node (m)
+        node_type: Type of nodes without one, defaults to the current node type
+    
+    Returns:
+        Tuple (nodes, lines) of new (x, y, type) nodes and (x1, y1, x2, y2)
+        lines in model coordinates, ready for AppState.add_elements
+    """
+    if node_type is None:
+        node_type = app_state.current_node_type
+    
+    sx, sy = app_state.scale_factor_x, app_state.scale_factor_y
+    ox, oy = app_state.origin_x, app_state.origin_y
+    
+    # Existing nodes keep their indexes, even when closer than the tolerance
+    merger = NodeHash(tolerance)
+    for x, y in app_state.node_positions:
+        merger.insert((x - ox) / sx, (oy - y) / sy)
+    existing = len(merger.points)
+    
+    # Existing lines between existing nodes, as sorted node index pairs
+    line_keys = set()
+    for x1, y1, x2, y2 in app_state.line_positions:
+        a = merger.find((x1 - ox) / sx, (oy - y1) / sy)
+        b = merger.find((x2 - ox) / sx, (oy - y2) / sy)
+        if a is not None and b is not None:
+            line_keys.add((a, b) if a < b else (b, a))
+    
+    types = {}  # New node index -> explicit node type
+    new_lines = []
+    for item in items:
+        if item[0] == "line":
+            a = merger.add(item[1], item[2])
+            b = merger.add(item[3], item[4])
+            key = (a, b) if a < b else (b, a)
+            if a != b and key not in line_keys:
+                line_keys.add(key)
+                new_lines.append(key)
+        else:
+            index = merger.add(item[1], item[2])
+            if item[3] is not None and index >= existing:
+                types[index] = item[3]
+    
+    # Lines end exactly on the shared nodes, existing ones keep their position
+    positions = list(app_state.node_positions)
+    positions.extend((ox + x * sx, oy - y * sy) for x, y in merger.points[existing:])
+    
+    nodes = [(x, y, types.get(i, node_type)) for i, (x, y) in enumerate(positions[existing:], existing)]
+    lines = [positions[a] + positions[b] for a, b in new_lines]
+    return nodes, lines
+
+def import_model(app_state, file_path, format_name=None, tolerance=DEFAULT_TOLERANCE, node_type=None):
+    """Import a file into the model as a single undoable operation
+    
+    Returns:
+        Tuple (node_count, line_count) of added elements
+    """
+    importer = importer_for(file_path, format_name)
+    nodes, lines = build_elements(app_state, importer.reader(file_path), tolerance, node_type)
+    return app_state.add_elements(nodes, lines)
+
+def polyline_items(points, closed):
+    """Yield the line items of a polyline"""
+    for (x1, y1), (x2, y2) in zip(points, points[1:]):
+        yield ("line", x1, y1, x2, y2)
+    if closed and len(points) > 2:
+        (x1, y1), (x2, y2) = points[-1], points[0]
+        yield ("line", x1, y1, x2, y2)
+
+def dxf_tags(f):
+    """Yield the (group code, value) pairs of a DXF file one at a time"""
+    for code, value in zip(f, f):
+        yield code.strip(), value.strip()
+
+def dxf_entities(f):
+    """Yield (entity type, tags) for the entities of a DXF file
+    
+    Header variables are yielded as well, as ("$NAME", tags). Entities
+    outside the ENTITIES section, such as block definitions, are skipped.
+    """
+    section = None
+    kind = None
+    tags = []
+    for code, value in dxf_tags(f):
+        if code == "0":
+            if kind is not None:
+                yield kind, tags
+            kind = None
+            tags = []
+            if value == "SECTION":
+                section = ""
+            elif value == "ENDSEC":
+                section = None
+            elif section == "ENTITIES":
+                kind = value
+        elif section == "":
+            section = value if code == "2" else None
+        elif section == "HEADER" and code == "9":
+            if kind is not None:
+                yield kind, tags
+            kind = value
+            tags = []
+        elif kind is not None:
+            tags.append((code, value))
+
+def dxf_node_type(layer):
+    """Return the node type of a NODES_<TYPE> layer, as written by the DXF exporter"""
+    if layer.upper().startswith("NODES_"):
+        node_type = layer[6:].lower()
+        if node_type in NODE_TYPES:
+            return node_type
+    return None
+
+@register_importer("dxf", ".dxf", "DXF Drawings")
+def read_dxf(file_path):
+    """Read LINE, POINT, LWPOLYLINE and POLYLINE entities of an ASCII DXF
+    
+    The file is parsed one tag at a time. Coordinates are converted to
+    meters with the $INSUNITS header variable, and points on NODES_<TYPE>
+    layers keep their node type.
+    """
+    scale = 1.0
+    vertices = None  # Vertices of the POLYLINE being read
+    closed = False
+    with open(file_path, encoding="utf-8", errors="replace") as f:
+        for kind, tags in dxf_entities(f):
+            if kind == "$INSUNITS":
+                scale = DXF_UNITS.get(int(tags[0][1]), 1.0) if tags else 1.0
+            elif kind == "LINE":
+                values = dict(tags)
+                yield ("line",
+                       float(values["10"]) * scale, float(values["20"]) * scale,
+                       float(values["11"]) * scale, float(values["21"]) * scale)
+            elif kind == "POINT":
+                values = dict(tags)
+                yield ("node", float(values["10"]) * scale, float(values["20"]) * scale,
+                       dxf_node_type(values.get("8", "")))
+            elif kind == "LWPOLYLINE":
+                points = []
+                lw_closed = False
+                for code, value in tags:
+                    if code == "10":
+                        points.append([float(value) * scale, 0.0])
+                    elif code == "20":
+                        points[-1][1] = float(value) * scale
+                    elif code == "70":
+                        lw_closed = bool(int(value) & 1)
+                yield from polyline_items(points, lw_closed)
+            elif kind == "POLYLINE":
+                vertices = []
+                closed = bool(int(dict(tags).get("70", 0)) & 1)
+            elif kind == "VERTEX" and vertices is not None:
+                values = dict(tags)
+                vertices.append((float(values["10"]) * scale, float(values["20"]) * scale))
+            elif kind == "SEQEND" and vertices is not None:
+                yield from polyline_items(vertices, closed)
+                vertices = None
+
+def csv_columns(header):
+    """Return the column indexes of a CSV header, or None if it is a data row"""
+    columns = [name.strip().lower() for name in header]
+    try:
+        [float(name) for name in columns]
+    except ValueError:
+        return {name: i for i, name in enumerate(columns)}
+    return None
+
+@register_importer("csv", ".csv", "CSV Tables")
+def read_csv(file_path):
+    """Read a node or line coordinate table, in meters
+    
+    Tables with x1, y1, x2, y2 columns hold one line per row. Tables with
+    x, y and optional id and type columns hold nodes, and members between
+    node ids are read from a <name>_members table next to it, as written by
+    the CSV exporter. Tables without a header hold x, y nodes or x1, y1,
+    x2, y2 lines depending on their column count.
+    
+    Raises:
+        ValueError: If the columns are not recognized
+    """
+    ids = {}  # Node id -> (x, y), for the members table
+    with open(file_path, newline="") as f:
+        rows = csv.reader(f)
+        header = next(rows, None)
+        if header is None:
+            return
+        
+        columns = csv_columns(header)
+        if columns is None:
+            names = ("x1", "y1", "x2", "y2") if len(header) >= 4 else ("x", "y")
+            columns = {name: i for i, name in enumerate(names)}
+            yield from csv_items([header], columns, ids)
+        elif "start_node" in columns:
+            raise ValueError("Import the node table, members are read from its _members table")
+        
+        yield from csv_items(rows, columns, ids)
+    
+    stem, extension = os.path.splitext(file_path)
+    members_path = f"{stem}_members{extension}"
+    if not ids or not os.path.exists(members_path):
+        return
+    
+    with open(members_path, newline="") as f:
+        rows = csv.reader(f)
+        columns = csv_columns(next(rows, []))
+        start, end = columns["start_node"], columns["end_node"]
+        for row in rows:
+            if row:
+                (x1, y1), (x2, y2) = ids[row[start].strip()], ids[row[end].strip()]
+                yield ("line", x1, y1, x2, y2)
+
+def csv_items(rows, columns, ids):
+    """Yield the node or line items of CSV rows, recording node ids"""
+    if {"x1", "y1", "x2", "y2"} <= columns.keys():
+        x1, y1, x2, y2 = columns["x1"], columns["y1"], columns["x2"], columns["y2"]
+        for row in rows:
+            if row:
+                yield ("line", float(row[x1]), float(row[y1]), float(row[x2]), float(row[y2]))
+    elif {"x", "y"} <= columns.keys():
+        x, y = columns["x"], columns["y"]
+        id_column = columns.get("id")
+        type_column = columns.get("type")
+        for row in rows:
+            if row:
+                point = (float(row[x]), float(row[y]))
+                if id_column is not None:
+                    ids[row[id_column].strip()] = point
+                node_type = row[type_column].strip().lower() if type_column is not None else None
+                yield ("node", point[0], point[1], node_type if node_type in NODE_TYPES else None)
+    else:
+        raise ValueError("Expected x, y or x1, y1, x2, y2 columns")
\ No newline at end of file
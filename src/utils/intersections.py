@@ -0,0 +1,96 @@
+import math
+
+from src.utils.geometry import find_intersection_point
+
+def find_line_intersections(line_positions, cell_size=None, tolerance=1e-6):
+    """Find all crossings between line segments using a bucket grid
+    
+    Segments are hashed into grid cells by bounding box, so only segments
+    sharing a cell are tested against each other instead of every pair.
+    Segments meeting at a shared endpoint are connected, not crossing,
+    and are not reported.
+    
+    Args:
+        line_positions: List of (x1, y1, x2, y2) segments
+        cell_size: Bucket size, defaults to the mean segment extent
+        tolerance: Distance under which two points are considered equal
+        
+    Returns:
+        List of (i, j, x, y) tuples with i < j for every crossing
+    """
+    if len(line_positions) < 2:
+        return []
+    
+    # Pick a cell size matching the typical segment extent
+    if cell_size is None:
+        total = sum(max(abs(x2 - x1), abs(y2 - y1)) for x1, y1, x2, y2 in line_positions)
+        cell_size = max(total / len(line_positions), 1.0)
+    
+    # Hash segments into cells
+    buckets = {}
+    for i, (x1, y1, x2, y2) in enumerate(line_positions):
+        cx1, cx2 = math.floor(min(x1, x2) / cell_size), math.floor(max(x1, x2) / cell_size)
+        cy1, cy2 = math.floor(min(y1, y2) / cell_size), math.floor(max(y1, y2) / cell_size)
+        for cx in range(cx1, cx2 + 1):
+            for cy in range(cy1, cy2 + 1):
+                buckets.setdefault((cx, cy), []).append(i)
+    
+    # Test the pairs sharing a cell, each pair once
+    tested = set()
+    intersections = []
+    for bucket in buckets.values():
+        for a in range(len(bucket)):
+            i = bucket[a]
+            line1 = line_positions[i]
+            for b in range(a + 1, len(bucket)):
+                j = bucket[b]
+                pair = (i, j) if i < j else (j, i)
+                if pair in tested:
+                    continue
+                tested.add(pair)
+                
+                line2 = line_positions[j]
+                
+                # Quick bounding box rejection
+                if max(line1[0], line1[2]) < min(line2[0], line2[2]) or \
+                   max(line2[0], line2[2]) < min(line1[0], line1[2]) or \
+                   max(line1[1], line1[3]) < min(line2[1], line2[3]) or \
+                   max(line2[1], line2[3]) < min(line1[1], line1[3]):
+                    continue
+                
+                point = find_intersection_point(line1, line2)
+                if point is None:
+                    continue
+                
+                # Skip segments connected end to end
+                if is_endpoint(point, line1, tolerance) and is_endpoint(point, line2, tolerance):
+                    continue
+                
+                intersections.append((pair[0], pair[1], point[0], point[1]))
+    
+    return intersections
+
+def is_endpoint(point, line, tolerance=1e-6):
+    """Check whether a point coincides with one of the segment ends"""
+    x, y = point
+    x1, y1, x2, y2 = line
+    return (abs(x - x1) <= tolerance and abs(y - y1) <= tolerance) or \
+           (abs(x - x2) <= tolerance and abs(y - y2) <= tolerance)
+
+def collect_split_points(line_positions, intersections, tolerance=1e-6):
+    """Group crossing points by the line they split
+    
+    Args:
+        line_positions: List of (x1, y1, x2, y2) segments
+        intersections: Result of find_line_intersections
+        tolerance: Distance under which two points are considered equal
+        
+    Returns:
+        Dictionary mapping line index to the interior points splitting it
+    """
+    splits = {}
+    for i, j, x, y in intersections:
+        for index in (i, j):
+            if not is_endpoint((x, y), line_positions[index], tolerance):
+                splits.setdefault(index, []).append((x, y))
+    return splits
\ No newline at end of file
@@ -0,0 +1,157 @@
+import numpy as np
+from PyQt6.QtWidgets import QGraphicsItem, QStyleOptionGraphicsItem
+from PyQt6.QtCore import QRectF, QLineF
+from PyQt6.QtGui import QPainterPath
+
+class MembersItem(QGraphicsItem):
+    """One scene item drawing every member with a single drawLines call
+    
+    The item owns the (m, 4) array of member coordinates. Painting keeps
+    the members crossing the exposed area and draws them from a QLineF
+    buffer, and hit tests measure the distance to the members with numpy
+    instead of asking Qt for a shape per line.
+    
+    The buffer is filled as members come into view. It can be passed in
+    and shared by the next item drawing the same coordinates, so zooming
+    only changes the item transform.
+    """
+    
+    def __init__(self, lines, pen, buffer=None):
+        super().__init__()
+        self.lines = np.asarray(lines, dtype=np.float64).reshape(-1, 4)
+        self.pen = pen
+        self.buffer = buffer if buffer is not None else [None] * len(self.lines)  # QLineF per member
+        self.setFlag(QGraphicsItem.GraphicsItemFlag.ItemUsesExtendedStyleOption)
+        
+        # Member bounding boxes for exposure and hit tests
+        self.xmin = np.minimum(self.lines[:, 0], self.lines[:, 2])
+        self.xmax = np.maximum(self.lines[:, 0], self.lines[:, 2])
+        self.ymin = np.minimum(self.lines[:, 1], self.lines[:, 3])
+        self.ymax = np.maximum(self.lines[:, 1], self.lines[:, 3])
+        
+        margin = pen.widthF() / 2 + 1
+        if len(self.lines):
+            self.bounds = QRectF(
+                self.xmin.min() - margin, self.ymin.min() - margin,
+                self.xmax.max() - self.xmin.min() + 2 * margin, self.ymax.max() - self.ymin.min() + 2 * margin
+            )
+        else:
+            self.bounds = QRectF()
+    
+    def boundingRect(self):
+        return self.bounds
+    
+    def shape(self):
+        """Return the bounding rectangle, point hit tests go through contains"""
+        path = QPainterPath()
+        path.addRect(self.bounds)
+        return path
+    
+    def contains(self, point):
+        return self.member_at(point.x(), point.y()) is not None
+    
+    def members_in_rect(self, left, top, right, bottom):
+        """Return the indexes of the members whose bounding box meets a rectangle"""
+        margin = self.pen.widthF() / 2
+        return np.flatnonzero(
+            (self.xmax >= left - margin) & (self.xmin <= right + margin)
+            & (self.ymax >= top - margin) & (self.ymin <= bottom + margin)
+        )
+    
+    def member_at(self, x, y, radius=None):
+        """Return the index of the member closest to a point, or None
+        
+        Args:
+            x, y: Point in item coordinates
+            radius: Maximum distance, defaults to the pen width
+        """
+        if radius is None:
+            radius = self.pen.widthF()
+        
+        candidates = np.flatnonzero(
+            (self.xmax >= x - radius) & (self.xmin <= x + radius)
+            & (self.ymax >= y - radius) & (self.ymin <= y + radius)
+        )
+        if not len(candidates):
+            return None
+        
+        # Distance to the segments, clamping the projection to their ends
+        x1, y1, x2, y2 = self.lines[candidates].T
+        dx, dy = x2 - x1, y2 - y1
+        length2 = dx * dx + dy * dy
+        t = np.clip(((x - x1) * dx + (y - y1) * dy) / np.where(length2 > 0, length2, 1.0), 0.0, 1.0)
+        distance = np.hypot(x1 + t * dx - x, y1 + t * dy - y)
+        
+        best = int(np.argmin(distance))
+        return int(candidates[best]) if distance[best] <= radius else None
+    
+    def members_rect(self, rows):
+        """Return the rectangle covered by some members and their pen"""
+        if not len(rows):
+            return QRectF()
+        margin = self.pen.widthF() / 2 + 1
+        left, top = self.xmin[rows].min() - margin, self.ymin[rows].min() - margin
+        return QRectF(left, top, self.xmax[rows].max() + margin - left, self.ymax[rows].max() + margin - top)
+    
+    def set_members(self, rows, lines):
+        """Replace the coordinates of some members and repaint only around them
+        
+        Lets members follow a drag without rebuilding the item.
+        
+        Args:
+            rows: Array of member indexes
+            lines: (len(rows), 4) array of their new coordinates
+        """
+        before = self.members_rect(rows)
+        self.lines[rows] = lines
+        lines = self.lines[rows]
+        self.xmin[rows] = np.minimum(lines[:, 0], lines[:, 2])
+        self.xmax[rows] = np.maximum(lines[:, 0], lines[:, 2])
+        self.ymin[rows] = np.minimum(lines[:, 1], lines[:, 3])
+        self.ymax[rows] = np.maximum(lines[:, 1], lines[:, 3])
+        
+        buffer = self.buffer
+        for i, line in zip(rows.tolist(), lines.tolist()):
+            buffer[i] = QLineF(*line)
+        
+        # Grow the bounds when members leave them, then repaint the area
+        # the members left and the one they cover now
+        after = self.members_rect(rows)
+        if not self.bounds.contains(after):
+            self.prepareGeometryChange()
+            self.bounds = self.bounds.united(after)
+        self.update(before.united(after))
+    
+    def resize(self, count):
+        """Keep the first count members, or add members up to count
+        
+        Added members are placed with set_members before the next paint.
+        """
+        size = len(self.lines)
+        if count < size:
+            self.update(self.members_rect(np.arange(count, size)))
+            self.lines, self.xmin, self.xmax, self.ymin, self.ymax = (
+                values[:count] for values in (self.lines, self.xmin, self.xmax, self.ymin, self.ymax)
+            )
+            del self.buffer[count:]
+        elif count > size:
+            self.lines = np.concatenate([self.lines, np.zeros((count - size, 4))])
+            self.xmin, self.xmax, self.ymin, self.ymax = (
+                np.concatenate([values, np.zeros(count - size)]) for values in (self.xmin, self.xmax, self.ymin, self.ymax)
+            )
+            self.buffer.extend([None] * (count - size))
+    
+    def paint(self, painter, option, widget=None):
+        if not len(self.lines):
+            return
+        
+        # Only the members crossing the exposed area are handed to the painter
+        rect = option.exposedRect if isinstance(option, QStyleOptionGraphicsItem) else self.bounds
+        visible = self.members_in_rect(rect.left(), rect.top(), rect.right(), rect.bottom()).tolist()
+        buffer = self.buffer
+        missing = [i for i in visible if buffer[i] is None]
+        for i, line in zip(missing, self.lines[missing].tolist()):
+            buffer[i] = QLineF(*line)
+        
+        painter.setPen(self.pen)
+        painter.drawLines([buffer[i] for i in visible])
\ No newline at end of file
@@ -0,0 +1,115 @@
+import numpy as np
+
+# Diagonal bracing patterns for generated meshes
+DIAGONAL_NONE = "none"
+DIAGONAL_UP = "up"
+DIAGONAL_DOWN = "down"
+DIAGONAL_CROSS = "cross"
+
+def grid_coordinates(spacings, origin, scale, direction=1):
+    """Return the model coordinates of all grid lines along one axis
+    
+    Args:
+        spacings: Spacings in meters
+        origin: Model coordinate of the axis origin
+        scale: Scale factor in pixels per meter
+        direction: 1 for increasing coordinates, -1 for decreasing ones
+        
+    Returns:
+        Array of coordinates, starting with the origin itself
+    """
+    distances = np.concatenate([[0.0], np.cumsum(np.fromiter(spacings, dtype=np.float64))])
+    return origin + distances * (direction * scale)
+
+def nearest_grid_line(coordinates, values, tolerance=1.0):
+    """Return the index of the grid coordinate within tolerance of each value, or -1
+    
+    Args:
+        coordinates: Increasing grid coordinates along one axis
+        values: Array of coordinates to look up
+    """
+    if len(coordinates) < 2:
+        nearest = np.zeros(len(values), dtype=np.int64)
+    else:
+        # The nearest line is one of the two around the insertion point
+        above = np.clip(np.searchsorted(coordinates, values), 1, len(coordinates) - 1)
+        below = above - 1
+        nearest = np.where(np.abs(coordinates[above] - values) < np.abs(coordinates[below] - values), above, below)
+    return np.where(np.abs(coordinates[nearest] - values) < tolerance, nearest, -1)
+
+def generate_grid_mesh(app_state, columns=None, rows=None, horizontal=True, vertical=True,
+                       diagonals=DIAGONAL_NONE, node_type=None):
+    """Generate nodes and members at grid intersections in one batch
+    
+    Intersections within a pixel of an existing node, and members whose
+    ends are both within a pixel of the ends of an existing line, are
+    skipped. Nodes are matched the same way as Model.nodes_at.
+    
+    Args:
+        app_state: Application state providing the grid and existing elements
+        columns: Tuple (first, last) of vertical grid line indexes, or None for all
+        rows: Tuple (first, last) of horizontal grid line indexes, or None for all
+        horizontal: Connect neighbouring nodes along each row
+        vertical: Connect neighbouring nodes along each column
+        diagonals: One of the DIAGONAL_* bracing patterns
+        node_type: Type of the generated nodes, defaults to the current node type
+        
+    Returns:
+        Tuple (nodes, lines) of new (x, y, type) nodes and (x1, y1, x2, y2) lines,
+        to be added with add_elements
+    """
+    if node_type is None:
+        node_type = app_state.current_node_type
+    
+    xs = grid_coordinates(app_state.h_spacings, app_state.origin_x, app_state.scale_factor_x)
+    ys = grid_coordinates(app_state.v_spacings, app_state.origin_y, app_state.scale_factor_y, -1)
+    
+    # Restrict to the requested range of grid lines
+    if columns is not None:
+        xs = xs[max(0, columns[0]):columns[1] + 1]
+    if rows is not None:
+        ys = ys[max(0, rows[0]):rows[1] + 1]
+    
+    if not len(xs) or not len(ys):
+        return [], []
+    
+    # Intersection (i, j) is point j * nx + i, row by row
+    nx, ny = len(xs), len(ys)
+    points = np.column_stack([np.tile(xs, ny), np.repeat(ys, nx)])
+    new_points = np.flatnonzero(app_state.nodes_at(points) < 0)
+    
+    # Pairs of grid indexes (i1, j1, i2, j2) for every member
+    i, j = np.meshgrid(np.arange(nx), np.arange(ny))
+    i, j = i.ravel(), j.ravel()
+    pairs = []
+    if horizontal:
+        keep = i < nx - 1
+        pairs.append(np.column_stack([i[keep], j[keep], i[keep] + 1, j[keep]]))
+    if vertical:
+        keep = j < ny - 1
+        pairs.append(np.column_stack([i[keep], j[keep], i[keep], j[keep] + 1]))
+    inner = (i < nx - 1) & (j < ny - 1)
+    if diagonals in (DIAGONAL_UP, DIAGONAL_CROSS):
+        pairs.append(np.column_stack([i[inner], j[inner], i[inner] + 1, j[inner] + 1]))
+    if diagonals in (DIAGONAL_DOWN, DIAGONAL_CROSS):
+        pairs.append(np.column_stack([i[inner], j[inner] + 1, i[inner] + 1, j[inner]]))
+    pairs = np.vstack(pairs) if pairs else np.empty((0, 4), dtype=np.int64)
+    ends = np.column_stack([pairs[:, 1] * nx + pairs[:, 0], pairs[:, 3] * nx + pairs[:, 2]])
+    
+    # Existing lines whose two ends lie on intersections, keyed by the
+    # sorted point numbers of their ends. Rows run up the screen, so their
+    # coordinates are looked up negated to be increasing.
+    line_ends = np.asarray(app_state.line_positions, dtype=np.float64).reshape(-1, 2)
+    end_i = nearest_grid_line(xs, line_ends[:, 0])
+    end_j = nearest_grid_line(-ys, -line_ends[:, 1])
+    on_grid = ((end_i >= 0) & (end_j >= 0)).reshape(-1, 2).all(axis=1)
+    existing = np.sort((end_j * nx + end_i).reshape(-1, 2)[on_grid], axis=1)
+    count = nx * ny
+    keys = np.sort(ends, axis=1) @ (count, 1)
+    ends = ends[~np.isin(keys, existing @ (count, 1))]
+    
+    # Tuples are built from whole columns, much faster than row by row
+    x, y = points[new_points].T.tolist()
+    nodes = list(zip(x, y, [node_type] * len(new_points)))
+    lines = list(zip(*np.hstack([points[ends[:, 0]], points[ends[:, 1]]]).T.tolist()))
+    return nodes, lines
\ No newline at end of file
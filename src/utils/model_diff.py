@@ -0,0 +1,313 @@
+import argparse
+import json
+import sys
+
+import numpy as np
+
+from src.utils.connectivity import NODE_TYPE_CODES
+from src.utils.project_map import ProjectMap, is_project_map
+
+# Points closer than this (m) are the same point, the precision of project files
+DIFF_TOLERANCE = 1e-2
+
+# Rounds of move detection, each one reaching one member further into a
+# group of moved nodes
+MOVE_ROUNDS = 16
+
+# Node type names by integer code
+NODE_TYPE_NAMES = {code: node_type.value for node_type, code in NODE_TYPE_CODES.items()}
+
+class ModelGeometry:
+    """Nodes and members of one revision of a model, as arrays in meters"""
+    
+    def __init__(self, nodes, node_types, lines):
+        self.nodes = np.asarray(nodes, dtype=np.float64).reshape(-1, 2)  # (x, y) with y up
+        self.node_types = np.asarray(node_types, dtype=np.uint8)  # NODE_TYPE_CODES
+        self.lines = np.asarray(lines, dtype=np.float64).reshape(-1, 4)  # (x1, y1, x2, y2)
+    
+    @classmethod
+    def from_file(cls, file_path):
+        """Read a JSON or mapped project file"""
+        if is_project_map(file_path):
+            # Copies of the record fields, so the file can be unmapped
+            with ProjectMap(file_path) as project:
+                return cls(
+                    np.column_stack([project.nodes["x"], project.nodes["y"]]), project.nodes["type"].copy(),
+                    np.column_stack([project.lines[name] for name in ("x1", "y1", "x2", "y2")])
+                )
+        
+        with open(file_path, 'r') as f:
+            data = json.load(f)
+        
+        type_codes = {t.value: code for t, code in NODE_TYPE_CODES.items()}
+        nodes = [(node["coordinates"]["x"], node["coordinates"]["y"]) for node in data["nodes"]]
+        node_types = [type_codes[node["type"]] for node in data["nodes"]]
+        lines = [
+            (line["start_node"]["x"], line["start_node"]["y"], line["end_node"]["x"], line["end_node"]["y"])
+            for line in data["lines"]
+        ]
+        return cls(nodes, node_types, lines)
+    
+    @classmethod
+    def from_state(cls, app_state):
+        """Take the current model of the application"""
+        sx, sy = app_state.scale_factor_x, app_state.scale_factor_y
+        ox, oy = app_state.origin_x, app_state.origin_y
+        type_codes = {t.value: code for t, code in NODE_TYPE_CODES.items()}
+        
+        nodes = np.asarray(app_state.node_positions, dtype=np.float64).reshape(-1, 2)
+        lines = np.asarray(app_state.line_positions, dtype=np.float64).reshape(-1, 4)
+        return cls(
+            ((nodes - (ox, oy)) / (sx, -sy)), [type_codes[t] for t in app_state.node_types],
+            ((lines - (ox, oy, ox, oy)) / (sx, -sy, sx, -sy))
+        )
+
+class ModelDiff:
+    """Elements that differ between two revisions of a model
+    
+    Added elements are indexes into the new revision and removed ones into
+    the old revision. Moved and retyped elements are (old, new) index pairs.
+    """
+    
+    def __init__(self, old, new):
+        self.old = old
+        self.new = new
+        empty, empty_pairs = np.empty(0, dtype=np.int64), np.empty((0, 2), dtype=np.int64)
+        self.added_nodes = self.removed_nodes = empty
+        self.moved_nodes = self.retyped_nodes = empty_pairs
+        self.added_lines = self.removed_lines = empty
+        self.moved_lines = empty_pairs
+    
+    def __bool__(self):
+        return any(len(getattr(self, name)) for name in (
+            "added_nodes", "removed_nodes", "moved_nodes", "retyped_nodes",
+            "added_lines", "removed_lines", "moved_lines"
+        ))
+    
+    def summary(self):
+        """Return the number of differences, one line per element type"""
+        return (
+            f"Nodes: {len(self.added_nodes)} added, {len(self.removed_nodes)} removed, "
+            f"{len(self.moved_nodes)} moved, {len(self.retyped_nodes)} retyped\n"
+            f"Members: {len(self.added_lines)} added, {len(self.removed_lines)} removed, "
+            f"{len(self.moved_lines)} moved"
+        )
+    
+    def details(self):
+        """Yield one line per differing element, marked + added, - removed, ~ moved, * retyped"""
+        old, new = self.old, self.new
+        
+        def point(x, y):
+            return f"({x:g}, {y:g})"
+        
+        def member(x1, y1, x2, y2):
+            return f"{point(x1, y1)}-{point(x2, y2)}"
+        
+        for i in self.added_nodes.tolist():
+            yield f"+ node {point(*new.nodes[i])} {NODE_TYPE_NAMES[int(new.node_types[i])]}"
+        for i in self.removed_nodes.tolist():
+            yield f"- node {point(*old.nodes[i])} {NODE_TYPE_NAMES[int(old.node_types[i])]}"
+        for i, j in self.moved_nodes.tolist():
+            yield f"~ node {point(*old.nodes[i])} -> {point(*new.nodes[j])}"
+        for i, j in self.retyped_nodes.tolist():
+            yield (f"* node {point(*new.nodes[j])} {NODE_TYPE_NAMES[int(old.node_types[i])]}"
+                   f" -> {NODE_TYPE_NAMES[int(new.node_types[j])]}")
+        for i in self.added_lines.tolist():
+            yield f"+ member {member(*new.lines[i])}"
+        for i in self.removed_lines.tolist():
+            yield f"- member {member(*old.lines[i])}"
+        for i, j in self.moved_lines.tolist():
+            yield f"~ member {member(*old.lines[i])} -> {member(*new.lines[j])}"
+    
+    def highlights(self):
+        """Return the geometry to highlight per kind of difference
+        
+        Returns:
+            Dict of kind ("added", "removed", "moved", "moved from",
+            "retyped") -> ((k, 2) node points, (l, 4) member segments) in meters
+        """
+        old, new = self.old, self.new
+        return {
+            "added": (new.nodes[self.added_nodes], new.lines[self.added_lines]),
+            "removed": (old.nodes[self.removed_nodes], old.lines[self.removed_lines]),
+            "moved": (new.nodes[self.moved_nodes[:, 1]], new.lines[self.moved_lines[:, 1]]),
+            "moved from": (old.nodes[self.moved_nodes[:, 0]], old.lines[self.moved_lines[:, 0]]),
+            "retyped": (new.nodes[self.retyped_nodes[:, 1]], np.empty((0, 4)))
+        }
+
+def _point_keys(points, tolerance):
+    """Hash points to integers, equal for points in the same tolerance cell
+    
+    The key packs the quantized x and y into one integer.
+    """
+    return np.round(points / tolerance).astype(np.int64) @ (1 << 32, 1)
+
+def _first_at(point_ids, count):
+    """Return the index of the first element at each point id, or -1"""
+    first = np.full(count, -1, dtype=np.int64)
+    first[point_ids[::-1]] = np.arange(len(point_ids) - 1, -1, -1)
+    return first
+
+def _mix(values):
+    """Scramble unsigned 64-bit integers (splitmix64), so their sums rarely collide"""
+    z = values + np.uint64(0x9E3779B97F4A7C15)
+    z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return z ^ (z >> np.uint64(31))
+
+def _neighbour_hashes(ends, free, common):
+    """Hash the set of matched neighbours of every unmatched node of a revision
+    
+    Args:
+        ends: (m, 2) point ids of the member ends
+        free: Boolean mask over point ids of the unmatched nodes
+        common: Id of each point in the common numbering, -1 when unmatched
+    
+    Returns:
+        Tuple (point ids, hashes) of the unmatched nodes with matched neighbours
+    """
+    node, other = ends.ravel(), ends[:, ::-1].ravel()
+    keep = free[node] & (common[other] >= 0)
+    
+    # Repeated members between the same two nodes count once. The unique
+    # keys come out sorted by node, so each node is one run.
+    count = len(free)
+    pairs = np.unique(node[keep] * count + common[other[keep]])
+    if not len(pairs):
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.uint64)
+    node, neighbour = np.divmod(pairs, count)
+    starts = np.flatnonzero(np.r_[True, node[1:] != node[:-1]])
+    return node[starts], np.add.reduceat(_mix(neighbour.astype(np.uint64)), starts)
+
+def _unique_matches(old_keys, new_keys):
+    """Return the (old, new) positions of the keys found exactly once on each side"""
+    old_keys, old_index, old_counts = np.unique(old_keys, return_index=True, return_counts=True)
+    new_keys, new_index, new_counts = np.unique(new_keys, return_index=True, return_counts=True)
+    old_single, new_single = old_counts == 1, new_counts == 1
+    _, i, j = np.intersect1d(old_keys[old_single], new_keys[new_single], assume_unique=True, return_indices=True)
+    return old_index[old_single][i], new_index[new_single][j]
+
+def diff_models(old, new, tolerance=DIFF_TOLERANCE):
+    """Compare two revisions of a model
+    
+    Every point of either revision gets an id from a hash of its quantized
+    coordinates, so nodes match through their ids and members through the
+    ids of their two ends, with whole-array operations only.
+    
+    A node missing from one revision and a node missing from the other are
+    one moved node when they connect to the same set of matched nodes,
+    found through a hash of that set. Each round of moves matches more
+    nodes, so the next round reaches the moved nodes behind them.
+    
+    Args:
+        old, new: ModelGeometry of the two revisions
+        tolerance: Distance under which points are the same (m)
+    
+    Returns:
+        ModelDiff
+    """
+    diff = ModelDiff(old, new)
+    
+    # One id per distinct point of either revision, nodes and line ends alike
+    points = np.vstack([old.nodes, new.nodes, old.lines.reshape(-1, 2), new.lines.reshape(-1, 2)])
+    if not len(points):
+        return diff
+    keys, point_ids = np.unique(_point_keys(points, tolerance), return_inverse=True)
+    count = len(keys)
+    old_nodes, new_nodes, old_ends, new_ends = np.split(
+        point_ids.ravel(), np.cumsum([len(old.nodes), len(new.nodes), 2 * len(old.lines)])
+    )
+    old_ends, new_ends = old_ends.reshape(-1, 2), new_ends.reshape(-1, 2)
+    old_node_at, new_node_at = _first_at(old_nodes, count), _first_at(new_nodes, count)
+    
+    # Nodes at the same point in both revisions match. old_to_new maps the
+    # point of an old node to the point of its new counterpart.
+    all_points = np.arange(count)
+    same = (old_node_at >= 0) & (new_node_at >= 0)
+    old_to_new = np.where(same, all_points, -1)
+    new_matched = same.copy()
+    old_free = (old_node_at >= 0) & ~same
+    new_free = (new_node_at >= 0) & ~same
+    
+    # Only the members at unmatched nodes can tell moves apart
+    old_ends = old_ends[old_free[old_ends].any(axis=1)]
+    new_ends = new_ends[new_free[new_ends].any(axis=1)]
+    moved_old, moved_new = [], []
+    for _ in range(MOVE_ROUNDS):
+        old_ids, old_hashes = _neighbour_hashes(old_ends, old_free, old_to_new)
+        new_ids, new_hashes = _neighbour_hashes(new_ends, new_free, np.where(new_matched, all_points, -1))
+        i, j = _unique_matches(old_hashes, new_hashes)
+        if not len(i):
+            break
+        
+        old_ids, new_ids = old_ids[i], new_ids[j]
+        old_to_new[old_ids] = new_ids
+        new_matched[new_ids] = True
+        old_free[old_ids] = False
+        new_free[new_ids] = False
+        moved_old.append(old_ids)
+        moved_new.append(new_ids)
+    
+    moved_old = np.concatenate(moved_old) if moved_old else np.empty(0, dtype=np.int64)
+    moved_new = np.concatenate(moved_new) if moved_new else np.empty(0, dtype=np.int64)
+    diff.added_nodes = np.sort(new_node_at[new_free])
+    diff.removed_nodes = np.sort(old_node_at[old_free])
+    diff.moved_nodes = np.column_stack([old_node_at[moved_old], new_node_at[moved_new]])
+    
+    # Matched and moved nodes whose type changed
+    matched = np.flatnonzero(old_to_new >= 0)
+    pairs = np.column_stack([old_node_at[matched], new_node_at[old_to_new[matched]]])
+    diff.retyped_nodes = pairs[old.node_types[pairs[:, 0]] != new.node_types[pairs[:, 1]]]
+    
+    # Members are keyed by their sorted end points, old ones renumbered so
+    # the ends of moved nodes take the point they moved to
+    old_ends, new_ends = np.split(point_ids.ravel()[len(old.nodes) + len(new.nodes):], [2 * len(old.lines)])
+    old_ends, new_ends = old_ends.reshape(-1, 2), new_ends.reshape(-1, 2)
+    renumbered = all_points.copy()
+    renumbered[moved_old] = moved_new
+    old_common = renumbered[old_ends]
+    old_keys = np.sort(old_common, axis=1) @ (count, 1)
+    new_keys = np.sort(new_ends, axis=1) @ (count, 1)
+    
+    # Members in one revision only were added or removed, and members in
+    # both that had an end renumbered moved
+    _, line_ids = np.unique(np.concatenate([old_keys, new_keys]), return_inverse=True)
+    line_ids = line_ids.ravel()
+    old_lines, new_lines = line_ids[:len(old_keys)], line_ids[len(old_keys):]
+    old_line_at, new_line_at = _first_at(old_lines, len(line_ids)), _first_at(new_lines, len(line_ids))
+    diff.added_lines = np.flatnonzero(old_line_at[new_lines] < 0)
+    diff.removed_lines = np.flatnonzero(new_line_at[old_lines] < 0)
+    both = np.flatnonzero((old_line_at >= 0) & (new_line_at >= 0))
+    kept = np.column_stack([old_line_at[both], new_line_at[both]])
+    diff.moved_lines = kept[(old_common[kept[:, 0]] != old_ends[kept[:, 0]]).any(axis=1)]
+    return diff
+
+def main(argv=None):
+    """Compare two project files and print their differences
+    
+    Returns:
+        Exit status: 0 when the models match, 1 when they differ, 2 when a
+        file cannot be read
+    """
+    parser = argparse.ArgumentParser(description="Compare the nodes and members of two project files")
+    parser.add_argument("old", help="Project file of the old revision (.json or .gridmap)")
+    parser.add_argument("new", help="Project file of the new revision (.json or .gridmap)")
+    parser.add_argument("--tolerance", type=float, default=DIFF_TOLERANCE,
+                        help="Distance under which points are the same, in meters")
+    parser.add_argument("--list", action="store_true", help="List every differing element")
+    args = parser.parse_args(argv)
+    
+    try:
+        old, new = ModelGeometry.from_file(args.old), ModelGeometry.from_file(args.new)
+    except (OSError, ValueError, KeyError) as e:
+        parser.exit(2, f"Error reading project file: {e}\n")
+    
+    diff = diff_models(old, new, args.tolerance)
+    print(diff.summary())
+    if args.list:
+        for line in diff.details():
+            print(line)
+    return 1 if diff else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
@@ -0,0 +1,449 @@
+import json
+import mmap
+import os
+import struct
+
+import numpy as np
+
+from src.models.spacings import Spacings
+from src.utils.atomic_file import atomic_write
+from src.utils.connectivity import NODE_TYPE_CODES, FORCE_TYPE_CODES
+
+# File signature and header layout: magic, version, flags, node count, line
+# count, force count, metadata length, records per block
+MAGIC = b"GRIDMAP1"
+VERSION = 3
+HEADER = struct.Struct("<8sIIQQQQQ")
+
+# Version 2 files had no record blocks
+HEADER_V2 = struct.Struct("<8sIIQQQQ")
+
+# Version 1 files also held a tile count and tile size in the header, and
+# a directory of 40-byte tile entries after the metadata, skipped on read
+HEADER_V1 = struct.Struct("<8sIIQQQQdQ")
+TILE_ENTRY_V1_SIZE = 40
+
+# Fixed-width little-endian records, coordinates in meters with y up
+NODE_RECORD = np.dtype([("x", "<f8"), ("y", "<f8"), ("type", "u1"), ("pad", "V7")])
+LINE_RECORD = np.dtype([("x1", "<f8"), ("y1", "<f8"), ("x2", "<f8"), ("y2", "<f8")])
+FORCE_RECORD = np.dtype([
+    ("x", "<f8"), ("y", "<f8"), ("value", "<f8"), ("t", "<f8"), ("host_index", "<i8"),
+    ("type", "u1"), ("host", "u1"), ("case", "<u2"), ("pad", "V4")
+])
+
+# Host kinds of force records
+HOST_CODES = {None: 0, "node": 1, "line": 2}
+
+# Node and line records are grouped in blocks, each with a bounding box
+# (xmin, ymin, xmax, ymax) in meters, so a viewport reads only the blocks
+# it overlaps
+BLOCK_RECORDS = 4096
+BOX_RECORD = np.dtype([("xmin", "<f8"), ("ymin", "<f8"), ("xmax", "<f8"), ("ymax", "<f8")])
+
+# Extension of mapped project files
+PROJECT_MAP_EXTENSION = ".gridmap"
+
+def _padded(length):
+    """Round a section length up to a multiple of 8 bytes"""
+    return (length + 7) // 8 * 8
+
+def _extents(records):
+    """Return the (xmin, ymin, xmax, ymax) arrays of node or line records"""
+    if "x" in records.dtype.names:
+        return records["x"], records["y"], records["x"], records["y"]
+    return (
+        np.minimum(records["x1"], records["x2"]), np.minimum(records["y1"], records["y2"]),
+        np.maximum(records["x1"], records["x2"]), np.maximum(records["y1"], records["y2"])
+    )
+
+def _block_boxes(records):
+    """Return the bounding boxes of the blocks of node or line records"""
+    starts = np.arange(0, len(records), BLOCK_RECORDS)
+    boxes = np.zeros(len(starts), dtype=BOX_RECORD)
+    if len(starts):
+        xmin, ymin, xmax, ymax = _extents(records)
+        boxes["xmin"] = np.minimum.reduceat(xmin, starts)
+        boxes["ymin"] = np.minimum.reduceat(ymin, starts)
+        boxes["xmax"] = np.maximum.reduceat(xmax, starts)
+        boxes["ymax"] = np.maximum.reduceat(ymax, starts)
+    return boxes
+
+class MapLayout:
+    """Record counts of a mapped project as last written or read
+    
+    Records are in slot order. While the elements of a type do not change
+    their section in the file still agrees with the model, so the next
+    save copies it from the file instead of building it again.
+    """
+    
+    def __init__(self, revision, node_count, line_count):
+        self.revision = revision  # AppState revision held by the file
+        self.node_count = node_count
+        self.line_count = line_count
+
+def _node_records(app_state):
+    """Return the node records in meters"""
+    sx, sy = app_state.scale_factor_x, app_state.scale_factor_y
+    ox, oy = app_state.origin_x, app_state.origin_y
+    node_px = np.asarray(app_state.node_positions, dtype=np.float64).reshape(-1, 2)
+    type_codes = {t.value: code for t, code in NODE_TYPE_CODES.items()}
+    nodes = np.zeros(len(node_px), dtype=NODE_RECORD)
+    nodes["x"] = (node_px[:, 0] - ox) / sx
+    nodes["y"] = (oy - node_px[:, 1]) / sy
+    nodes["type"] = [type_codes[t] for t in app_state.node_types]
+    return nodes
+
+def _line_records(app_state):
+    """Return the line records in meters"""
+    sx, sy = app_state.scale_factor_x, app_state.scale_factor_y
+    ox, oy = app_state.origin_x, app_state.origin_y
+    line_px = np.asarray(app_state.line_positions, dtype=np.float64).reshape(-1, 4)
+    lines = np.zeros(len(line_px), dtype=LINE_RECORD)
+    lines["x1"] = (line_px[:, 0] - ox) / sx
+    lines["y1"] = (oy - line_px[:, 1]) / sy
+    lines["x2"] = (line_px[:, 2] - ox) / sx
+    lines["y2"] = (oy - line_px[:, 3]) / sy
+    return lines
+
+def _force_records(app_state):
+    """Return the force records, with hosts given by slot, and the load case names"""
+    sx, sy = app_state.scale_factor_x, app_state.scale_factor_y
+    ox, oy = app_state.origin_x, app_state.origin_y
+    force_codes = {t.value: code for t, code in FORCE_TYPE_CODES.items()}
+    cases = list(dict.fromkeys(app_state.force_cases))
+    case_codes = {name: i for i, name in enumerate(cases)}
+    forces = np.zeros(len(app_state.force_positions), dtype=FORCE_RECORD)
+    for i, (x, y) in enumerate(app_state.force_positions):
+        host = app_state.force_hosts[i]
+        forces[i] = (
+            (x - ox) / sx, (oy - y) / sy, app_state.force_values[i],
+            host[2] if host else 0.0,
+            -1 if host is None else app_state.slot(*host[:2]),
+            force_codes[app_state.force_types[i]],
+            HOST_CODES[host[0] if host else None],
+            case_codes[app_state.force_cases[i]], b""
+        )
+    return forces, cases
+
+def _unchanged_sections(app_state, file_path, layout):
+    """Copy the sections of the file at file_path whose elements did not change since its layout
+    
+    Returns:
+        Dict with the "nodes", "lines" and "forces" records that can be
+        written again, and the "load_cases" the forces refer to
+    """
+    if layout is None or not os.path.exists(file_path) or not is_project_map(file_path):
+        return {}
+    
+    changed = {t for t, revision in app_state.element_revisions.items() if revision > layout.revision}
+    sections = {}
+    with ProjectMap(file_path) as project:
+        # The file must still be the one the layout describes
+        if project.version != VERSION or len(project.nodes) != layout.node_count \
+                or len(project.lines) != layout.line_count:
+            return {}
+        
+        if "node" not in changed:
+            sections["nodes"] = project.nodes.copy()
+        if "line" not in changed:
+            sections["lines"] = project.lines.copy()
+        
+        # Forces refer to node and line records
+        if not changed:
+            sections["forces"] = project.forces.copy()
+            sections["load_cases"] = project.meta["load_cases"]
+    return sections
+
+def write_project_map(app_state, file_path, layout=None):
+    """Write the model as fixed-width records
+    
+    The file is replaced atomically. Given the layout of the file already
+    at file_path, the sections of element types unchanged since then are
+    copied from it instead of being built from the model.
+    
+    Args:
+        app_state: Application state to write
+        file_path: Path of the mapped project
+        layout: MapLayout of the file at file_path, or None
+    
+    Returns:
+        MapLayout of the written file
+    """
+    # A model still reading its elements from the file lets go of it
+    # before the file is replaced
+    mapped = app_state.mapped_elements
+    if mapped is not None and os.path.exists(file_path) and os.path.samefile(mapped.file_path, file_path):
+        app_state.build_element_lists()
+    
+    unchanged = _unchanged_sections(app_state, file_path, layout)
+    nodes = unchanged["nodes"] if "nodes" in unchanged else _node_records(app_state)
+    lines = unchanged["lines"] if "lines" in unchanged else _line_records(app_state)
+    if "forces" in unchanged:
+        forces, cases = unchanged["forces"], unchanged["load_cases"]
+    else:
+        forces, cases = _force_records(app_state)
+    
+    # Everything that isn't a record goes in a small JSON block
+    meta = json.dumps({
+        "h_spacings": str(app_state.h_spacings),
+        "v_spacings": str(app_state.v_spacings),
+        "load_cases": cases,
+        "load_combinations": app_state.load_combinations
+    }).encode("utf-8")
+    
+    with atomic_write(file_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, 0, len(nodes), len(lines), len(forces), len(meta), BLOCK_RECORDS))
+        f.write(meta.ljust(_padded(len(meta)), b" "))
+        for records in (nodes, lines, forces, _block_boxes(nodes), _block_boxes(lines)):
+            f.write(records.tobytes())
+    
+    return MapLayout(app_state.revision, len(nodes), len(lines))
+
+def is_project_map(file_path):
+    """Check whether a file starts with the mapped project signature"""
+    with open(file_path, "rb") as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+def read_spacings(value):
+    """Read spacings stored in run-length text, or as a list by older files"""
+    return Spacings.parse(value) if isinstance(value, str) else Spacings(value)
+
+class ProjectMap:
+    """Read-only memory map of a project written by write_project_map
+    
+    Opening only parses the header and metadata: the record sections are
+    numpy views on the mapped file, so their fields are read without
+    parsing the file record by record, and the pages of the file that are
+    never read are never loaded.
+    """
+    
+    def __init__(self, file_path):
+        self.file_path = file_path
+        self.file = open(file_path, "rb")
+        self.buffer = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        
+        magic, version = struct.unpack_from("<8sI", self.buffer, 0)
+        if magic != MAGIC or version not in (1, 2, VERSION):
+            self.close()
+            raise ValueError("Not a mapped project file")
+        
+        # Files before version 3 have no record blocks, their sections are
+        # read as a single block each
+        block_records = 0
+        skip = 0
+        if version == 1:
+            _, _, _, node_count, line_count, force_count, tile_count, _, meta_length = \
+                HEADER_V1.unpack_from(self.buffer, 0)
+            offset = HEADER_V1.size
+            skip = tile_count * TILE_ENTRY_V1_SIZE
+        elif version == 2:
+            _, _, _, node_count, line_count, force_count, meta_length = HEADER_V2.unpack_from(self.buffer, 0)
+            offset = HEADER_V2.size
+        else:
+            _, _, _, node_count, line_count, force_count, meta_length, block_records = \
+                HEADER.unpack_from(self.buffer, 0)
+            offset = HEADER.size
+        self.version = version
+        self.block_records = block_records
+        self.meta = json.loads(bytes(self.buffer[offset:offset + meta_length]).decode("utf-8"))
+        offset += _padded(meta_length) + skip
+        
+        # Sections follow each other in a fixed order
+        sections = {}
+        for name, dtype, count in (
+            ("nodes", NODE_RECORD, node_count), ("lines", LINE_RECORD, line_count), ("forces", FORCE_RECORD, force_count)
+        ):
+            sections[name] = np.frombuffer(self.buffer, dtype=dtype, count=count, offset=offset)
+            offset += dtype.itemsize * count
+        
+        self.nodes = sections["nodes"]
+        self.lines = sections["lines"]
+        self.forces = sections["forces"]
+        
+        # Block bounding boxes follow the records
+        self.boxes = {"nodes": None, "lines": None}
+        for name, count in (("nodes", node_count), ("lines", line_count)):
+            if block_records:
+                block_count = -(-count // block_records)
+                self.boxes[name] = np.frombuffer(self.buffer, dtype=BOX_RECORD, count=block_count, offset=offset)
+                offset += BOX_RECORD.itemsize * block_count
+    
+    def records_in(self, name, xmin, ymin, xmax, ymax):
+        """Return the indices of the node or line records overlapping a rectangle in meters
+        
+        Only the blocks of records whose bounding box overlaps the
+        rectangle are read.
+        
+        Args:
+            name: "nodes" or "lines"
+        """
+        records = getattr(self, name)
+        boxes = self.boxes[name]
+        if boxes is None:
+            size, blocks = max(len(records), 1), [0]
+        else:
+            size = self.block_records
+            blocks = np.flatnonzero(
+                (boxes["xmax"] >= xmin) & (boxes["xmin"] <= xmax) & (boxes["ymax"] >= ymin) & (boxes["ymin"] <= ymax)
+            ).tolist()
+        
+        found = [np.zeros(0, dtype=np.int64)]
+        for block in blocks:
+            low_x, low_y, high_x, high_y = _extents(records[block * size:(block + 1) * size])
+            inside = (high_x >= xmin) & (low_x <= xmax) & (high_y >= ymin) & (low_y <= ymax)
+            found.append(block * size + np.flatnonzero(inside))
+        return np.concatenate(found)
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *args):
+        self.close()
+    
+    def close(self):
+        """Release the views and unmap the file"""
+        self.nodes = self.lines = self.forces = self.boxes = None
+        self.buffer.close()
+        self.file.close()
+
+class MappedElements:
+    """Elements of a mapped project, read from the map until the model needs its lists
+    
+    The model holds no element lists while a freshly opened project is
+    only viewed: the view pages in the records overlapping the viewport,
+    and build() converts every record once the lists are first used.
+    Records convert to screen coordinates with the scale they were opened
+    with and the current origin, which panning moves.
+    """
+    
+    def __init__(self, project, scale, first_ids):
+        self.project = project
+        self.file_path = project.file_path
+        self.scale = scale  # (x, y) pixels per meter when opened
+        self.first_ids = first_ids  # Type -> id of the element in slot 0
+    
+    def screen_rect(self, app_state, left, top, right, bottom):
+        """Return the (xmin, ymin, xmax, ymax) rectangle in meters of a screen area"""
+        sx, sy = self.scale
+        ox, oy = app_state.origin_x, app_state.origin_y
+        return (left - ox) / sx, (oy - bottom) / sy, (right - ox) / sx, (oy - top) / sy
+    
+    def node_positions(self, app_state, records):
+        """Return the (n, 2) screen positions of node or force records"""
+        sx, sy = self.scale
+        return np.column_stack([app_state.origin_x + records["x"] * sx, app_state.origin_y - records["y"] * sy])
+    
+    def line_positions(self, app_state, records):
+        """Return the (n, 4) screen positions of line records"""
+        sx, sy = self.scale
+        ox, oy = app_state.origin_x, app_state.origin_y
+        return np.column_stack([
+            ox + records["x1"] * sx, oy - records["y1"] * sy, ox + records["x2"] * sx, oy - records["y2"] * sy
+        ])
+    
+    def visible(self, app_state, left, top, right, bottom):
+        """Page in the elements overlapping a screen area
+        
+        Returns:
+            Dict of element type -> tuple of the id array and the (n, 2) or
+            (n, 4) screen position array of the elements, followed by the
+            node types, or the force types and values
+        """
+        project = self.project
+        rect = self.screen_rect(app_state, left, top, right, bottom)
+        nodes = project.records_in("nodes", *rect)
+        lines = project.records_in("lines", *rect)
+        
+        # Forces carry no blocks, and are few next to the members
+        x, y = project.forces["x"], project.forces["y"]
+        forces = np.flatnonzero((x >= rect[0]) & (x <= rect[2]) & (y >= rect[1]) & (y <= rect[3]))
+        
+        node_types = [t.value for t in NODE_TYPE_CODES]
+        force_types = [t.value for t in FORCE_TYPE_CODES]
+        node_records, force_records = project.nodes[nodes], project.forces[forces]
+        return {
+            "node": (
+                self.first_ids["node"] + nodes, self.node_positions(app_state, node_records),
+                [node_types[code] for code in node_records["type"].tolist()]
+            ),
+            "line": (self.first_ids["line"] + lines, self.line_positions(app_state, project.lines[lines])),
+            "force": (
+                self.first_ids["force"] + forces, self.node_positions(app_state, force_records),
+                [force_types[code] for code in force_records["type"].tolist()], force_records["value"].tolist()
+            )
+        }
+    
+    def build(self, app_state):
+        """Set the element lists of the model from every record
+        
+        Records are converted to screen coordinates with whole-array
+        operations, without parsing the file element by element.
+        """
+        project = self.project
+        node_types = [t.value for t in NODE_TYPE_CODES]
+        force_types = [t.value for t in FORCE_TYPE_CODES]
+        host_names = {code: name for name, code in HOST_CODES.items()}
+        
+        def ids(element_type, count):
+            return list(range(self.first_ids[element_type], self.first_ids[element_type] + count))
+        
+        nodes = project.nodes
+        app_state.nodes = ids("node", len(nodes))
+        app_state.node_types = [node_types[code] for code in nodes["type"].tolist()]
+        app_state.node_positions = list(map(tuple, self.node_positions(app_state, nodes).tolist()))
+        
+        lines = project.lines
+        app_state.lines = ids("line", len(lines))
+        app_state.line_positions = list(map(tuple, self.line_positions(app_state, lines).tolist()))
+        
+        # Forces, with hosts mapped from section slots to ids
+        forces = project.forces
+        cases = project.meta["load_cases"]
+        host_ids = {"node": app_state.nodes, "line": app_state.lines}
+        app_state.forces = ids("force", len(forces))
+        app_state.force_positions = list(map(tuple, self.node_positions(app_state, forces).tolist()))
+        app_state.force_types = [force_types[code] for code in forces["type"].tolist()]
+        app_state.force_values = forces["value"].tolist()
+        app_state.force_hosts = [
+            None if host_names[host] is None else (host_names[host], host_ids[host_names[host]][index], t)
+            for host, index, t in zip(forces["host"].tolist(), forces["host_index"].tolist(), forces["t"].tolist())
+        ]
+        app_state.force_cases = [cases[case] for case in forces["case"].tolist()]
+        
+        # Views on the map must be released before it is closed
+        del nodes, lines, forces
+        app_state.reindex()
+        app_state.update_force_positions()
+    
+    def close(self):
+        """Unmap the file"""
+        self.project.close()
+
+def read_project_map(app_state, file_path):
+    """Open a mapped project in the application state
+    
+    Only the header and metadata are read: the model takes its element
+    lists from the map when they are first used, see MappedElements.
+    
+    Returns:
+        MapLayout of the file, elements being loaded in record order. Its
+        revision is left to the caller, known once the load is committed.
+    """
+    project = ProjectMap(file_path)
+    try:
+        app_state.clear_all()
+        first_ids = {
+            "node": app_state.new_ids("node", len(project.nodes)).start,
+            "line": app_state.new_ids("line", len(project.lines)).start,
+            "force": app_state.new_ids("force", len(project.forces)).start
+        }
+        app_state.h_spacings = read_spacings(project.meta["h_spacings"])
+        app_state.v_spacings = read_spacings(project.meta["v_spacings"])
+        app_state.load_combinations = project.meta["load_combinations"]
+    except BaseException:
+        project.close()
+        raise
+    
+    scale = (app_state.scale_factor_x, app_state.scale_factor_y)
+    app_state.defer_element_lists(MappedElements(project, scale, first_ids))
+    return MapLayout(None, len(project.nodes), len(project.lines))
\ No newline at end of file
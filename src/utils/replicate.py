@@ -0,0 +1,183 @@
+import math
+
+import numpy as np
+
+# Copies closer than this (in model pixels) are merged into one node
+MERGE_QUANTUM = 1e-2
+
+def translation(dx, dy):
+    """Return a single transform moving by (dx, dy)"""
+    return linear_array(1, dx, dy)
+
+def linear_array(count, dx, dy):
+    """Return the transforms of count copies, each offset by (dx, dy) from the previous one
+    
+    Returns:
+        (count, 3, 3) array of affine transforms
+    """
+    transforms = np.tile(np.eye(3), (count, 1, 1))
+    transforms[:, :2, 2] = np.outer(np.arange(1, count + 1), (dx, dy))
+    return transforms
+
+def polar_array(count, cx, cy, angle):
+    """Return the transforms of count copies, each rotated about (cx, cy) from the previous one
+    
+    Args:
+        count: Number of copies
+        cx, cy: Center of rotation
+        angle: Angle between copies in degrees, counterclockwise with y up
+    """
+    angles = np.radians(angle) * np.arange(1, count + 1)
+    cos, sin = np.cos(angles), np.sin(angles)
+    transforms = np.tile(np.eye(3), (count, 1, 1))
+    transforms[:, 0, 0], transforms[:, 0, 1] = cos, -sin
+    transforms[:, 1, 0], transforms[:, 1, 1] = sin, cos
+    transforms[:, 0, 2] = cx - cos * cx + sin * cy
+    transforms[:, 1, 2] = cy - sin * cx - cos * cy
+    return transforms
+
+def mirror(x1, y1, x2, y2):
+    """Return a single transform reflecting across the axis through two points
+    
+    Raises:
+        ValueError: If the two points coincide
+    """
+    dx, dy = x2 - x1, y2 - y1
+    length = math.hypot(dx, dy)
+    if length == 0:
+        raise ValueError("The mirror axis needs two distinct points")
+    
+    # Reflection matrix for the axis direction (cos t, sin t): 2t rotation
+    # composed with a flip, placed so the axis passes through (x1, y1)
+    ux, uy = dx / length, dy / length
+    a, b = ux * ux - uy * uy, 2 * ux * uy
+    transform = np.eye(3)
+    transform[:2, :2] = ((a, b), (b, -a))
+    transform[:2, 2] = (x1 - a * x1 - b * y1, y1 - b * x1 + a * y1)
+    return transform[None]
+
+def to_model(app_state, transforms):
+    """Express transforms given in meters (y up) in model coordinates
+    
+    Scale factors may differ between the axes, so a rotation in meters
+    is not a rotation in model coordinates; the transforms are conjugated
+    with the meters to model mapping instead.
+    """
+    sx, sy = app_state.scale_factor_x, app_state.scale_factor_y
+    to_pixels = np.array(((sx, 0.0, app_state.origin_x), (0.0, -sy, app_state.origin_y), (0.0, 0.0, 1.0)))
+    return to_pixels @ transforms @ np.linalg.inv(to_pixels)
+
+class Clipboard:
+    """Nodes and lines copied from a selection, ready to be replicated
+    
+    Lines refer to their end points by index, so copies are made with
+    array arithmetic: every copy transforms all points at once and offsets
+    the line indexes by the number of points.
+    """
+    
+    def __init__(self, points, node_types, lines):
+        self.points = np.asarray(points, dtype=np.float64).reshape(-1, 2)  # Model coordinates
+        self.node_types = list(node_types)  # Node type of each point, None for free line ends
+        self.lines = np.asarray(lines, dtype=np.int64).reshape(-1, 2)  # Point indexes
+    
+    @classmethod
+    def from_selection(cls, app_state, elements):
+        """Copy the selected nodes and lines, with the nodes at the ends of the lines"""
+        node_slots = np.array(sorted(app_state.moved_node_slots(elements)), dtype=np.int64)
+        line_slots = np.array(sorted(
+            slot for slot in (app_state.slot(t, i) for t, i in elements if t == "line") if slot is not None
+        ), dtype=np.int64)
+        
+        points = np.asarray(app_state.node_positions, dtype=np.float64).reshape(-1, 2)[node_slots]
+        node_types = [app_state.node_types[i] for i in node_slots.tolist()]
+        
+        # Line ends refer to the copied node they are attached to, free
+        # ends get a point of their own. The extra last entry of the node
+        # to point map is reached by the -1 of free ends.
+        end_node = app_state.adjacency()[0]
+        local = np.full(len(app_state.nodes) + 1, -1, dtype=np.int64)
+        local[node_slots] = np.arange(len(node_slots))
+        line_ends = 2 * line_slots[:, None] + (0, 1)
+        ends = local[end_node[line_ends]]
+        free = np.flatnonzero(ends.ravel() < 0)
+        if len(free):
+            coordinates = np.asarray(app_state.line_positions, dtype=np.float64).reshape(-1, 2)
+            points = np.vstack([points, coordinates[line_ends.ravel()[free]]])
+            node_types += [None] * len(free)
+            ends.ravel()[free] = len(node_slots) + np.arange(len(free))
+        
+        return cls(points, node_types, ends)
+    
+    def __len__(self):
+        return len(self.node_types) + len(self.lines)
+    
+    def anchor(self):
+        """Return the point closest to the center of the bounding box, placed by paste"""
+        if not len(self.points):
+            return 0.0, 0.0
+        center = (self.points.min(axis=0) + self.points.max(axis=0)) / 2
+        return tuple(self.points[np.argmin(np.hypot(*(self.points - center).T))].tolist())
+
+def replicate(app_state, clipboard, transforms):
+    """Place transformed copies of the clipboard, merging coincident nodes
+    
+    Nodes of different copies landing on the same spot (the seams of an
+    array, or points on a mirror axis) are merged through a hash of their
+    quantized coordinates, and nodes landing on an existing node reuse it.
+    Lines that would duplicate another one are skipped.
+    
+    Args:
+        app_state: Application state holding the existing elements
+        clipboard: Clipboard with the elements to copy
+        transforms: (n, 3, 3) array of affine transforms in model coordinates
+    
+    Returns:
+        Tuple (nodes, lines) of new (x, y, type) nodes and (x1, y1, x2, y2)
+        lines, to be added with add_elements
+    """
+    count, size = len(transforms), len(clipboard.points)
+    if not count or not size:
+        return [], []
+    
+    # All copies of all points, copy by copy
+    homogeneous = np.hstack([clipboard.points, np.ones((size, 1))])
+    points = np.einsum("nij,kj->nki", transforms[:, :2], homogeneous).reshape(-1, 2)
+    is_node = np.tile([node_type is not None for node_type in clipboard.node_types], count)
+    lines = (clipboard.lines[None] + size * np.arange(count)[:, None, None]).reshape(-1, 2)
+    
+    # Merge coincident points, nodes first so a merged point keeps a node
+    # type. The hash key packs the quantized x and y into one integer.
+    keys = np.round(points / MERGE_QUANTUM).astype(np.int64) @ (1 << 32, 1)
+    order = np.argsort(~is_node, kind="stable")
+    _, first, inverse = np.unique(keys[order], return_index=True, return_inverse=True)
+    merged = np.empty(len(points), dtype=np.int64)
+    merged[order] = inverse
+    first = order[first]
+    unique_points = points[first]
+    
+    # Points on an existing node use it, the others number after the existing nodes
+    existing = app_state.nodes_at(unique_points)
+    node_count = len(app_state.nodes)
+    new = np.flatnonzero(existing < 0)
+    point_ids = existing.copy()
+    point_ids[new] = node_count + np.arange(len(new))
+    positions = np.vstack([np.asarray(app_state.node_positions, dtype=np.float64).reshape(-1, 2), unique_points[new]])
+    
+    # Lines keyed by their end point ids, skipping degenerate lines and
+    # duplicates of each other or of existing lines
+    ends = np.sort(point_ids[merged[lines]], axis=1)
+    total = node_count + len(new)
+    keys = ends[:, 0] * total + ends[:, 1]
+    end_node = app_state.adjacency()[0].reshape(-1, 2)
+    attached = np.sort(end_node[(end_node >= 0).all(axis=1)], axis=1)
+    keep = (ends[:, 0] != ends[:, 1]) & ~np.isin(keys, attached[:, 0] * total + attached[:, 1])
+    keys, index = np.unique(keys[keep], return_index=True)
+    ends = ends[keep][index]
+    
+    # Points that are free line ends in every copy get no node. Tuples
+    # are built from whole columns, which is much faster than row by row.
+    nodes = new[is_node[first[new]]]
+    node_types = [clipboard.node_types[i] for i in (first[nodes] % size).tolist()]
+    new_nodes = list(zip(*unique_points[nodes].T.tolist(), node_types))
+    new_lines = np.hstack([positions[ends[:, 0]], positions[ends[:, 1]]])
+    return new_nodes, list(zip(*new_lines.T.tolist()))
\ No newline at end of file
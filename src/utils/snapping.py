@@ -0,0 +1,332 @@
+import numpy as np
+
+from src.utils.geometry import calculate_distance, find_intersection_point
+from src.utils.intersections import is_endpoint
+
+# Snap target kinds, in priority order
+SNAP_NODE = "node"
+SNAP_MIDPOINT = "midpoint"
+SNAP_INTERSECTION = "intersection"
+SNAP_PERPENDICULAR = "perpendicular"
+SNAP_GRID = "grid"
+
+SNAP_KINDS = (SNAP_NODE, SNAP_MIDPOINT, SNAP_INTERSECTION, SNAP_PERPENDICULAR, SNAP_GRID)
+
+# Additions kept in a plain list, and removals masked, before being merged
+# into the sorted arrays. Larger batches of changes rebuild the sets.
+MERGE_SIZE = 256
+
+# Members nearest to the cursor tested against each other for crossings
+MAX_CROSSING_MEMBERS = 32
+
+def masked(items, removed):
+    """Return a mask of the items in a set of removed items"""
+    if not removed:
+        return np.zeros(len(items), dtype=bool)
+    return np.isin(items, np.fromiter(removed, dtype=np.int64, count=len(removed)))
+
+class SortedPoints:
+    """Points sorted by x for range queries, plus short lists of recent changes"""
+    
+    def __init__(self, points=(), items=None):
+        self.build(points, items)
+    
+    def build(self, points, items=None):
+        """Sort the points, dropping the recent additions list"""
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        items = np.arange(len(points)) if items is None else np.asarray(items, dtype=np.int64)
+        order = np.argsort(points[:, 0], kind="stable")
+        self.xs = points[order, 0]
+        self.ys = points[order, 1]
+        self.items = items[order]
+        self.pending = []  # (x, y, item)
+        self.removed = set()  # Items masked in the sorted arrays
+    
+    def add(self, x, y, item):
+        """Add a point, merging the recent changes once there are enough"""
+        self.pending.append((x, y, item))
+        if len(self.pending) >= MERGE_SIZE:
+            self.merge()
+    
+    def remove(self, item):
+        """Remove a point, merging the recent changes once there are enough"""
+        self.removed.add(item)
+        self.pending = [point for point in self.pending if point[2] != item]
+        if len(self.removed) >= MERGE_SIZE:
+            self.merge()
+    
+    def merge(self):
+        """Sort the recent changes into the arrays"""
+        keep = ~masked(self.items, self.removed)
+        self.build(
+            np.vstack([np.column_stack([self.xs[keep], self.ys[keep]]), np.reshape([p[:2] for p in self.pending], (-1, 2))]),
+            np.concatenate([self.items[keep], np.array([p[2] for p in self.pending], dtype=np.int64)])
+        )
+    
+    def nearest(self, x, y, radius):
+        """Return (distance, item, px, py) of the closest point within radius, or None"""
+        best = None
+        lo = np.searchsorted(self.xs, x - radius, "left")
+        hi = np.searchsorted(self.xs, x + radius, "right")
+        if hi > lo:
+            distances = np.hypot(self.xs[lo:hi] - x, self.ys[lo:hi] - y)
+            distances[masked(self.items[lo:hi], self.removed)] = np.inf
+            k = int(np.argmin(distances))
+            if distances[k] <= radius:
+                best = (float(distances[k]), int(self.items[lo + k]), float(self.xs[lo + k]), float(self.ys[lo + k]))
+        
+        for px, py, item in self.pending:
+            distance = calculate_distance(x, y, px, py)
+            if distance <= radius and (best is None or distance < best[0]):
+                best = (distance, item, px, py)
+        
+        return best
+
+class SortedSegments:
+    """Segments sorted by midpoint x for range queries
+    
+    A query widens the x range by the largest half extent of the segments.
+    Segments much longer than the others are kept apart and always tested,
+    so a few long members do not widen every query.
+    """
+    
+    def __init__(self, segments=(), items=None):
+        self.build(segments, items)
+    
+    def build(self, segments, items=None):
+        """Sort the segments, dropping the recent additions list"""
+        segments = np.asarray(segments, dtype=np.float64).reshape(-1, 4)
+        items = np.arange(len(segments)) if items is None else np.asarray(items, dtype=np.int64)
+        extent = np.abs(segments[:, 2] - segments[:, 0])
+        
+        # Outliers are judged on the larger extent of each segment, so the
+        # members running across x in an orthogonal mesh are not all long
+        size = np.maximum(extent, np.abs(segments[:, 3] - segments[:, 1]))
+        limit = 4 * np.median(size) if len(size) else 0.0
+        long = size > max(limit, 1.0)
+        
+        self.long = segments[long]
+        self.long_items = items[long]
+        short = segments[~long]
+        middle = (short[:, 0] + short[:, 2]) / 2
+        order = np.argsort(middle, kind="stable")
+        self.middle = middle[order]
+        self.segments = short[order]
+        self.items = items[~long][order]
+        self.half = float(extent[~long].max()) / 2 if len(short) else 0.0
+        self.pending = []  # (segment, item)
+        self.removed = set()  # Items masked in the sorted arrays
+    
+    def add(self, segment, item):
+        """Add a segment, merging the recent changes once there are enough"""
+        self.pending.append((tuple(segment), item))
+        if len(self.pending) >= MERGE_SIZE:
+            self.merge()
+    
+    def remove(self, item):
+        """Remove a segment, merging the recent changes once there are enough"""
+        self.removed.add(item)
+        self.pending = [pending for pending in self.pending if pending[1] != item]
+        if len(self.removed) >= MERGE_SIZE:
+            self.merge()
+    
+    def merge(self):
+        """Sort the recent changes into the arrays"""
+        segments = np.vstack([self.segments, self.long])
+        items = np.concatenate([self.items, self.long_items])
+        keep = ~masked(items, self.removed)
+        self.build(
+            np.vstack([segments[keep], np.reshape([s for s, _ in self.pending], (-1, 4))]),
+            np.concatenate([items[keep], np.array([i for _, i in self.pending], dtype=np.int64)])
+        )
+    
+    def near(self, x, y, radius):
+        """Return (segments, items) of the segments whose bounding box is within radius"""
+        lo = np.searchsorted(self.middle, x - radius - self.half, "left")
+        hi = np.searchsorted(self.middle, x + radius + self.half, "right")
+        segments = np.vstack([self.segments[lo:hi], self.long, np.reshape([s for s, _ in self.pending], (-1, 4))])
+        items = np.concatenate([self.items[lo:hi], self.long_items, [i for _, i in self.pending]]).astype(np.int64)
+        
+        # Pending segments come last and are never masked
+        stale = masked(items, self.removed)
+        stale[len(items) - len(self.pending):] = False
+        
+        x1, y1, x2, y2 = segments.T
+        keep = ((np.minimum(x1, x2) <= x + radius) & (np.maximum(x1, x2) >= x - radius)
+                & (np.minimum(y1, y2) <= y + radius) & (np.maximum(y1, y2) >= y - radius) & ~stale)
+        return segments[keep], items[keep]
+
+class SnapEngine:
+    """Resolve the snap target under the cursor from indexed candidate sets
+    
+    Nodes, member midpoints and members are kept in sorted arrays, in
+    coordinates relative to the origin so panning does not invalidate
+    them. Small batches of changes are applied as they come, larger ones
+    rebuild the sets on the next query. Crossings and perpendicular feet
+    are derived from the few members found near the cursor.
+    """
+    
+    def __init__(self, app_state):
+        self.app_state = app_state
+        self.dirty = True
+        self.counts = (0, 0)
+        
+        # Keep the candidate sets in step with the application state
+        app_state.subscribe("elements_changed", self.on_elements_changed)
+    
+    def invalidate(self, *args):
+        """Rebuild the candidate sets before the next query"""
+        self.dirty = True
+    
+    def rebuild(self):
+        """Build the candidate sets from the application state"""
+        origin = np.array([self.app_state.origin_x, self.app_state.origin_y])
+        nodes = np.asarray(self.app_state.node_positions, dtype=np.float64).reshape(-1, 2) - origin
+        lines = np.asarray(self.app_state.line_positions, dtype=np.float64).reshape(-1, 4) - np.tile(origin, 2)
+        
+        self.nodes = SortedPoints(nodes, self.app_state.nodes)
+        self.midpoints = SortedPoints((lines[:, :2] + lines[:, 2:]) / 2, self.app_state.lines)
+        self.members = SortedSegments(lines, self.app_state.lines)
+        self.counts = (len(nodes), len(lines))
+        self.dirty = False
+    
+    def relative(self, x, y):
+        """Convert model coordinates to coordinates relative to the origin"""
+        return x - self.app_state.origin_x, y - self.app_state.origin_y
+    
+    def on_elements_changed(self, changes):
+        """Apply a batch of changes to the candidate sets
+        
+        Modified elements are removed and inserted again at their new
+        position. Resets and large batches rebuild the sets instead.
+        """
+        if self.dirty or changes.reset or len(changes) > MERGE_SIZE:
+            self.dirty = True
+            return
+        
+        app_state = self.app_state
+        for node_id in changes.removed["node"] | changes.modified["node"]:
+            self.nodes.remove(node_id)
+        for line_id in changes.removed["line"] | changes.modified["line"]:
+            self.midpoints.remove(line_id)
+            self.members.remove(line_id)
+        
+        for node_id in [*changes.added["node"], *changes.modified["node"]]:
+            self.nodes.add(*self.relative(*app_state.node_positions[app_state.slot("node", node_id)]), node_id)
+        for line_id in [*changes.added["line"], *changes.modified["line"]]:
+            x1, y1, x2, y2 = app_state.line_positions[app_state.slot("line", line_id)]
+            (x1, y1), (x2, y2) = self.relative(x1, y1), self.relative(x2, y2)
+            self.midpoints.add((x1 + x2) / 2, (y1 + y2) / 2, line_id)
+            self.members.add((x1, y1, x2, y2), line_id)
+        
+        self.counts = (len(app_state.nodes), len(app_state.lines))
+    
+    def snap(self, x, y, radius, node_radius=None, anchor=None, kinds=SNAP_KINDS):
+        """Find the snap target for a cursor position
+        
+        Kinds are tried in SNAP_KINDS order and the first one with a target
+        within reach wins, the closest target of that kind.
+        
+        Args:
+            x, y: Cursor in model coordinates
+            radius: Reach of the snap targets
+            node_radius: Reach of the nodes, defaults to radius
+            anchor: (x, y) start of the line being drawn, for perpendicular feet
+            kinds: Snap kinds to consider
+        
+        Returns:
+            Tuple (kind, x, y, id) in model coordinates, with the node or
+            line id when the target belongs to one, or None
+        """
+        if self.dirty or self.counts != (len(self.app_state.nodes), len(self.app_state.lines)):
+            self.rebuild()
+        
+        ox, oy = self.app_state.origin_x, self.app_state.origin_y
+        rx, ry = self.relative(x, y)
+        node_radius = radius if node_radius is None else node_radius
+        members = None
+        
+        for kind in kinds:
+            if kind == SNAP_NODE:
+                found = self.nodes.nearest(rx, ry, node_radius)
+                if found:
+                    return (SNAP_NODE, found[2] + ox, found[3] + oy, found[1])
+            
+            elif kind == SNAP_MIDPOINT:
+                found = self.midpoints.nearest(rx, ry, radius)
+                if found:
+                    return (SNAP_MIDPOINT, found[2] + ox, found[3] + oy, found[1])
+            
+            elif kind == SNAP_INTERSECTION:
+                members = members if members is not None else self.members.near(rx, ry, radius)
+                found = self.crossing(members[0], rx, ry, radius)
+                if found:
+                    return (SNAP_INTERSECTION, found[0] + ox, found[1] + oy, None)
+            
+            elif kind == SNAP_PERPENDICULAR and anchor is not None:
+                members = members if members is not None else self.members.near(rx, ry, radius)
+                found = self.perpendicular(members, self.relative(*anchor), rx, ry, radius)
+                if found:
+                    return (SNAP_PERPENDICULAR, found[0] + ox, found[1] + oy, found[2])
+            
+            elif kind == SNAP_GRID:
+                found = self.grid_point(x, y, radius)
+                if found:
+                    return (SNAP_GRID, found[0], found[1], None)
+        
+        return None
+    
+    def crossing(self, segments, x, y, radius):
+        """Return the crossing of two members closest to (x, y) within radius, or None"""
+        if len(segments) > MAX_CROSSING_MEMBERS:
+            x1, y1, x2, y2 = segments.T
+            dx, dy = x2 - x1, y2 - y1
+            length2 = np.where(dx * dx + dy * dy > 0, dx * dx + dy * dy, 1.0)
+            t = np.clip(((x - x1) * dx + (y - y1) * dy) / length2, 0.0, 1.0)
+            order = np.argsort(np.hypot(x1 + t * dx - x, y1 + t * dy - y))
+            segments = segments[order[:MAX_CROSSING_MEMBERS]]
+        
+        best = None
+        lines = segments.tolist()
+        for a in range(len(lines)):
+            for b in range(a + 1, len(lines)):
+                point = find_intersection_point(lines[a], lines[b])
+                if point is None or (is_endpoint(point, lines[a]) and is_endpoint(point, lines[b])):
+                    continue
+                distance = calculate_distance(x, y, *point)
+                if distance <= radius and (best is None or distance < best[0]):
+                    best = (distance, point)
+        
+        return best[1] if best else None
+    
+    def perpendicular(self, members, anchor, x, y, radius):
+        """Return (x, y, line id) of the foot from the anchor onto a member near (x, y), or None"""
+        segments, items = members
+        if not len(segments):
+            return None
+        
+        ax, ay = anchor
+        x1, y1, x2, y2 = segments.T
+        dx, dy = x2 - x1, y2 - y1
+        length2 = dx * dx + dy * dy
+        t = ((ax - x1) * dx + (ay - y1) * dy) / np.where(length2 > 0, length2, 1.0)
+        foot_x, foot_y = x1 + t * dx, y1 + t * dy
+        distance = np.hypot(foot_x - x, foot_y - y)
+        
+        # Feet inside the members, away from the anchor itself
+        away = np.hypot(foot_x - ax, foot_y - ay) > 1e-9
+        valid = (length2 > 0) & (t >= 0) & (t <= 1) & (distance <= radius) & away
+        if not valid.any():
+            return None
+        k = int(np.argmin(np.where(valid, distance, np.inf)))
+        return float(foot_x[k]), float(foot_y[k]), int(items[k])
+    
+    def grid_point(self, x, y, radius):
+        """Return the grid intersection within radius of (x, y) along both axes, or None"""
+        app_state = self.app_state
+        sx, sy = app_state.scale_factor_x, app_state.scale_factor_y
+        grid_x = app_state.origin_x + app_state.h_spacings.nearest((x - app_state.origin_x) / sx)[1] * sx
+        grid_y = app_state.origin_y - app_state.v_spacings.nearest((app_state.origin_y - y) / sy)[1] * sy
+        if abs(grid_x - x) < radius and abs(grid_y - y) < radius:
+            return grid_x, grid_y
+        return None
\ No newline at end of file
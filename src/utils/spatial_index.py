@@ -0,0 +1,244 @@
+import math
+
+from src.models.changes import ELEMENT_TYPES
+from src.utils.geometry import calculate_distance, point_in_polygon, point_segment_distance, segment_intersects_rect
+from src.utils.drawing import force_extent
+
+class SpatialGrid:
+    """Uniform bucket grid over axis-aligned bounding boxes"""
+    
+    def __init__(self, cell_size=50.0):
+        self.cell_size = cell_size
+        self.buckets = {}  # (cell_x, cell_y) -> set of keys
+        self.boxes = {}  # key -> (xmin, ymin, xmax, ymax)
+    
+    def __len__(self):
+        return len(self.boxes)
+    
+    def _cell_range(self, xmin, ymin, xmax, ymax):
+        """Return the range of cells covered by a bounding box"""
+        size = self.cell_size
+        return (
+            math.floor(xmin / size), math.floor(ymin / size),
+            math.floor(xmax / size), math.floor(ymax / size)
+        )
+    
+    def insert(self, key, xmin, ymin, xmax, ymax):
+        """Insert a key with its bounding box"""
+        if key in self.boxes:
+            self.remove(key)
+        
+        self.boxes[key] = (xmin, ymin, xmax, ymax)
+        cx1, cy1, cx2, cy2 = self._cell_range(xmin, ymin, xmax, ymax)
+        for cx in range(cx1, cx2 + 1):
+            for cy in range(cy1, cy2 + 1):
+                self.buckets.setdefault((cx, cy), set()).add(key)
+    
+    def remove(self, key):
+        """Remove a key from the grid"""
+        box = self.boxes.pop(key, None)
+        if box is None:
+            return False
+        
+        cx1, cy1, cx2, cy2 = self._cell_range(*box)
+        for cx in range(cx1, cx2 + 1):
+            for cy in range(cy1, cy2 + 1):
+                bucket = self.buckets.get((cx, cy))
+                if bucket is not None:
+                    bucket.discard(key)
+                    if not bucket:
+                        del self.buckets[(cx, cy)]
+        
+        return True
+    
+    def query_rect(self, xmin, ymin, xmax, ymax):
+        """Return the keys whose bounding box overlaps the rectangle"""
+        cx1, cy1, cx2, cy2 = self._cell_range(xmin, ymin, xmax, ymax)
+        
+        # Large regions: scan the occupied buckets instead of every cell
+        if (cx2 - cx1 + 1) * (cy2 - cy1 + 1) > len(self.buckets):
+            cells = [cell for cell in self.buckets
+                     if cx1 <= cell[0] <= cx2 and cy1 <= cell[1] <= cy2]
+        else:
+            cells = [(cx, cy) for cx in range(cx1, cx2 + 1) for cy in range(cy1, cy2 + 1)]
+        
+        result = set()
+        for cell in cells:
+            bucket = self.buckets.get(cell)
+            if bucket:
+                result.update(bucket)
+        
+        # Filter out keys that only share a cell with the rectangle
+        boxes = self.boxes
+        return {
+            key for key in result
+            if boxes[key][0] <= xmax and boxes[key][2] >= xmin
+            and boxes[key][1] <= ymax and boxes[key][3] >= ymin
+        }
+
+class ElementIndex:
+    """Spatial index over the nodes, lines and forces of an AppState
+    
+    Keys are (type, id) tuples, the same form as AppState.selected_element.
+    Bounding boxes are indexed relative to the origin, so panning keeps
+    the index, while queries take model coordinates. The index follows
+    the batches of changes of the model, and rebuilds on the next query
+    after a reset.
+    """
+    
+    def __init__(self, app_state, cell_size=50.0):
+        self.app_state = app_state
+        self.grid = SpatialGrid(cell_size)
+        self.rebuild()
+        
+        # Keep the index in step with the model
+        app_state.subscribe("elements_changed", self.on_elements_changed)
+    
+    def rebuild(self):
+        """Rebuild the index from the current application state"""
+        self.grid = SpatialGrid(self.grid.cell_size)
+        self.dirty = False
+        insert = self.grid.insert
+        app_state = self.app_state
+        ox, oy = app_state.origin_x, app_state.origin_y
+        
+        for node_id, (x, y) in zip(app_state.nodes, app_state.node_positions):
+            insert(("node", node_id), x - ox, y - oy, x - ox, y - oy)
+        
+        for line_id, (x1, y1, x2, y2) in zip(app_state.lines, app_state.line_positions):
+            insert(("line", line_id), min(x1, x2) - ox, min(y1, y2) - oy, max(x1, x2) - ox, max(y1, y2) - oy)
+        
+        # Forces are indexed by glyph extent so clicks on the arrow hit them
+        for force_id, (x, y), force_type in zip(app_state.forces, app_state.force_positions, app_state.force_types):
+            insert(("force", force_id), *force_extent(x - ox, y - oy, force_type))
+    
+    def insert(self, element_type, element_id):
+        """Index an element at its current position, replacing its previous entry"""
+        app_state = self.app_state
+        ox, oy = app_state.origin_x, app_state.origin_y
+        slot = app_state.slot(element_type, element_id)
+        if element_type == "node":
+            x, y = app_state.node_positions[slot]
+            box = (x - ox, y - oy, x - ox, y - oy)
+        elif element_type == "line":
+            x1, y1, x2, y2 = app_state.line_positions[slot]
+            box = (min(x1, x2) - ox, min(y1, y2) - oy, max(x1, x2) - ox, max(y1, y2) - oy)
+        else:
+            x, y = app_state.force_positions[slot]
+            box = force_extent(x - ox, y - oy, app_state.force_types[slot])
+        self.grid.insert((element_type, element_id), *box)
+    
+    def on_elements_changed(self, changes):
+        """Apply a batch of changes, marking the index for a rebuild after a reset"""
+        if changes.reset or self.dirty:
+            self.dirty = True
+            return
+        
+        for element_type in ELEMENT_TYPES:
+            for element_id in changes.removed[element_type]:
+                self.grid.remove((element_type, element_id))
+            for element_id in [*changes.added[element_type], *changes.modified[element_type]]:
+                self.insert(element_type, element_id)
+    
+    def query_grid(self, xmin, ymin, xmax, ymax):
+        """Return the keys whose bounding box overlaps a rectangle in model coordinates"""
+        if self.dirty:
+            self.rebuild()
+        ox, oy = self.app_state.origin_x, self.app_state.origin_y
+        return self.grid.query_rect(xmin - ox, ymin - oy, xmax - ox, ymax - oy)
+    
+    def position(self, key):
+        """Return the position of an indexed element, (x1, y1, x2, y2) for lines"""
+        element_type, element_id = key
+        slot = self.app_state.slot(element_type, element_id)
+        if element_type == "node":
+            return self.app_state.node_positions[slot]
+        if element_type == "line":
+            return self.app_state.line_positions[slot]
+        return self.app_state.force_positions[slot]
+    
+    def query_rect(self, xmin, ymin, xmax, ymax):
+        """Return all elements lying inside a rectangle
+        
+        Nodes and forces are selected when their position is inside the
+        rectangle, lines when the segment crosses it.
+        """
+        result = set()
+        for key in self.query_grid(xmin, ymin, xmax, ymax):
+            element_type = key[0]
+            if element_type == "line":
+                if segment_intersects_rect(self.position(key), (xmin, ymin, xmax, ymax)):
+                    result.add(key)
+            elif element_type == "force":
+                x, y = self.position(key)
+                if xmin <= x <= xmax and ymin <= y <= ymax:
+                    result.add(key)
+            else:
+                result.add(key)
+        
+        return result
+    
+    def query_polygon(self, polygon):
+        """Return all elements lying inside a lasso polygon
+        
+        Lines are only selected when both of their endpoints are inside.
+        """
+        if len(polygon) < 3:
+            return set()
+        
+        xs = [x for x, y in polygon]
+        ys = [y for x, y in polygon]
+        
+        result = set()
+        for key in self.query_grid(min(xs), min(ys), max(xs), max(ys)):
+            element_type = key[0]
+            if element_type != "line":
+                inside = point_in_polygon(self.position(key), polygon)
+            else:
+                x1, y1, x2, y2 = self.position(key)
+                inside = point_in_polygon((x1, y1), polygon) and point_in_polygon((x2, y2), polygon)
+            
+            if inside:
+                result.add(key)
+        
+        return result
+    
+    def hit_test(self, x, y, node_radius=30, line_radius=8):
+        """Find the element under a point
+        
+        Nodes take priority over forces, and forces over lines. Lines are
+        measured to the segment, not to the infinite line through it.
+        
+        Args:
+            x, y: Point in model coordinates
+            node_radius: Maximum distance to a node
+            line_radius: Maximum distance to a line segment
+            
+        Returns:
+            Tuple (type, id) of the closest element, or None
+        """
+        radius = max(node_radius, line_radius)
+        candidates = self.query_grid(x - radius, y - radius, x + radius, y + radius)
+        
+        best = {"node": (node_radius, None), "force": (line_radius, None), "line": (line_radius, None)}
+        for key in candidates:
+            element_type = key[0]
+            if element_type == "node":
+                node_x, node_y = self.position(key)
+                distance = calculate_distance(x, y, node_x, node_y)
+            elif element_type == "force":
+                # Distance to the glyph box, zero inside it
+                xmin, ymin, xmax, ymax = self.grid.boxes[key]
+                rx, ry = x - self.app_state.origin_x, y - self.app_state.origin_y
+                distance = calculate_distance(rx, ry, min(max(rx, xmin), xmax), min(max(ry, ymin), ymax))
+            else:
+                distance = point_segment_distance((x, y), self.position(key))
+            
+            if distance < best[element_type][0]:
+                best[element_type] = (distance, key)
+        
+        for element_type in ("node", "force", "line"):
+            if best[element_type][1] is not None:
+                return best[element_type][1]
+        
+        return None
\ No newline at end of file
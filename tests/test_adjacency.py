@@ -0,0 +1,83 @@
+import random
+
+import numpy as np
+
+from src.models.constants import NodeType
+from src.models.model import Model
+
+def assert_adjacency_matches_rebuild(model):
+    """Check the patched adjacency of a model against one built from scratch"""
+    end_node, starts, stops, ends = model.adjacency()
+    patched = model._adjacency
+    model._adjacency = None
+    rebuilt = model.adjacency()[0]
+    model._adjacency = patched
+    
+    assert np.array_equal(end_node, rebuilt)
+    assert len(starts) == len(model.nodes)
+    for slot in range(len(model.nodes)):
+        assert sorted(model.line_ends_at([slot]).tolist()) == np.flatnonzero(rebuilt == slot).tolist()
+
+def random_edit(model, rng, points):
+    """Apply a random edit, placing elements on and near the points of a mesh"""
+    action = rng.random()
+    if action < 0.08 and model.nodes:
+        model.delete_node(rng.choice(model.nodes))
+    elif action < 0.16 and model.lines:
+        model.delete_line(rng.choice(model.lines))
+    elif action < 0.35:
+        # Nodes land on free ends, on other nodes or within reach of them
+        x, y = rng.choice(points)
+        model.add_node(x + rng.choice((0.0, 0.0, 0.5, -0.7, 1.5)), y, NodeType.SIMPLE)
+    elif action < 0.5:
+        x, y = rng.choice(points)
+        model.add_line(x, y, x + rng.choice((-4.0, 4.0)), y + rng.choice((0.0, 0.4)))
+    elif action < 0.58 and model.nodes and model.lines:
+        elements = {("node", node_id) for node_id in rng.sample(model.nodes, min(2, len(model.nodes)))}
+        model.delete_elements(elements | {("line", rng.choice(model.lines))})
+    elif action < 0.85:
+        elements = {("node", node_id) for node_id in rng.sample(model.nodes, min(rng.randint(0, 3), len(model.nodes)))}
+        elements |= {("line", line_id) for line_id in rng.sample(model.lines, min(rng.randint(0, 2), len(model.lines)))}
+        model.move_elements(elements, rng.choice((4.0, -4.0, 0.0, 0.5, 8.0)), rng.choice((0.0, 4.0, -0.3)))
+    elif action < 0.92:
+        model.undo()
+    else:
+        x, y = rng.choice(points)
+        model.add_elements([(x + 0.3, y, NodeType.SIMPLE)], [(x, y, x + 8.0, y + 4.0)])
+
+def test_patched_adjacency_matches_rebuild():
+    for seed in range(12):
+        rng = random.Random(seed)
+        points = [(x * 4.0, y * 4.0) for x in range(8) for y in range(8)]
+        model = Model()
+        model.add_elements([(x, y, NodeType.SIMPLE) for x, y in points[:40]],
+                           [(x, y, x + 4.0, y) for x, y in points] + [(x, y, x, y + 4.0) for x, y in points])
+        assert_adjacency_matches_rebuild(model)
+        
+        # Edits run in batches between checks, so appended elements are
+        # sometimes attached together
+        for _ in range(150):
+            random_edit(model, rng, points)
+            if rng.random() < 0.5:
+                assert_adjacency_matches_rebuild(model)
+        assert_adjacency_matches_rebuild(model)
+
+def test_moved_node_takes_free_ends():
+    model = Model()
+    model.add_elements([(0.0, 0.0, NodeType.SIMPLE), (50.0, 0.0, NodeType.SIMPLE)], [(0.0, 0.0, 20.0, 0.0)])
+    assert model.line_ends_at([1]).tolist() == []
+    
+    model.move_elements({("node", model.nodes[1])}, -30.0, 0.0)
+    assert model.line_ends_at([1]).tolist() == [1]
+    assert_adjacency_matches_rebuild(model)
+
+def test_coincident_nodes_share_ends_by_id():
+    model = Model()
+    model.add_elements([(100.0, 0.0, NodeType.SIMPLE), (0.0, 0.0, NodeType.SIMPLE), (0.0, 0.0, NodeType.SIMPLE)],
+                       [(0.0, 0.0, 10.0, 0.0)])
+    assert model.line_ends_at([1]).tolist() == [0]
+    
+    # The last node takes the freed slot, ahead of the one holding the end
+    model.delete_node(model.nodes[0])
+    assert model.line_ends_at([model.slot("node", 1)]).tolist() == [0]
+    assert_adjacency_matches_rebuild(model)
\ No newline at end of file
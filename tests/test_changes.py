@@ -0,0 +1,84 @@
+import random
+
+from src.models.changes import ChangeSet, IdRanges
+from src.models.constants import NodeType
+from src.models.model import Model
+
+def test_id_ranges_merge_runs():
+    ids = IdRanges(range(0, 10))
+    ids.extend([10, 11, 13])
+    assert ids.ranges == [range(0, 12), range(13, 14)]
+    
+    ids.discard(5)
+    assert ids.ranges == [range(0, 5), range(6, 12), range(13, 14)]
+    assert 5 not in ids and 13 in ids
+    assert len(ids) == 12
+
+def test_id_ranges_keep_out_of_order_ids_sorted():
+    ids = IdRanges([20, 21])
+    ids.extend([5, 30])
+    assert list(ids) == [5, 20, 21, 30]
+
+def test_change_set_nets_random_batches():
+    rng = random.Random(5)
+    for _ in range(50):
+        changes = ChangeSet()
+        existing = set(range(20))
+        present = set(existing)
+        touched = set()
+        next_id = 20
+        for _ in range(30):
+            action = rng.choice(("add", "remove", "modify"))
+            if action == "add":
+                changes.add("node", [next_id])
+                present.add(next_id)
+                next_id += 1
+            elif present:
+                element_id = rng.choice(sorted(present))
+                if action == "remove":
+                    changes.remove("node", [element_id])
+                    present.discard(element_id)
+                else:
+                    changes.modify("node", [element_id])
+                    touched.add(element_id)
+        
+        # The batch holds the difference between the first and last states
+        assert set(changes.added["node"]) == present - existing
+        assert changes.removed["node"] == existing - present
+        assert changes.modified["node"] == touched & existing & present
+
+def test_update_merges_later_batches():
+    changes = ChangeSet().add("line", range(0, 4)).modify("line", [9])
+    changes.update(ChangeSet().remove("line", [2, 9]).modify("line", [3, 8]))
+    assert list(changes.added["line"]) == [0, 1, 3]
+    assert changes.removed["line"] == {9}
+    assert changes.modified["line"] == {8}
+    assert changes.element_types() == ("line",)
+
+def test_model_batches_match_the_states():
+    model = Model()
+    model.add_elements([(i * 10.0, 0.0, NodeType.SIMPLE) for i in range(30)],
+                       [(i * 10.0, 0.0, i * 10.0 + 10.0, 0.0) for i in range(29)])
+    before = {"node": set(model.nodes), "line": set(model.lines)}
+    batches = []
+    model.subscribe("elements_changed", batches.append)
+    
+    rng = random.Random(8)
+    with model.transaction():
+        for _ in range(40):
+            action = rng.random()
+            if action < 0.3:
+                model.add_node(rng.uniform(0, 300), 20.0, NodeType.SIMPLE)
+            elif action < 0.5:
+                model.delete_node(rng.choice(model.nodes))
+            elif action < 0.7:
+                model.add_line(rng.uniform(0, 300), 20.0, rng.uniform(0, 300), 20.0)
+            else:
+                model.move_elements({("node", rng.choice(model.nodes))}, 0.0, 5.0)
+    
+    assert len(batches) == 1
+    after = {"node": set(model.nodes), "line": set(model.lines)}
+    for element_type in ("node", "line"):
+        assert set(batches[0].added[element_type]) == after[element_type] - before[element_type]
+        assert batches[0].removed[element_type] == before[element_type] - after[element_type]
+        assert batches[0].modified[element_type] <= before[element_type] & after[element_type]
\ No newline at end of file
@@ -0,0 +1,66 @@
+import random
+
+from src.models.constants import NodeType, ForceType
+from src.models.model import Model
+
+def grid_model(size=6):
+    """Return a model with a square mesh of nodes and members, and forces on some nodes"""
+    model = Model()
+    points = [(x * 10.0, y * 10.0) for x in range(size) for y in range(size)]
+    model.add_elements(
+        [(x, y, NodeType.SIMPLE) for x, y in points],
+        [(x, y, x + 10.0, y) for x, y in points if x < (size - 1) * 10] +
+        [(x, y, x, y + 10.0) for x, y in points if y < (size - 1) * 10]
+    )
+    for node_id in model.nodes[::5]:
+        model.add_force(0.0, 0.0, ForceType.POINT, 1.0, ("node", node_id, 0.0))
+    return model
+
+def assert_slots_match(model):
+    """Check the id lookups against ones built from the id lists"""
+    for element_type, names in Model.ELEMENT_LISTS.items():
+        ids = getattr(model, names[0])
+        assert len(set(ids)) == len(ids)
+        assert model.slots(element_type) == {element_id: slot for slot, element_id in enumerate(ids)}
+        assert all(len(getattr(model, name)) == len(ids) for name in names)
+
+def test_ids_are_never_reused():
+    model = grid_model()
+    used = set(model.nodes)
+    model.delete_node(model.nodes[-1])
+    node_id = model.add_node(500.0, 500.0, NodeType.SIMPLE)
+    assert node_id not in used
+
+def test_swap_remove_keeps_slots():
+    model = grid_model()
+    rng = random.Random(3)
+    for _ in range(60):
+        action = rng.choice(("node", "line", "force", "group", "add"))
+        if action == "node" and model.nodes:
+            model.delete_node(rng.choice(model.nodes))
+        elif action == "line" and model.lines:
+            model.delete_line(rng.choice(model.lines))
+        elif action == "force" and model.forces:
+            model.delete_force(rng.choice(model.forces))
+        elif action == "group" and model.nodes and model.lines:
+            model.delete_elements({("node", rng.choice(model.nodes)), ("line", rng.choice(model.lines))})
+        else:
+            model.add_line(rng.uniform(0, 50), rng.uniform(0, 50), rng.uniform(0, 50), rng.uniform(0, 50))
+        assert_slots_match(model)
+
+def test_deleted_elements_have_no_slot():
+    model = grid_model()
+    node_id = model.nodes[0]
+    line_ids = [model.lines[e // 2] for e in model.line_ends_at([0]).tolist()]
+    model.delete_node(node_id)
+    assert model.slot("node", node_id) is None
+    assert all(model.slot("line", line_id) is None for line_id in line_ids)
+    assert model.forces_on("node", node_id) == []
+
+def test_undo_restores_ids():
+    model = grid_model()
+    before = (model.nodes.copy(), model.lines.copy(), model.forces.copy())
+    model.delete_elements({("node", model.nodes[7]), ("line", model.lines[3])})
+    model.undo()
+    assert (model.nodes, model.lines, model.forces) == before
+    assert_slots_match(model)
\ No newline at end of file
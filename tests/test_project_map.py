@@ -0,0 +1,110 @@
+import json
+
+import numpy as np
+import pytest
+
+from src.models.constants import NodeType, ForceType
+from src.models.model import Model
+from src.utils.file_utils import FileManager
+from src.utils.project_map import (
+    HEADER_V1, HEADER_V2, MAGIC, TILE_ENTRY_V1_SIZE, ProjectMap, _padded, write_project_map
+)
+
+def mesh_model(size=80):
+    """Return a model with a square mesh of members, more records than a block holds, and two forces"""
+    model = Model()
+    points = [(x * 20.0, y * 20.0) for y in range(size) for x in range(size)]
+    model.add_elements(
+        [(x, y, NodeType.FIXED if x == 0 else NodeType.SIMPLE) for x, y in points],
+        [(x, y, x + 20.0, y) for x, y in points if x < (size - 1) * 20] +
+        [(x, y, x, y + 20.0) for x, y in points if y < (size - 1) * 20]
+    )
+    model.add_force(0.0, 0.0, ForceType.POINT, 5.0, ("node", model.nodes[3], 0.0))
+    model.add_force(0.0, 0.0, ForceType.POINT, 2.0, ("line", model.lines[4], 0.25))
+    model.load_combinations = {"ULS": {"LC1": 1.5}}
+    return model
+
+def write_old_version(path, version, source):
+    """Write the records of a mapped project in the layout of an older version"""
+    with ProjectMap(source) as project:
+        meta = json.dumps(project.meta).encode("utf-8")
+        counts = (len(project.nodes), len(project.lines), len(project.forces))
+        if version == 1:
+            # Version 1 had a tile directory, which readers skip
+            header = HEADER_V1.pack(MAGIC, 1, 0, *counts, 2, 10.0, len(meta)) + meta.ljust(_padded(len(meta)))
+            header += bytes(2 * TILE_ENTRY_V1_SIZE)
+        else:
+            header = HEADER_V2.pack(MAGIC, 2, 0, *counts, len(meta)) + meta.ljust(_padded(len(meta)))
+        sections = b"".join(records.tobytes() for records in (project.nodes, project.lines, project.forces))
+    with open(path, "wb") as f:
+        f.write(header + sections)
+
+def element_lists(model):
+    """Return the element lists of a model, in a comparable form"""
+    return {name: list(getattr(model, name)) for names in Model.ELEMENT_LISTS.values() for name in names}
+
+@pytest.mark.parametrize("version", [1, 2])
+def test_older_versions_read_the_same(tmp_path, version):
+    source = str(tmp_path / "project.gridmap")
+    write_project_map(mesh_model(), source)
+    old = str(tmp_path / f"v{version}.gridmap")
+    write_old_version(old, version, source)
+    
+    current, previous = Model(), Model()
+    assert FileManager(current).load_file(source)
+    assert FileManager(previous).load_file(old)
+    assert element_lists(previous) == element_lists(current)
+    assert previous.load_combinations == current.load_combinations
+    with ProjectMap(old) as project:
+        assert project.version == version
+
+def test_open_defers_the_element_lists(tmp_path):
+    path = str(tmp_path / "project.gridmap")
+    model = mesh_model()
+    write_project_map(model, path)
+    
+    opened = Model()
+    assert FileManager(opened).load_file(path)
+    assert opened.mapped_elements is not None
+    assert "node_positions" not in vars(opened)
+    
+    # The first use of any list converts them all
+    assert len(opened.lines) == len(model.lines)
+    assert opened.mapped_elements is None
+    assert np.allclose(opened.node_positions, model.node_positions)
+    assert np.allclose(opened.line_positions, model.line_positions)
+    assert opened.force_hosts[1] == ("line", opened.lines[4], 0.25)
+
+def test_visible_elements_match_a_full_scan(tmp_path):
+    path = str(tmp_path / "project.gridmap")
+    model = mesh_model()
+    write_project_map(model, path)
+    opened = Model()
+    FileManager(opened).load_file(path)
+    mapped = opened.mapped_elements
+    
+    left, top, right, bottom = 330.0, 250.0, 610.0, 520.0
+    elements = mapped.visible(opened, left, top, right, bottom)
+    opened.build_element_lists()
+    
+    nodes = np.asarray(opened.node_positions)
+    inside = (nodes[:, 0] >= left) & (nodes[:, 0] <= right) & (nodes[:, 1] >= top) & (nodes[:, 1] <= bottom)
+    assert sorted(elements["node"][0].tolist()) == np.asarray(opened.nodes)[inside].tolist()
+    
+    lines = np.asarray(opened.line_positions)
+    overlap = (np.maximum(lines[:, 0], lines[:, 2]) >= left) & (np.minimum(lines[:, 0], lines[:, 2]) <= right) & \
+        (np.maximum(lines[:, 1], lines[:, 3]) >= top) & (np.minimum(lines[:, 1], lines[:, 3]) <= bottom)
+    assert sorted(elements["line"][0].tolist()) == np.asarray(opened.lines)[overlap].tolist()
+    slots = [opened.slot("line", line_id) for line_id in elements["line"][0].tolist()]
+    assert np.allclose(elements["line"][1], lines[slots])
+
+def test_panning_moves_the_mapped_elements(tmp_path):
+    path = str(tmp_path / "project.gridmap")
+    model = mesh_model()
+    write_project_map(model, path)
+    opened = Model()
+    FileManager(opened).load_file(path)
+    
+    # Panning shifts the origin alone while the elements are mapped
+    opened.origin_x += 40.0
+    assert np.allclose(np.asarray(opened.node_positions), np.asarray(model.node_positions) + (40.0, 0.0))
\ No newline at end of file
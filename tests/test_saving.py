@@ -0,0 +1,118 @@
+import os
+
+import pytest
+
+from src.models.constants import NodeType, ForceType
+from src.models.model import Model
+from src.utils.atomic_file import atomic_write
+from src.utils.file_utils import FileManager
+from src.utils.project_map import write_project_map
+
+def mesh_model():
+    """Return a model with a row of members and a force on a node and on a member"""
+    model = Model()
+    model.add_elements([(i * 50.0, 300.0, NodeType.SIMPLE) for i in range(12)],
+                       [(i * 50.0, 300.0, i * 50.0 + 50.0, 300.0) for i in range(11)])
+    model.add_force(0.0, 0.0, ForceType.POINT, 5.0, ("node", model.nodes[3], 0.0))
+    model.add_force(0.0, 0.0, ForceType.POINT, 2.0, ("line", model.lines[4], 0.25))
+    model.load_combinations = {"ULS": {"LC1": 1.5}}
+    return model
+
+def test_atomic_write_replaces_the_file(tmp_path):
+    path = tmp_path / "project.json"
+    path.write_text("old")
+    os.chmod(path, 0o640)
+    
+    with atomic_write(path) as f:
+        f.write("new")
+    
+    assert path.read_text() == "new"
+    assert os.stat(path).st_mode & 0o777 == 0o640
+    assert os.listdir(tmp_path) == ["project.json"]
+
+def test_atomic_write_keeps_the_file_on_error(tmp_path):
+    path = tmp_path / "project.json"
+    path.write_text("old")
+    
+    with pytest.raises(RuntimeError):
+        with atomic_write(path) as f:
+            f.write("partial")
+            raise RuntimeError
+    
+    assert path.read_text() == "old"
+    assert os.listdir(tmp_path) == ["project.json"]
+
+def test_unchanged_model_is_not_saved_again(tmp_path):
+    model = mesh_model()
+    files = FileManager(model)
+    path = str(tmp_path / "project.json")
+    assert files.save_file(path)
+    assert not model.is_modified()
+    
+    os.utime(path, (0, 0))
+    assert files.save_file(path)
+    assert os.stat(path).st_mtime == 0
+    
+    model.move_elements({("node", model.nodes[0])}, 0.0, 10.0)
+    assert model.is_modified()
+    assert files.save_file(path)
+    assert os.stat(path).st_mtime != 0
+
+@pytest.mark.parametrize("edit", ["nothing", "combinations", "move", "delete", "scale"])
+def test_partial_saves_match_full_saves(tmp_path, edit):
+    model = mesh_model()
+    files = FileManager(model)
+    path = str(tmp_path / "project.gridmap")
+    files.save_file(path)
+    
+    if edit == "combinations":
+        model.load_combinations = {"SLS": {"LC1": 1.0}}
+        model.mark_modified()
+    elif edit == "move":
+        model.move_elements({("node", model.nodes[5])}, 10.0, 0.0)
+    elif edit == "delete":
+        model.delete_line(model.lines[2])
+    elif edit == "scale":
+        model.scale_factor_x = 50
+        model.mark_modified(*Model.ELEMENT_LISTS)
+    
+    # Sections copied from the previous save must hold what a full save does
+    files.save_file(path)
+    full_path = str(tmp_path / "full.gridmap")
+    write_project_map(model, full_path)
+    with open(path, "rb") as saved, open(full_path, "rb") as full:
+        assert saved.read() == full.read()
+
+@pytest.mark.parametrize("extension", [".json", ".gridmap"])
+def test_load_is_one_undo_step(tmp_path, extension):
+    saved = mesh_model()
+    path = str(tmp_path / ("project" + extension))
+    FileManager(saved).save_file(path)
+    
+    model = Model()
+    model.add_node(0.0, 0.0, NodeType.SIMPLE)
+    model.load_combinations = {"Before": {"LC1": 1.0}}
+    files = FileManager(model)
+    assert files.load_file(path)
+    assert len(model.nodes) == 12
+    assert model.load_combinations == {"ULS": {"LC1": 1.5}}
+    assert not model.is_modified()
+    
+    model.undo()
+    assert len(model.nodes) == 1
+    assert model.load_combinations == {"Before": {"LC1": 1.0}}
+    model.redo()
+    assert model.load_combinations == {"ULS": {"LC1": 1.5}}
+    assert model.force_hosts[1] == ("line", model.lines[4], 0.25)
+
+def test_failed_load_leaves_the_model(tmp_path):
+    path = tmp_path / "broken.json"
+    path.write_text('{"nodes": [{"bad": 1}], "lines": [], "load_combinations": {"C": {}}}')
+    model = mesh_model()
+    nodes, combinations = model.nodes.copy(), dict(model.load_combinations)
+    undo_depth = len(model.undo_stack)
+    
+    assert not FileManager(model).load_file(str(path))
+    assert model.nodes == nodes
+    assert model.load_combinations == combinations
+    assert len(model.undo_stack) == undo_depth
\ No newline at end of file
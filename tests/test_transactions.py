@@ -0,0 +1,81 @@
+import pytest
+
+from src.models.constants import NodeType
+from src.models.model import Model
+
+# Single element operations record no undo step of their own, as the
+# view saves the state before them: the steps here come from transactions
+
+def recorded(model):
+    """Subscribe to the batches of changes of a model and return the list they go to"""
+    batches = []
+    model.subscribe("elements_changed", batches.append)
+    return batches
+
+def test_nested_transactions_make_one_step():
+    model = Model()
+    model.add_node(0.0, 0.0, NodeType.SIMPLE)
+    batches = recorded(model)
+    undo_depth = len(model.undo_stack)
+    
+    with model.transaction():
+        first = model.add_node(10.0, 0.0, NodeType.SIMPLE)
+        with model.transaction():
+            second = model.add_node(20.0, 0.0, NodeType.SIMPLE)
+            model.add_line(10.0, 0.0, 20.0, 0.0)
+        model.delete_node(second)
+    
+    assert len(model.undo_stack) == undo_depth + 1
+    assert len(batches) == 1
+    assert list(batches[0].added["node"]) == [first]
+    assert not batches[0].removed["node"]
+    
+    model.undo()
+    assert len(model.nodes) == 1
+
+def test_rollback_restores_state_and_stacks():
+    model = Model()
+    model.add_node(0.0, 0.0, NodeType.SIMPLE)
+    with model.transaction():
+        model.add_node(10.0, 0.0, NodeType.SIMPLE)
+    model.undo()
+    nodes, positions = model.nodes.copy(), model.node_positions.copy()
+    undo_stack, redo_stack = model.undo_stack.copy(), model.redo_stack.copy()
+    
+    with pytest.raises(RuntimeError):
+        with model.transaction():
+            model.add_node(20.0, 0.0, NodeType.SIMPLE)
+            with model.transaction():
+                model.delete_node(nodes[0])
+                raise RuntimeError
+    
+    assert (model.nodes, model.node_positions) == (nodes, positions)
+    assert model.undo_stack == undo_stack
+    assert model.redo_stack == redo_stack
+    assert model.redo()
+
+def test_empty_transaction_leaves_no_step():
+    model = Model()
+    model.add_node(0.0, 0.0, NodeType.SIMPLE)
+    with model.transaction():
+        model.add_node(10.0, 0.0, NodeType.SIMPLE)
+    model.undo()
+    batches = recorded(model)
+    revision = model.revision
+    undo_stack, redo_stack = model.undo_stack.copy(), model.redo_stack.copy()
+    
+    with model.transaction():
+        model.delete_node(12345)
+    
+    assert model.undo_stack == undo_stack
+    assert model.redo_stack == redo_stack
+    assert model.revision == revision
+    assert not batches
+
+def test_undo_is_refused_inside_a_transaction():
+    model = Model()
+    model.add_node(0.0, 0.0, NodeType.SIMPLE)
+    with model.transaction():
+        assert not model.undo()
+        assert not model.redo()
+    assert len(model.nodes) == 1
\ No newline at end of file